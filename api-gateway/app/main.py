@@ -35,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset pagination of order listings
 )
 
 # Service routing map
@@ -64,6 +65,24 @@ PUBLIC_ROUTES = [
     "/uploads",  # Allow public access to uploaded images
 ]
 
+# Catalog prefixes are public for reads only; writes under them (reviews,
+# product and category changes) need a token, except these anonymous ones
+READ_ONLY_PUBLIC_ROUTES = [
+    "/api/v1/products",
+    "/api/v1/categories",
+]
+PUBLIC_WRITE_ROUTES = [
+    "/api/v1/products/batch",  # Lookup by ids in the request body
+    "/api/v1/products/events",  # Guest view and add-to-cart events
+]
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Routes that also serve guests: a token is verified when sent, but not required
+# (guest carts are identified by the X-Cart-Id header)
+OPTIONAL_AUTH_ROUTES = [
+    "/api/v1/cart",
+]
+
 def get_service_url(path: str) -> str:
     """Get target service URL based on request path"""
     for prefix, service_url in SERVICE_MAP.items():
@@ -71,8 +90,10 @@ def get_service_url(path: str) -> str:
             return service_url
     raise HTTPException(status_code=404, detail="Service not found")
 
-def is_public_route(path: str) -> bool:
+def is_public_route(path: str, method: str = "GET") -> bool:
     """Check if route requires authentication"""
+    if method not in SAFE_METHODS and any(path.startswith(route) for route in READ_ONLY_PUBLIC_ROUTES):
+        return any(path == route for route in PUBLIC_WRITE_ROUTES)
     for public_path in PUBLIC_ROUTES:
         if path.startswith(public_path):
             return True
@@ -104,8 +125,10 @@ async def gateway(path: str, request: Request):
     
     # Check authentication for protected routes
     token_payload = None
-    if not is_public_route(full_path):
-        token_payload = await verify_token(request)
+    if not is_public_route(full_path, request.method):
+        optional = any(full_path.startswith(route) for route in OPTIONAL_AUTH_ROUTES)
+        if not optional or request.headers.get("Authorization"):
+            token_payload = await verify_token(request)
     
     # Get target service URL
     service_url = get_service_url(full_path)
@@ -124,17 +147,18 @@ async def gateway(path: str, request: Request):
                 if key.lower() != "host":
                     headers[key] = value
             
-            # Get request body
-            body = await request.body()
-            if body:
-                logger.info(f"Request body length: {len(body)} bytes")
+            # Stream the request body through instead of buffering it, so large
+            # uploads (e.g. bulk product imports) use constant gateway memory
+            content_length = request.headers.get("content-length")
+            if content_length:
+                logger.info(f"Request body length: {content_length} bytes")
             
             # Forward request to target service
             response = await client.request(
                 method=request.method,
                 url=target_url,
                 headers=headers,
-                content=body,
+                content=request.stream(),
                 params=request.query_params,
                 timeout=30.0
             )
@@ -4,6 +4,7 @@
 
 import { createContext, useContext, useState, useEffect, ReactNode } from 'react';
 import { useRouter } from 'next/navigation';
+import { mergeGuestCart } from '../services/api/cart';
 
 interface User {
   id: number;
@@ -46,6 +47,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
     localStorage.setItem('user', JSON.stringify(userData));
     setToken(newToken);
     setUser(userData);
+    mergeGuestCart();
     
     // Redirect based on role
     if (userData.role === 'admin') {
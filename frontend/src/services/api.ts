@@ -13,6 +13,11 @@ api.interceptors.request.use(
       if (token) {
         config.headers.Authorization = `Bearer ${token}`;
       }
+      // Guest cart id, kept until login merges the guest cart into the user's cart
+      const cartId = localStorage.getItem('cartId');
+      if (cartId) {
+        config.headers['X-Cart-Id'] = cartId;
+      }
     }
     return config;
   },
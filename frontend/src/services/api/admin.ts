@@ -61,6 +61,7 @@ export async function getProductStats() {
 export interface CategoryFormData {
   name: string;
   description?: string;
+  parent_id?: number | null;
   image?: string;
 }
 
@@ -116,6 +117,39 @@ export async function getAllOrders(skip = 0, limit = 100, status?: string) {
   return res.data;
 }
 
+export interface OrderSummary extends Omit<Order, "items"> {
+  item_count: number;
+}
+
+export interface OrderSearchParams {
+  q?: string; // Order number prefix, or part of the customer email or name (3+ characters)
+  order_number?: string;
+  email?: string;
+  name?: string;
+  status?: Order["status"][];
+  payment_method?: string;
+  created_from?: string;
+  created_to?: string;
+  total_min?: number;
+  total_max?: number;
+}
+
+// One page of matches, newest first; pass nextCursor back (with the same params) for the next page
+export async function searchOrders(
+  params: OrderSearchParams,
+  cursor?: string,
+  limit = 50
+): Promise<{ orders: OrderSummary[]; nextCursor: string | null }> {
+  const query = new URLSearchParams({ limit: String(limit) });
+  Object.entries(params).forEach(([key, value]) => {
+    if (value === undefined || value === "") return;
+    (Array.isArray(value) ? value : [value]).forEach((v) => query.append(key, String(v)));
+  });
+  if (cursor) query.append("cursor", cursor);
+  const res = await api.get(`/admin/orders/search?${query.toString()}`);
+  return { orders: res.data, nextCursor: res.headers["x-next-cursor"] ?? null };
+}
+
 export async function updateOrderStatus(orderId: number, status: string, note?: string) {
   const res = await api.put(`/admin/orders/${orderId}/status`, { status, note });
   return res.data;
@@ -4,13 +4,23 @@
 
 import api from "../api";
 import { CartItemType } from "../../types/cart";
+import { recordProductEvent } from "./products";
+
+// Guests get a random cart id so their cart survives until they sign in
+export function ensureGuestCartId(): void {
+  if (typeof window !== "undefined" && !localStorage.getItem("token") && !localStorage.getItem("cartId")) {
+    localStorage.setItem("cartId", crypto.randomUUID());
+  }
+}
 
 export async function getCart(): Promise<CartItemType[]> {
+  ensureGuestCartId();
   const res = await api.get(`/cart`);
   return res.data;
 }
 
 export async function addToCart(productId: string, quantity: number = 1, productData?: any): Promise<CartItemType> {
+  ensureGuestCartId();
   const res = await api.post(`/cart`, { 
     product_id: productId, 
     quantity,
@@ -18,6 +28,7 @@ export async function addToCart(productId: string, quantity: number = 1, product
     name: productData?.name || 'Product',
     image: productData?.image || '/placeholder.png'
   });
+  recordProductEvent(productId, "add_to_cart");
   return res.data;
 }
 
@@ -32,3 +43,14 @@ export async function updateCartItemQuantity(id: string, quantity: number): Prom
 export async function checkoutCart(): Promise<void> {
   await api.post(`/cart/checkout`);
 }
+
+// Call right after login: moves the guest cart (if any) into the user's cart
+export async function mergeGuestCart(): Promise<void> {
+  if (!localStorage.getItem("cartId")) return;
+  try {
+    await api.post(`/cart/merge`);
+    localStorage.removeItem("cartId");
+  } catch (err) {
+    console.error("Failed to merge guest cart:", err);
+  }
+}
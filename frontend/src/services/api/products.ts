@@ -3,9 +3,9 @@
 // E-Commerce Microservices Frontend
 
 import api from "../api";
-import { Product } from "../../types/products";
+import { Product, ProductReview, ProductReviewPage, RatingSummary } from "../../types/products";
 
-export type { Product };
+export type { Product, ProductReview, ProductReviewPage, RatingSummary };
 
 export async function getProducts(): Promise<Product[]> {
   const res = await api.get(`/products`);
@@ -17,6 +17,12 @@ export async function getProductById(id: string): Promise<Product> {
   return res.data;
 }
 
+export async function getProductsByIds(ids: Array<string | number>): Promise<Product[]> {
+  if (ids.length === 0) return [];
+  const res = await api.post(`/products/batch`, { ids: ids.map(Number) });
+  return res.data.products;
+}
+
 export async function getRelatedProducts(productId: string): Promise<Product[]> {
   try {
     const res = await api.get(`/products/${productId}/related?limit=4`);
@@ -27,6 +33,49 @@ export async function getRelatedProducts(productId: string): Promise<Product[]>
   }
 }
 
+export async function getTrendingProducts(
+  ranking: "trending" | "most-viewed" = "trending",
+  limit: number = 10
+): Promise<Product[]> {
+  try {
+    const res = await api.get(`/products/trending?ranking=${ranking}&limit=${limit}`);
+    return res.data;
+  } catch (err) {
+    console.error("Failed to fetch trending products:", err);
+    return [];
+  }
+}
+
+// Fire-and-forget: trending counters must never break the action being tracked
+export function recordProductEvent(productId: string | number, type: "view" | "add_to_cart"): void {
+  api.post(`/products/events`, { events: [{ product_id: Number(productId), type }] }).catch(() => {});
+}
+
+export async function getProductReviews(
+  productId: string | number,
+  cursor?: string | null,
+  rating?: number
+): Promise<ProductReviewPage> {
+  const params = new URLSearchParams({ limit: "10" });
+  if (cursor) params.set("cursor", cursor);
+  if (rating) params.set("rating", String(rating));
+  const res = await api.get(`/products/${productId}/reviews?${params}`);
+  return res.data;
+}
+
+export async function getRatingSummary(productId: string | number): Promise<RatingSummary> {
+  const res = await api.get(`/products/${productId}/reviews/summary`);
+  return res.data;
+}
+
+export async function createProductReview(
+  productId: string | number,
+  review: { user_name?: string; rating: number; comment?: string }  // Author: the signed-in user
+): Promise<ProductReview> {
+  const res = await api.post(`/products/${productId}/reviews`, review);
+  return res.data;
+}
+
 export async function searchProducts(query: string): Promise<Product[]> {
   try {
     const res = await api.get(`/products/search?q=${encodeURIComponent(query)}`);
@@ -62,6 +111,17 @@ export async function getUserWishlist(userId: number): Promise<Product[]> {
   return res.data;
 }
 
+// One request per product grid instead of one per card
+export async function checkWishlist(userId: number, productIds: number[]): Promise<Record<number, boolean>> {
+  if (productIds.length === 0) return {};
+  try {
+    const res = await api.post(`/wishlist/${userId}/check`, { product_ids: productIds });
+    return res.data.in_wishlist;
+  } catch (err) {
+    return {};
+  }
+}
+
 export async function isInWishlist(userId: number, productId: number): Promise<boolean> {
   try {
     const res = await api.get(`/wishlist/${userId}/check/${productId}`);
@@ -246,10 +246,21 @@ export interface Category {
   id: number;
   name: string;
   description?: string;
+  parent_id?: number | null;
   created_at?: string;
   updated_at?: string;
 }
 
+export interface CategoryTreeNode {
+  id: number;
+  name: string;
+  description?: string;
+  parent_id: number | null;
+  product_count: number;
+  total_product_count: number;
+  children: CategoryTreeNode[];
+}
+
 export async function getAllCategories(): Promise<Category[]> {
   try {
     const res = await api.get("/categories");
@@ -259,3 +270,13 @@ export async function getAllCategories(): Promise<Category[]> {
     return [];
   }
 }
+
+export async function getCategoryTree(): Promise<CategoryTreeNode[]> {
+  try {
+    const res = await api.get("/categories/tree");
+    return res.data;
+  } catch (err) {
+    console.error("Failed to fetch category tree:", err);
+    return [];
+  }
+}
@@ -9,4 +9,5 @@ export interface CartItemType {
   price: number;
   quantity: number;
   image: string;
+  stock?: number;
 }
@@ -21,10 +21,24 @@ export interface Product {
 }
 
 export interface ProductReview {
-  id: string;
-  product_id: string;
-  user_name: string;
+  id: number;
+  product_id: number;
+  user_id: number;
+  user_name: string | null;
   rating: number;
-  comment: string;
+  comment: string | null;
   created_at: string;
+  updated_at: string;
+}
+
+export interface ProductReviewPage {
+  reviews: ProductReview[];
+  next_cursor: string | null;
+}
+
+export interface RatingSummary {
+  product_id: number;
+  average: number;
+  count: number;
+  histogram: Record<number, number>;
 }
@@ -0,0 +1,50 @@
+# Library: keyset
+# Responsibility: Keyset pagination over (created_at, id), shared by the services
+# Architecture: SQLAlchemy expressions + opaque URL-safe cursors
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Sequence, Tuple, TypeVar
+
+from sqlalchemy import ColumnElement, tuple_
+
+Keyset = Tuple[datetime, int]
+Row = TypeVar("Row")
+
+
+class InvalidCursor(ValueError):
+    """A cursor that was not produced by :func:`encode_cursor`"""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor for the row ``(created_at, row_id)``; URL-safe, without padding"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Keyset:
+    """The ``(created_at, id)`` keyset of ``cursor``; raises InvalidCursor when it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+
+
+def before(created_at_column, id_column, keyset: Keyset) -> ColumnElement[bool]:
+    """Rows strictly after ``keyset`` in ``created_at DESC, id DESC`` order.
+
+    The row comparison breaks ties on equal timestamps by id, so a page
+    boundary between rows created in the same instant skips or repeats nothing.
+    """
+    return tuple_(created_at_column, id_column) < keyset
+
+
+def next_page(rows: Sequence[Row], limit: int) -> Tuple[Sequence[Row], Optional[str]]:
+    """Split ``limit + 1`` fetched rows into the page and the cursor of the next one (None on the last page)"""
+    page = rows[:limit]
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(page[-1].created_at, page[-1].id)
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+from sqlalchemy.dialects import postgresql
+from keyset import InvalidCursor, before, decode_cursor, encode_cursor, next_page
+
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2026, 1, 2, 3, 4, 5),
+    datetime(2026, 1, 2, 3, 4, 5, 678901),
+    datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+])
+def test_cursor_round_trip(created_at):
+    cursor = encode_cursor(created_at, 1234567)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 1234567)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "bm9waXBl", encode_cursor(datetime(2026, 1, 1), 1)[:-3]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_before_is_a_row_comparison():
+    table = Table("t", MetaData(), Column("id", Integer), Column("created_at", DateTime))
+    sql = str(before(table.c.created_at, table.c.id, (datetime(2026, 1, 1), 7)).compile(dialect=postgresql.dialect()))
+    assert sql == "(t.created_at, t.id) < (%(param_1)s, %(param_2)s)"
+
+
+def test_next_page():
+    rows = [SimpleNamespace(created_at=datetime(2026, 1, 1), id=i) for i in (5, 4, 3)]
+    page, cursor = next_page(rows, 2)
+    assert [r.id for r in page] == [5, 4]
+    assert decode_cursor(cursor) == (datetime(2026, 1, 1), 4)
+    assert next_page(rows, 3) == (rows, None)
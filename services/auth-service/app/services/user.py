@@ -38,7 +38,7 @@ class UserService:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
         
         logger.info(f"Password verified, creating token...")
-        access_token = create_access_token(data={"sub": user.email, "role": user.role})
+        access_token = create_access_token(data={"sub": user.email, "uid": user.id, "role": user.role})
         logger.info(f"Token created successfully for user: {user.id}")
         
         return Token(
@@ -2,12 +2,13 @@
 # Responsibility: Admin-only API endpoints for order management
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import datetime
 from app.db.session import SessionLocal
 from app.services.order import OrderService
-from app.schemas.order import OrderRead, OrderUpdate
+from app.schemas.order import OrderRead, OrderUpdate, OrderListItem, OrderSearch, OrderView
 
 router = APIRouter()
 
@@ -18,19 +19,59 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/admin/orders", response_model=List[OrderRead], tags=["Admin - Orders"],
+@router.get("/admin/orders", response_model=List[OrderListItem], tags=["Admin - Orders"],
             summary="Get all orders (Admin)", description="Get all orders with filters (Admin only)",
             status_code=200)
 def get_all_orders(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    view: OrderView = "full",
     db: Session = Depends(get_db)
 ):
-    """Get all orders with optional status filter (Admin only)"""
-    if status:
-        return OrderService.get_orders_by_status(db, status, skip, limit)
-    return OrderService.get_orders(db, skip, limit)
+    """Get all orders, newest first, with optional status filter (Admin only)
+    
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    orders, next_cursor = OrderService.list_orders(db, order_status=status, cursor=cursor, skip=skip,
+                                                   limit=limit, view=view)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
+
+@router.get("/admin/orders/search", response_model=List[OrderListItem], tags=["Admin - Orders"],
+            summary="Search orders (Admin)", description="Search orders by number, customer, status, payment method, date and total (Admin only)",
+            status_code=200)
+def search_orders(
+    response: Response,
+    q: Optional[str] = Query(None, min_length=3, description="Order number prefix, or part of the customer email or name"),
+    order_number: Optional[str] = Query(None, min_length=1, description="Order number prefix"),
+    email: Optional[str] = Query(None, min_length=3, description="Part of the customer email"),
+    name: Optional[str] = Query(None, min_length=3, description="Part of the customer name"),
+    status: Optional[List[str]] = Query(None, description="One or more statuses"),
+    payment_method: Optional[str] = None,
+    created_from: Optional[datetime.datetime] = None,
+    created_to: Optional[datetime.datetime] = Query(None, description="Exclusive"),
+    total_min: Optional[float] = Query(None, ge=0),
+    total_max: Optional[float] = Query(None, ge=0),
+    limit: int = Query(50, ge=1),
+    cursor: Optional[str] = None,
+    view: OrderView = "summary",
+    db: Session = Depends(get_db)
+):
+    """Search orders, newest first; all given criteria must match (Admin only)
+    
+    Pass the X-Next-Cursor response header back as `cursor` (with the same criteria) for the next page.
+    """
+    search = OrderSearch(q=q, order_number=order_number, email=email, name=name, status=status,
+                         payment_method=payment_method, created_from=created_from, created_to=created_to,
+                         total_min=total_min, total_max=total_max)
+    orders, next_cursor = OrderService.list_orders(db, cursor=cursor, limit=limit, view=view, search=search)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
 
 @router.put("/admin/orders/{order_id}/status", response_model=OrderRead, tags=["Admin - Orders"],
             summary="Update order status (Admin)", description="Update order status (Admin only)",
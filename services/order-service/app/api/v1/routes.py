@@ -1,20 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 import logging
 from app.db.session import SessionLocal
 from app.services.order import OrderService
 from app.services.analytics import AnalyticsService
-from app.schemas.order import OrderCreate, OrderUpdate, OrderRead
-from typing import List
-from app.services.cart import (
-    get_user_cart, 
-    add_item_to_cart, 
-    remove_item_from_cart, 
-    update_cart_item_quantity,
-    clear_cart,
-    CartItem
-)
-import uuid
+from app.schemas.order import OrderCreate, OrderUpdate, OrderRead, OrderListItem, OrderView
+from app.schemas.cart import CartItemAdd, CartItemQuantity
+from typing import List, Optional
+from app.core.auth import cart_key, guest_cart_key, user_cart_key
+from app.services.cart import cart_store, CartItem
+from app.services.pricing import pricing
 
 logger = logging.getLogger(__name__)
 
@@ -46,13 +42,33 @@ def get_order(order_id: int, db: Session = Depends(get_db)):
     logger.info(f"Order found: {order.id}, status: {order.status}")
     return order
 
-@router.get("/orders", response_model=List[OrderRead], tags=["Orders"], summary="List all orders", description="Get all orders", status_code=200)
-def get_orders(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return OrderService.get_orders(db, skip, limit)
-
-@router.get("/orders/user/{user_id}", response_model=List[OrderRead], tags=["Orders"], summary="Get user orders", description="Get all orders for a specific user", status_code=200)
-def get_user_orders(user_id: int, db: Session = Depends(get_db)):
-    return OrderService.get_orders_by_user(db, user_id)
+@router.get("/orders", response_model=List[OrderListItem], tags=["Orders"], summary="List all orders", description="Get all orders, newest first; the X-Next-Cursor response header is the `cursor` of the next page", status_code=200)
+def get_orders(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    view: OrderView = "full",
+    db: Session = Depends(get_db)
+):
+    orders, next_cursor = OrderService.list_orders(db, cursor=cursor, skip=skip, limit=limit, view=view)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
+
+@router.get("/orders/user/{user_id}", response_model=List[OrderListItem], tags=["Orders"], summary="Get user orders", description="Get orders of a specific user, newest first; the X-Next-Cursor response header is the `cursor` of the next page", status_code=200)
+def get_user_orders(
+    user_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    view: OrderView = "full",
+    db: Session = Depends(get_db)
+):
+    orders, next_cursor = OrderService.list_orders(db, user_id=user_id, cursor=cursor, limit=limit, view=view)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return orders
 
 @router.put("/orders/{order_id}", response_model=OrderRead, tags=["Orders"], summary="Update order", description="Update order status or details", status_code=200)
 def update_order(order_id: int, order_update: OrderUpdate, db: Session = Depends(get_db)):
@@ -84,55 +100,76 @@ def delete_order(order_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Order not found")
     return order
 
-# Cart endpoints
+# Cart endpoints: the signed-in user's cart, or a guest cart named by the X-Cart-Id header.
+# Items are addressed by product id (an item's id is its product_id).
+def priced(items: List[CartItem]) -> List[dict]:
+    """Current name, price and stock for every line, from one (usually cached) batch lookup"""
+    quotes = pricing.quote(int(item.product_id) for item in items if item.product_id.isdigit())
+    result = []
+    for item in items:
+        quote = quotes.get(int(item.product_id)) if item.product_id.isdigit() else None
+        if quote:
+            item = item.model_copy(update={"name": quote.name, "price": quote.price, "stock": quote.stock})
+        else:
+            item = item.model_copy(update={"stock": 0})  # No longer sold
+        result.append(item.model_dump())
+    return result
+
 @router.get("/cart", tags=["Cart"])
-def get_cart():
-    """Get current user's cart items"""
-    # For now, use a fixed user_id. In production, extract from JWT token
-    user_id = "default_user"
-    cart_items = get_user_cart(user_id)
-    return [item.dict() for item in cart_items]
+def get_cart(key: str = Depends(cart_key)):
+    """Get current user's cart items, priced by product-service"""
+    return priced(cart_store.get(key))
 
 @router.post("/cart", tags=["Cart"])
-def add_to_cart(item: dict):
-    """Add item to cart"""
-    user_id = "default_user"
+def add_to_cart(item: CartItemAdd, key: str = Depends(cart_key)):
+    """Add item to cart; name and price come from product-service, not from the request"""
+    quote = pricing.quote([item.product_id]).get(item.product_id)
+    if not quote:
+        raise HTTPException(status_code=404, detail="Product not found")
     
-    # Create cart item with proper type conversion
     cart_item = CartItem(
-        id=f"cart-{uuid.uuid4()}",
-        product_id=str(item.get("product_id")),  # Convert to string
-        quantity=item.get("quantity", 1),
-        price=float(item.get("price", 100.0)),
-        name=str(item.get("name", "Product")),
-        image=str(item.get("image", "/placeholder.png"))
+        id=str(item.product_id),
+        product_id=str(item.product_id),
+        quantity=item.quantity,
+        price=quote.price,
+        name=quote.name,
+        image=quote.image or item.image or "/placeholder.png"
     )
-    
-    added_item = add_item_to_cart(user_id, cart_item)
-    return added_item.dict()
+    added = cart_store.add(key, cart_item)
+    return added.model_copy(update={"stock": quote.stock}).model_dump()
 
 @router.post("/cart/checkout", tags=["Cart"])
-def checkout_cart():
+def checkout_cart(key: str = Depends(cart_key)):
     """Checkout cart"""
-    user_id = "default_user"
-    clear_cart(user_id)
+    cart_store.clear(key)
     return {"message": "Checkout successful", "success": True}
 
+@router.post("/cart/merge", tags=["Cart"])
+def merge_guest_cart(authorization: Optional[str] = Header(None), x_cart_id: Optional[str] = Header(None)):
+    """At login: move the guest cart named by X-Cart-Id into the signed-in user's cart"""
+    user_key = user_cart_key(authorization)
+    if not user_key:
+        raise HTTPException(status_code=401, detail="Sign in to merge a guest cart")
+    guest_key = guest_cart_key(x_cart_id)
+    if not guest_key:
+        return priced(cart_store.get(user_key))
+    return priced(cart_store.merge(guest_key, user_key))
+
 @router.delete("/cart/{item_id}", tags=["Cart"])
-def remove_cart_item(item_id: str):
+def remove_cart_item(item_id: str, key: str = Depends(cart_key)):
     """Remove item from cart"""
-    user_id = "default_user"
-    success = remove_item_from_cart(user_id, item_id)
+    success = cart_store.remove(key, item_id)
     if not success:
         raise HTTPException(status_code=404, detail="Item not found")
     return {"message": "Item removed", "success": True}
 
 @router.put("/cart/{item_id}", tags=["Cart"])
-def update_cart_item(item_id: str, item: dict):
-    """Update cart item quantity"""
-    user_id = "default_user"
-    quantity = item.get("quantity", 1)
-    success = update_cart_item_quantity(user_id, item_id, quantity)
+def update_cart_item(item_id: str, item: CartItemQuantity, key: str = Depends(cart_key)):
+    """Update cart item quantity; zero or less removes the item"""
+    if item.quantity < 1:
+        success = cart_store.remove(key, item_id)
+    else:
+        success = cart_store.set_quantity(key, item_id, item.quantity)
     if not success:
         raise HTTPException(status_code=404, detail="Item not found")
     return {"message": "Item updated", "success": True}
@@ -153,6 +190,57 @@ def get_top_products(limit: int = 10, db: Session = Depends(get_db)):
     """Get top selling products"""
     return AnalyticsService.get_top_products(db, limit)
 
+@router.get("/analytics/sales/daily", tags=["Analytics"], summary="Get daily sales per product", description="Binary feed of daily sold quantity per product for demand forecasting", status_code=200)
+def get_daily_sales(days: int = Query(90, ge=1, le=365)):
+    """Stream packed little-endian (product_id int32, day uint16, quantity int32) records.
+
+    Day 0 is the date in the X-Sales-Start header; X-Sales-Days gives the window length.
+    """
+    def body():
+        # The session must outlive the handler, so the stream owns it
+        db = SessionLocal()
+        try:
+            yield from AnalyticsService.stream_daily_sales(db, days)
+        finally:
+            db.close()
+
+    start = AnalyticsService.sales_window_start(days)
+    return StreamingResponse(
+        body(),
+        media_type="application/octet-stream",
+        headers={"X-Sales-Start": start.isoformat(), "X-Sales-Days": str(days)}
+    )
+
+@router.get("/analytics/baskets", tags=["Analytics"], summary="Get order baskets", description="Binary feed of products bought together, for co-purchase recommendations", status_code=200)
+def get_order_baskets(
+    after_order_id: int = Query(0, ge=0, description="Only orders with a higher id"),
+    max_orders: int = Query(50000, ge=1, le=500000),
+    settle_seconds: int = Query(60, ge=0, description="Skip orders younger than this; they come in a later batch"),
+    db: Session = Depends(get_db)
+):
+    """Stream packed little-endian (order_id int32, product_id int32) records grouped by order.
+
+    X-Last-Order-Id is the watermark to pass as after_order_id next time; it
+    equals after_order_id when there are no new orders.
+    """
+    last_order_id = AnalyticsService.basket_batch_end(db, after_order_id, max_orders, settle_seconds)
+    if last_order_id is None:
+        last_order_id = after_order_id
+
+    def body():
+        # The session must outlive the handler, so the stream owns it
+        stream_db = SessionLocal()
+        try:
+            yield from AnalyticsService.stream_baskets(stream_db, after_order_id, last_order_id)
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type="application/octet-stream",
+        headers={"X-Last-Order-Id": str(last_order_id)}
+    )
+
 @router.get("/analytics/orders-by-status", tags=["Analytics"], summary="Get orders by status", description="Get order counts grouped by status", status_code=200)
 def get_orders_by_status(db: Session = Depends(get_db)):
     """Get orders by status"""
@@ -0,0 +1,52 @@
+# Service: Order Service
+# Responsibility: Resolve the cart owner from the forwarded JWT or a guest cart id
+# Architecture: FastAPI + python-jose
+
+import re
+from typing import Optional
+from fastapi import Header, HTTPException, status
+from jose import jwt, JWTError
+from app.core.config import settings
+
+_GUEST_CART_ID = re.compile(r"^[A-Za-z0-9-]{16,64}$")
+
+def user_cart_key(authorization: Optional[str]) -> Optional[str]:
+    """``user:<sub>`` for a valid bearer token, None without one; 401 for a bad token"""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    try:
+        if scheme.lower() != "bearer":
+            raise JWTError("not a bearer token")
+        subject = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]).get("sub")
+        if not subject:
+            raise JWTError("token has no subject")
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+    return f"user:{subject}"
+
+def guest_cart_key(cart_id: Optional[str]) -> Optional[str]:
+    if not cart_id:
+        return None
+    if not _GUEST_CART_ID.match(cart_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="X-Cart-Id must be 16-64 letters, digits or dashes"
+        )
+    return f"guest:{cart_id}"
+
+def cart_key(
+    authorization: Optional[str] = Header(None),
+    x_cart_id: Optional[str] = Header(None)
+) -> str:
+    """The signed-in user's cart, or the guest cart named by the X-Cart-Id header"""
+    key = user_cart_key(authorization) or guest_cart_key(x_cart_id)
+    if not key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Sign in or send an X-Cart-Id header"
+        )
+    return key
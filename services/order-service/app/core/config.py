@@ -1,3 +1,4 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +7,29 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Carts: stored in Postgres, or in any Redis-protocol server when CART_BACKEND=redis
+    CART_BACKEND: Literal["postgres", "redis"] = "postgres"
+    REDIS_URL: Optional[str] = None
+    CART_TTL_SECONDS: int = 30 * 24 * 3600  # Signed-in carts, renewed on every change
+    CART_GUEST_TTL_SECONDS: int = 7 * 24 * 3600
+    CART_SWEEP_INTERVAL_SECONDS: float = 3600.0  # Postgres only; Redis expires keys itself
+    BACKGROUND_TASKS_ENABLED: bool = True
+
+    # Server-side pricing: batch lookups against product-service, cached until the catalog change feed says otherwise
+    PRODUCT_SERVICE_URL: str = "http://product-service:8000"
+    PRODUCT_LOOKUP_TIMEOUT_SECONDS: float = 3.0
+    PRODUCT_BATCH_MAX_IDS: int = 200  # product-service's limit per batch call
+    PRICE_CACHE_TTL_SECONDS: float = 30.0  # Upper bound on staleness while the change feed is unreachable
+    PRICE_CACHE_MAX_ITEMS: int = 20000
+    PRICE_INVALIDATION_WAIT_SECONDS: float = 25.0  # Long-poll wait on /products/changes
+
+    # Checkout holds stock with a product-service reservation while the order is written
+    STOCK_RESERVATION_TTL_SECONDS: int = 120  # Only matters when order-service dies mid-checkout
+    STOCK_COMMIT_ATTEMPTS: int = 3
+
+    # Order listings: keyset pages on (created_at, id)
+    ORDERS_PAGE_MAX: int = 1000
+
     class Config:
         env_file = ".env"
 
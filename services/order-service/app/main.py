@@ -4,7 +4,13 @@ import logging
 from app.api.v1.routes import router as order_router
 from app.api.v1.admin_routes import router as admin_router
 from app.db.session import engine, Base
+from app.db.migrate import run_migrations
 from app.models.order import Order, OrderItem
+from app.models.cart import Cart, CartLine
+from app.core.config import settings
+from app.core.tasks import register_task, start_all, stop_all
+from app.services.cart import run_cart_sweep
+from app.services.pricing import pricing, price_invalidator
 
 # Configure logging
 logging.basicConfig(
@@ -28,13 +34,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.CART_BACKEND == "postgres":
+    register_task("cart-sweeper", settings.CART_SWEEP_INTERVAL_SECONDS, run_cart_sweep)
+
 @app.on_event("startup")
 def on_startup():
     logger.info("=== Order Service Starting ===")
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     logger.info("Database tables created/verified")
+    if settings.BACKGROUND_TASKS_ENABLED:
+        start_all()
+        price_invalidator.start()
     logger.info("Order Service ready")
 
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_all()
+    price_invalidator.stop()
+    pricing.close()
+
 app.include_router(order_router, prefix="/api/v1", tags=["orders"])
 app.include_router(admin_router, prefix="/api/v1")
 
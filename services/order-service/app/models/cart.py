@@ -0,0 +1,26 @@
+# Service: Order Service
+# Responsibility: Cart tables for the Postgres cart backend
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from app.db.session import Base
+import datetime
+
+class Cart(Base):
+    """One row per cart; ``key`` is ``user:<email>`` or ``guest:<cart id>``"""
+    __tablename__ = "carts"
+
+    key = Column(String(160), primary_key=True)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Renewed on every change
+
+class CartLine(Base):
+    """One row per product in a cart, so item operations are primary-key lookups"""
+    __tablename__ = "cart_items"
+
+    cart_key = Column(String(160), ForeignKey("carts.key", ondelete="CASCADE"), primary_key=True)
+    product_id = Column(String(64), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    price = Column(Float, nullable=False)
+    name = Column(String, nullable=False)
+    image = Column(String, nullable=False)
+    added_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
@@ -1,59 +1,127 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.orm import Query, Session, selectinload
 from app.models.order import Order, OrderItem
-from app.schemas.order import OrderCreate, OrderUpdate
-from typing import List
+from app.schemas.order import OrderCreate, OrderUpdate, OrderRead, OrderItemRead, OrderSearch
+from typing import List, Optional
+from keyset import Keyset, before
+import datetime
 import uuid
 
+ITEM_COLUMNS = {"product_id", "product_name", "quantity", "price", "image"}
+
+def escape_like(text: str) -> str:
+    """Take LIKE wildcards in user input literally (backslash is PostgreSQL's default escape)"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def apply_search(query: Query, search: OrderSearch) -> Query:
+    """Admin search filters, each answerable from an index (see app/db/migrate.py).
+
+    Order numbers match by prefix (B-tree, text_pattern_ops); email and name
+    match anywhere, case-insensitively (trigram GIN); ``q`` is any of the three.
+    """
+    if search.q:
+        query = query.filter(or_(
+            Order.order_number.like(escape_like(search.q.upper()) + "%"),
+            Order.user_email.ilike(f"%{escape_like(search.q)}%"),
+            Order.user_name.ilike(f"%{escape_like(search.q)}%"),
+        ))
+    if search.order_number:
+        query = query.filter(Order.order_number.like(escape_like(search.order_number.upper()) + "%"))
+    if search.email:
+        query = query.filter(Order.user_email.ilike(f"%{escape_like(search.email)}%"))
+    if search.name:
+        query = query.filter(Order.user_name.ilike(f"%{escape_like(search.name)}%"))
+    if search.status:
+        query = query.filter(Order.status.in_(search.status))
+    if search.payment_method:
+        query = query.filter(Order.payment_method == search.payment_method)
+    if search.created_from:
+        query = query.filter(Order.created_at >= search.created_from)
+    if search.created_to:
+        query = query.filter(Order.created_at < search.created_to)
+    if search.total_min is not None:
+        query = query.filter(Order.total >= search.total_min)
+    if search.total_max is not None:
+        query = query.filter(Order.total <= search.total_max)
+    return query
+
 class OrderRepository:
     @staticmethod
-    def create_order(db: Session, order: OrderCreate) -> Order:
-        # Generate unique order number
-        order_number = f"ORD-{uuid.uuid4().hex[:8].upper()}"
-        
-        # Calculate total
-        total = sum(item.price * item.quantity for item in order.items)
-        
-        # Create order
-        db_order = Order(
-            order_number=order_number,
-            user_id=order.user_id,
-            user_name=order.user_name,
-            user_email=order.user_email,
-            total=total,
-            shipping_address=order.shipping_address,
-            payment_method=order.payment_method,
-            status="pending"
-        )
-        db.add(db_order)
-        db.flush()  # Get order id without committing
+    def new_order_number() -> str:
+        return f"ORD-{uuid.uuid4().hex[:8].upper()}"
+
+    @staticmethod
+    def insert_order(db: Session, order: OrderCreate, order_number: str) -> OrderRead:
+        """Insert the order and its items in two statements and build the response from the values sent (caller commits).
+
+        Each INSERT returns only the generated ids; the items go as one
+        executemany, which SQLAlchemy batches into multi-row INSERT ... RETURNING.
+        No refresh and no lazy load of ``items`` follow.
+        """
+        now = datetime.datetime.utcnow()
+        header = {
+            "order_number": order_number,
+            "user_id": order.user_id,
+            "user_name": order.user_name,
+            "user_email": order.user_email,
+            "total": sum(item.price * item.quantity for item in order.items),
+            "shipping_address": order.shipping_address,
+            "payment_method": order.payment_method,
+            "status": "pending",
+            "created_at": now,
+            "updated_at": now,
+        }
+        order_id = db.execute(insert(Order).returning(Order.id), header).scalar_one()
         
-        # Create order items
-        for item in order.items:
-            db_item = OrderItem(
-                order_id=db_order.id,
-                product_id=item.product_id,
-                product_name=item.product_name,
-                quantity=item.quantity,
-                price=item.price,
-                image=item.image
-            )
-            db.add(db_item)
+        lines = [{"order_id": order_id, **item.model_dump(include=ITEM_COLUMNS)} for item in order.items]
+        item_ids = []
+        if lines:
+            item_ids = db.execute(
+                insert(OrderItem).returning(OrderItem.id, sort_by_parameter_order=True), lines
+            ).scalars().all()
         
-        db.commit()
-        db.refresh(db_order)
-        return db_order
+        items = [OrderItemRead(id=item_id, **line) for item_id, line in zip(item_ids, lines)]
+        return OrderRead(id=order_id, items=items, **header)
 
     @staticmethod
     def get_order(db: Session, order_id: int) -> Order:
-        return db.query(Order).filter(Order.id == order_id).first()
+        return db.query(Order).options(selectinload(Order.items)).filter(Order.id == order_id).first()
 
     @staticmethod
-    def get_orders(db: Session, skip: int = 0, limit: int = 100) -> List[Order]:
-        return db.query(Order).order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    def list_orders(db: Session, user_id: Optional[int] = None, status: Optional[str] = None,
+                    after: Optional[Keyset] = None, skip: int = 0, limit: int = 100,
+                    summary: bool = False, search: Optional[OrderSearch] = None) -> list:
+        return OrderRepository.listing_query(db, user_id, status, after, skip, limit, summary, search).all()
 
     @staticmethod
-    def get_orders_by_user(db: Session, user_id: int) -> List[Order]:
-        return db.query(Order).filter(Order.user_id == user_id).order_by(Order.created_at.desc()).all()
+    def listing_query(db: Session, user_id: Optional[int] = None, status: Optional[str] = None,
+                      after: Optional[Keyset] = None, skip: int = 0, limit: int = 100,
+                      summary: bool = False, search: Optional[OrderSearch] = None) -> Query:
+        """Newest orders first, ordered by (created_at, id) and optionally filtered by user, status or a search.
+
+        ``after`` is the (created_at, id) of the last order of the previous page
+        (keyset; ``skip`` is only honoured without it). Full rows are Orders with
+        items loaded by one extra SELECT ... IN for the whole page; summary rows
+        carry an ``item_count`` instead and never touch the items.
+        """
+        if summary:
+            item_count = (
+                select(func.count()).where(OrderItem.order_id == Order.id).correlate(Order).scalar_subquery()
+            )
+            query = db.query(Order.__table__, item_count.label("item_count"))
+        else:
+            query = db.query(Order).options(selectinload(Order.items))
+        if user_id is not None:
+            query = query.filter(Order.user_id == user_id)
+        if status is not None:
+            query = query.filter(Order.status == status)
+        if search is not None:
+            query = apply_search(query, search)
+        if after is not None:
+            query = query.filter(before(Order.created_at, Order.id, after))
+        elif skip:
+            query = query.offset(skip)
+        return query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit)
 
     @staticmethod
     def update_order(db: Session, order_id: int, order_update: OrderUpdate) -> Order:
@@ -72,10 +140,3 @@ class OrderRepository:
             db.delete(db_order)
             db.commit()
         return db_order
-    
-    @staticmethod
-    def get_orders_by_status(db: Session, status: str, skip: int = 0, limit: int = 100) -> List[Order]:
-        """Get all orders filtered by status"""
-        return db.query(Order).filter(Order.status == status).offset(skip).limit(limit).all()
-
-
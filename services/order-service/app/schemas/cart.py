@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class CartItemAdd(BaseModel):
+    """Name and price are set from product-service; values sent by the client are ignored"""
+    product_id: int = Field(..., ge=1)
+    quantity: int = Field(1, ge=1)
+    image: Optional[str] = None
+
+class CartItemQuantity(BaseModel):
+    quantity: int = 1  # Zero or less removes the line
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Literal, Optional, List, Union
 import datetime
 
 class OrderItemBase(BaseModel):
@@ -9,8 +9,13 @@ class OrderItemBase(BaseModel):
     price: float
     image: Optional[str] = None
 
-class OrderItemCreate(OrderItemBase):
-    pass
+class OrderItemCreate(BaseModel):
+    """Name, price and image are set from product-service; values sent by the client are ignored"""
+    product_id: int
+    quantity: int = Field(..., ge=1)
+    product_name: Optional[str] = None
+    price: Optional[float] = None
+    image: Optional[str] = None
 
 class OrderItemRead(OrderItemBase):
     id: int
@@ -45,6 +50,35 @@ class OrderRead(OrderBase):
     class Config:
         from_attributes = True
 
+class OrderSummaryRead(OrderBase):
+    """Order header with the number of lines instead of the lines (``view=summary``)"""
+    id: int
+    order_number: str
+    total: float
+    status: str
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+    item_count: int
+
+    class Config:
+        from_attributes = True
+
+class OrderSearch(BaseModel):
+    """Admin order search; every given criterion must match"""
+    q: Optional[str] = Field(None, min_length=3, description="Order number prefix, or part of the customer email or name")
+    order_number: Optional[str] = Field(None, min_length=1, description="Order number prefix")
+    email: Optional[str] = Field(None, min_length=3, description="Part of the customer email")
+    name: Optional[str] = Field(None, min_length=3, description="Part of the customer name")
+    status: Optional[List[str]] = None
+    payment_method: Optional[str] = None
+    created_from: Optional[datetime.datetime] = None
+    created_to: Optional[datetime.datetime] = Field(None, description="Exclusive")
+    total_min: Optional[float] = Field(None, ge=0)
+    total_max: Optional[float] = Field(None, ge=0)
+
+OrderView = Literal["full", "summary"]
+OrderListItem = Union[OrderRead, OrderSummaryRead]
+
 # Legacy schema for backward compatibility
 class OrderOut(OrderRead):
     pass
@@ -5,8 +5,15 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from app.models.order import Order, OrderItem
-from typing import Dict, List
-from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+from datetime import date, datetime, timedelta
+import struct
+
+# Daily sales feed record: product_id int32, day offset uint16, quantity int32 (little-endian)
+SALES_RECORD = struct.Struct("<iHi")
+SALES_EXCLUDED_STATUSES = ("cancelled",)
+# Basket feed record: order_id int32, product_id int32 (little-endian)
+BASKET_RECORD = struct.Struct("<ii")
 
 class AnalyticsService:
     """Service for analytics and statistics"""
@@ -100,6 +107,77 @@ class AnalyticsService:
             for r in results
         ]
     
+    @staticmethod
+    def sales_window_start(days: int) -> date:
+        return datetime.utcnow().date() - timedelta(days=days - 1)
+
+    @staticmethod
+    def stream_daily_sales(db: Session, days: int = 90, chunk_rows: int = 50000) -> Iterator[bytes]:
+        """Yield packed (product_id, day, quantity) records for the last ``days`` days.
+
+        ``day`` counts from ``sales_window_start(days)``. Rows are aggregated in
+        SQL and read with a server-side cursor, so memory stays flat however
+        many SKUs and days are covered.
+        """
+        start = AnalyticsService.sales_window_start(days)
+        day = (func.date(Order.created_at) - start).label("day")
+        query = db.query(
+            OrderItem.product_id,
+            day,
+            func.sum(OrderItem.quantity).label("quantity")
+        ).join(Order, Order.id == OrderItem.order_id).filter(
+            Order.created_at >= datetime.combine(start, datetime.min.time()),
+            Order.status.notin_(SALES_EXCLUDED_STATUSES)
+        ).group_by(OrderItem.product_id, day).execution_options(yield_per=chunk_rows)
+
+        buffer = []
+        for product_id, offset, quantity in query:
+            buffer.append(SALES_RECORD.pack(product_id, offset, quantity))
+            if len(buffer) >= chunk_rows:
+                yield b"".join(buffer)
+                buffer = []
+        if buffer:
+            yield b"".join(buffer)
+
+    @staticmethod
+    def basket_batch_end(db: Session, after_order_id: int, max_orders: int, settle_seconds: int) -> Optional[int]:
+        """Highest order id of the next batch of at most ``max_orders`` orders after ``after_order_id``.
+
+        Orders younger than ``settle_seconds`` are left for a later batch: an
+        order id is allocated before its transaction commits, so a reader that
+        advanced past a fresh id could miss a slower, lower-numbered order.
+        """
+        batch = db.query(Order.id).filter(
+            Order.id > after_order_id,
+            Order.created_at < datetime.utcnow() - timedelta(seconds=settle_seconds)
+        ).order_by(Order.id).limit(max_orders).subquery()
+        return db.query(func.max(batch.c.id)).scalar()
+
+    @staticmethod
+    def stream_baskets(db: Session, after_order_id: int, last_order_id: int,
+                       chunk_rows: int = 50000) -> Iterator[bytes]:
+        """Yield packed (order_id, product_id) records for orders in (after_order_id, last_order_id].
+
+        Records are grouped by order (ascending order_id) with each product
+        listed once per order; cancelled orders are skipped.
+        """
+        query = db.query(OrderItem.order_id, OrderItem.product_id).join(
+            Order, Order.id == OrderItem.order_id
+        ).filter(
+            OrderItem.order_id > after_order_id,
+            OrderItem.order_id <= last_order_id,
+            Order.status.notin_(SALES_EXCLUDED_STATUSES)
+        ).distinct().order_by(OrderItem.order_id, OrderItem.product_id).execution_options(yield_per=chunk_rows)
+
+        buffer = []
+        for order_id, product_id in query:
+            buffer.append(BASKET_RECORD.pack(order_id, product_id))
+            if len(buffer) >= chunk_rows:
+                yield b"".join(buffer)
+                buffer = []
+        if buffer:
+            yield b"".join(buffer)
+
     @staticmethod
     def get_orders_by_status(db: Session) -> Dict:
         """Get order counts by status"""
@@ -1,61 +1,246 @@
 # Service: Order Service
-# Cart storage with in-memory implementation
-# For production, should use database or Redis
+# Responsibility: Cart storage behind a pluggable backend (Postgres or Redis protocol)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
-from typing import Dict, List
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import List, Optional
 from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
 
 class CartItem(BaseModel):
-    id: str
+    id: str  # Equal to product_id: a cart holds one line per product
     product_id: str
     quantity: int
     price: float
     name: str
     image: str
+    stock: Optional[int] = None  # Filled in when the cart is priced, not stored
+
+def cart_ttl(key: str) -> int:
+    return settings.CART_GUEST_TTL_SECONDS if key.startswith("guest:") else settings.CART_TTL_SECONDS
+
+class CartStore(ABC):
+    """Carts keyed by owner (``user:<email>`` / ``guest:<id>``), one line per product.
+
+    Every operation addresses a line by product id, is atomic on its own, and
+    renews the cart's time to live; carts nobody touches expire.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> List[CartItem]:
+        ...
+
+    @abstractmethod
+    def add(self, key: str, item: CartItem) -> CartItem:
+        """Add ``item.quantity`` units, merging with an existing line for the product"""
+
+    @abstractmethod
+    def set_quantity(self, key: str, product_id: str, quantity: int) -> bool:
+        """False if the product is not in the cart"""
+
+    @abstractmethod
+    def remove(self, key: str, product_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def clear(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def merge(self, source: str, target: str) -> List[CartItem]:
+        """Move every line of ``source`` into ``target`` (adding quantities) and drop ``source``"""
+
+    def purge_expired(self) -> int:
+        """Delete expired carts; backends whose keys expire on their own have nothing to do"""
+        return 0
+
+_PG_LINE = "product_id AS id, product_id, quantity, price, name, image"
+
+class PostgresCartStore(CartStore):
+    """Carts in ``carts``/``cart_items``; expired carts are invisible at once and deleted by a periodic sweep"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    @staticmethod
+    def _touch(conn, key: str) -> None:
+        """Start the cart afresh if it expired, then renew its expiry"""
+        now = datetime.utcnow()
+        conn.execute(text("DELETE FROM carts WHERE key = :key AND expires_at <= :now"), {"key": key, "now": now})
+        conn.execute(text("""
+            INSERT INTO carts (key, expires_at) VALUES (:key, :expires_at)
+            ON CONFLICT (key) DO UPDATE SET expires_at = excluded.expires_at
+        """), {"key": key, "expires_at": now + timedelta(seconds=cart_ttl(key))})
+
+    def get(self, key: str) -> List[CartItem]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(f"""
+                SELECT {_PG_LINE} FROM cart_items i JOIN carts c ON c.key = i.cart_key
+                WHERE i.cart_key = :key AND c.expires_at > :now
+                ORDER BY i.added_at, i.product_id
+            """), {"key": key, "now": datetime.utcnow()}).mappings().all()
+        return [CartItem(**row) for row in rows]
+
+    def add(self, key: str, item: CartItem) -> CartItem:
+        with self.engine.begin() as conn:
+            self._touch(conn, key)
+            row = conn.execute(text(f"""
+                INSERT INTO cart_items (cart_key, product_id, quantity, price, name, image, added_at)
+                VALUES (:key, :product_id, :quantity, :price, :name, :image, :now)
+                ON CONFLICT (cart_key, product_id) DO UPDATE SET
+                    quantity = cart_items.quantity + excluded.quantity,
+                    price = excluded.price, name = excluded.name, image = excluded.image
+                RETURNING {_PG_LINE}
+            """), {"key": key, "now": datetime.utcnow(), **item.model_dump(exclude={"id"})}).mappings().one()
+        return CartItem(**row)
+
+    def set_quantity(self, key: str, product_id: str, quantity: int) -> bool:
+        with self.engine.begin() as conn:
+            self._touch(conn, key)
+            updated = conn.execute(text("""
+                UPDATE cart_items SET quantity = :quantity WHERE cart_key = :key AND product_id = :product_id
+            """), {"key": key, "product_id": product_id, "quantity": quantity}).rowcount
+        return updated > 0
+
+    def remove(self, key: str, product_id: str) -> bool:
+        with self.engine.begin() as conn:
+            self._touch(conn, key)
+            deleted = conn.execute(text("""
+                DELETE FROM cart_items WHERE cart_key = :key AND product_id = :product_id
+            """), {"key": key, "product_id": product_id}).rowcount
+        return deleted > 0
+
+    def clear(self, key: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM carts WHERE key = :key"), {"key": key})
+
+    def merge(self, source: str, target: str) -> List[CartItem]:
+        with self.engine.begin() as conn:
+            self._touch(conn, target)
+            conn.execute(text("""
+                INSERT INTO cart_items (cart_key, product_id, quantity, price, name, image, added_at)
+                SELECT :target, i.product_id, i.quantity, i.price, i.name, i.image, i.added_at
+                FROM cart_items i JOIN carts c ON c.key = i.cart_key
+                WHERE i.cart_key = :source AND c.expires_at > :now
+                ON CONFLICT (cart_key, product_id) DO UPDATE SET
+                    quantity = cart_items.quantity + excluded.quantity
+            """), {"source": source, "target": target, "now": datetime.utcnow()})
+            conn.execute(text("DELETE FROM carts WHERE key = :key"), {"key": source})
+        return self.get(target)
+
+    def purge_expired(self) -> int:
+        with self.engine.begin() as conn:
+            return conn.execute(text("DELETE FROM carts WHERE expires_at <= :now"),
+                                {"now": datetime.utcnow()}).rowcount
+
+# Quantity changes only apply to lines that still exist
+_SET_QUANTITY = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+for i = 1, 3 do redis.call('EXPIRE', KEYS[i], ARGV[3]) end
+return 1
+"""
+
+# KEYS: source qty, items, order, target qty, items, order; ARGV: target ttl.
+# Touches two carts, so on Redis Cluster both must hash to the same node.
+_MERGE = """
+local lines = redis.call('HGETALL', KEYS[1])
+for i = 1, #lines, 2 do
+    local product_id = lines[i]
+    redis.call('HINCRBY', KEYS[4], product_id, lines[i + 1])
+    local details = redis.call('HGET', KEYS[2], product_id)
+    if details then redis.call('HSETNX', KEYS[5], product_id, details) end
+    local added = redis.call('ZSCORE', KEYS[3], product_id)
+    redis.call('ZADD', KEYS[6], 'NX', added or 0, product_id)
+end
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3])
+for i = 4, 6 do redis.call('EXPIRE', KEYS[i], ARGV[1]) end
+return #lines / 2
+"""
+
+class RedisCartStore(CartStore):
+    """Three keys per cart: quantities (hash), line details (hash) and insertion order (sorted set).
+
+    Adds are a MULTI of HINCRBY/HSET/ZADD NX, so concurrent adds of one
+    product never lose units; every write renews EXPIRE on all three keys,
+    which is how abandoned carts disappear. Works with any server speaking
+    the Redis protocol.
+    """
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self._set_quantity = self.client.register_script(_SET_QUANTITY)
+        self._merge = self.client.register_script(_MERGE)
+
+    @staticmethod
+    def _keys(key: str) -> List[str]:
+        # The hash tag keeps a cart's keys in one slot on Redis Cluster
+        return [f"cart:{{{key}}}:qty", f"cart:{{{key}}}:items", f"cart:{{{key}}}:order"]
+
+    def _expire(self, pipe, key: str) -> None:
+        for name in self._keys(key):
+            pipe.expire(name, cart_ttl(key))
+
+    def get(self, key: str) -> List[CartItem]:
+        qty_key, items_key, order_key = self._keys(key)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(qty_key)
+        pipe.hgetall(items_key)
+        pipe.zrange(order_key, 0, -1)
+        quantities, details, order = pipe.execute()
+        return [CartItem(id=pid, product_id=pid, quantity=int(quantities[pid]), **json.loads(details[pid]))
+                for pid in order if pid in quantities and pid in details]
+
+    def add(self, key: str, item: CartItem) -> CartItem:
+        qty_key, items_key, order_key = self._keys(key)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hincrby(qty_key, item.product_id, item.quantity)
+        pipe.hset(items_key, item.product_id, json.dumps({"price": item.price, "name": item.name, "image": item.image}))
+        pipe.zadd(order_key, {item.product_id: time.time()}, nx=True)
+        self._expire(pipe, key)
+        quantity = pipe.execute()[0]
+        return item.model_copy(update={"id": item.product_id, "quantity": quantity})
+
+    def set_quantity(self, key: str, product_id: str, quantity: int) -> bool:
+        return bool(self._set_quantity(keys=self._keys(key), args=[product_id, quantity, cart_ttl(key)]))
+
+    def remove(self, key: str, product_id: str) -> bool:
+        qty_key, items_key, order_key = self._keys(key)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hdel(qty_key, product_id)
+        pipe.hdel(items_key, product_id)
+        pipe.zrem(order_key, product_id)
+        self._expire(pipe, key)
+        return bool(pipe.execute()[0])
+
+    def clear(self, key: str) -> None:
+        self.client.delete(*self._keys(key))
+
+    def merge(self, source: str, target: str) -> List[CartItem]:
+        self._merge(keys=self._keys(source) + self._keys(target), args=[cart_ttl(target)])
+        return self.get(target)
+
+def create_cart_store() -> CartStore:
+    if settings.CART_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("CART_BACKEND=redis requires REDIS_URL")
+        return RedisCartStore(settings.REDIS_URL)
+    return PostgresCartStore(engine)
+
+cart_store = create_cart_store()
 
-# In-memory cart storage (user_id -> cart items)
-# In production, use Redis or database
-cart_storage: Dict[str, List[CartItem]] = {}
-
-def get_user_cart(user_id: str) -> List[CartItem]:
-    """Get cart items for a user"""
-    return cart_storage.get(user_id, [])
-
-def add_item_to_cart(user_id: str, item: CartItem) -> CartItem:
-    """Add item to user's cart"""
-    if user_id not in cart_storage:
-        cart_storage[user_id] = []
-    
-    # Check if item already exists
-    for existing_item in cart_storage[user_id]:
-        if existing_item.product_id == item.product_id:
-            existing_item.quantity += item.quantity
-            return existing_item
-    
-    # Add new item
-    cart_storage[user_id].append(item)
-    return item
-
-def remove_item_from_cart(user_id: str, item_id: str) -> bool:
-    """Remove item from cart"""
-    if user_id not in cart_storage:
-        return False
-    
-    cart_storage[user_id] = [item for item in cart_storage[user_id] if item.id != item_id]
-    return True
-
-def update_cart_item_quantity(user_id: str, item_id: str, quantity: int) -> bool:
-    """Update cart item quantity"""
-    if user_id not in cart_storage:
-        return False
-    
-    for item in cart_storage[user_id]:
-        if item.id == item_id:
-            item.quantity = quantity
-            return True
-    return False
-
-def clear_cart(user_id: str) -> None:
-    """Clear user's cart"""
-    if user_id in cart_storage:
-        cart_storage[user_id] = []
+def run_cart_sweep() -> None:
+    """Periodic job: delete expired Postgres carts (they are already hidden from reads)"""
+    purged = cart_store.purge_expired()
+    if purged:
+        logger.info(f"Purged {purged} expired carts")
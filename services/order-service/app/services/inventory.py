@@ -0,0 +1,97 @@
+# Service: Order Service
+# Responsibility: Hold product-service stock for an order while it is written (reserve, commit, release)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+from typing import Dict, Iterable
+import httpx
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.schemas.order import OrderItemCreate
+from app.services.pricing import pricing
+
+logger = logging.getLogger(__name__)
+
+
+class StockReservations:
+    """Client for product-service's atomic stock reservations.
+
+    Checkout reserves every line in one call before the order is written,
+    commits the reservation just before the order's own transaction
+    commits, and releases it if anything in between fails. A reservation
+    that is never committed or released expires on product-service after
+    ``ttl_seconds`` and its stock goes back on sale.
+    """
+
+    def __init__(self, client: httpx.Client, ttl_seconds: int, commit_attempts: int):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.commit_attempts = commit_attempts
+
+    def reserve(self, items: Iterable[OrderItemCreate], order_ref: str) -> str:
+        """Reserve all lines or none; returns the reservation id. 409 on a shortfall, 503 if unreachable"""
+        quantities: Dict[int, int] = {}
+        for item in items:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+        body = {
+            "items": [{"product_id": pid, "quantity": quantity} for pid, quantity in quantities.items()],
+            "ttl_seconds": self.ttl_seconds,
+            "order_ref": order_ref,
+        }
+        response = self._post("/api/v1/inventory/reservations", json=body)
+        detail = response.json().get("detail") if response.status_code in (404, 409) else None
+        if isinstance(detail, dict):
+            # product-service names the first product it could not reserve
+            if response.status_code == status.HTTP_404_NOT_FOUND:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail=f"Unknown products: {detail.get('product_id')}")
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail=f"Insufficient stock for products: {detail.get('product_id')}")
+        self._check(response)
+        return response.json()["id"]
+
+    def commit(self, reservation_id: str) -> None:
+        """Consume the reservation; committing twice is harmless, so transport errors are retried.
+
+        409 if it expired or was released meanwhile, 503 if product-service stays unreachable.
+        """
+        for attempt in range(1, self.commit_attempts + 1):
+            try:
+                response = self.client.post(f"/api/v1/inventory/reservations/{reservation_id}/commit")
+                break
+            except httpx.HTTPError as e:
+                if attempt == self.commit_attempts:
+                    logger.error(f"Committing reservation {reservation_id} failed: {e}")
+                    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                        detail="Product service unavailable")
+        if response.status_code == status.HTTP_409_CONFLICT:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="Stock reservation expired, please place the order again")
+        self._check(response)
+
+    def release(self, reservation_id: str) -> None:
+        """Give the stock back; best effort, since an unreleased reservation expires on its own"""
+        try:
+            response = self.client.post(f"/api/v1/inventory/reservations/{reservation_id}/release")
+            if response.status_code >= 400:
+                logger.warning(f"Releasing reservation {reservation_id}: HTTP {response.status_code}")
+        except httpx.HTTPError as e:
+            logger.warning(f"Releasing reservation {reservation_id} failed, it will expire: {e}")
+
+    def _post(self, url: str, **kwargs) -> httpx.Response:
+        try:
+            return self.client.post(url, **kwargs)
+        except httpx.HTTPError as e:
+            logger.error(f"Stock reservation failed: {e}")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Product service unavailable")
+
+    @staticmethod
+    def _check(response: httpx.Response) -> None:
+        if response.status_code >= 400:
+            logger.error(f"Stock reservation call {response.request.url.path}: HTTP {response.status_code}")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Product service unavailable")
+
+
+# Shares the pooled keep-alive client of the price lookups
+stock = StockReservations(pricing.client, settings.STOCK_RESERVATION_TTL_SECONDS,
+                          settings.STOCK_COMMIT_ATTEMPTS)
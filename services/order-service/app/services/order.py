@@ -1,25 +1,91 @@
 from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.core.config import settings
 from app.repositories.order import OrderRepository
-from app.schemas.order import OrderCreate, OrderUpdate
-from typing import List
+from app.schemas.order import OrderCreate, OrderUpdate, OrderRead, OrderSearch
+from app.services.inventory import stock
+from app.services.pricing import pricing
+from typing import Dict, List, Optional, Tuple
 from app.models.order import Order
+from keyset import InvalidCursor, decode_cursor, next_page
+import logging
+
+logger = logging.getLogger(__name__)
 
 class OrderService:
     @staticmethod
-    def create_order(db: Session, order: OrderCreate) -> Order:
-        return OrderRepository.create_order(db, order)
+    def price_order(order: OrderCreate) -> OrderCreate:
+        """Replace client-supplied names and prices with product-service's (one batch lookup for all lines)"""
+        quotes = pricing.quote(item.product_id for item in order.items)
+        unknown = [item.product_id for item in order.items if item.product_id not in quotes]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown products: {', '.join(map(str, unknown))}"
+            )
+        # Lines repeating a product draw on the same stock
+        wanted: Dict[int, int] = {}
+        for item in order.items:
+            wanted[item.product_id] = wanted.get(item.product_id, 0) + item.quantity
+        short = [pid for pid, quantity in wanted.items() if quantity > quotes[pid].stock]
+        if short:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Insufficient stock for products: {', '.join(map(str, short))}"
+            )
+        items = [
+            item.model_copy(update={
+                "product_name": quotes[item.product_id].name,
+                "price": quotes[item.product_id].price,
+                "image": quotes[item.product_id].image or item.image,
+            })
+            for item in order.items
+        ]
+        return order.model_copy(update={"items": items})
 
     @staticmethod
-    def get_order(db: Session, order_id: int) -> Order:
-        return OrderRepository.get_order(db, order_id)
+    def create_order(db: Session, order: OrderCreate) -> OrderRead:
+        """Price the order, hold its stock on product-service, then write it.
+
+        The reservation is committed before the order's transaction, so a
+        failure in between can only leave stock consumed without an order
+        (logged with the order number), never an order whose stock was sold
+        twice. Anything that fails earlier releases the reservation.
+        """
+        priced = OrderService.price_order(order)
+        order_number = OrderRepository.new_order_number()
+        reservation_id = stock.reserve(priced.items, order_number)
+        try:
+            created = OrderRepository.insert_order(db, priced, order_number)
+            stock.commit(reservation_id)
+        except Exception:
+            db.rollback()
+            stock.release(reservation_id)
+            raise
+        try:
+            db.commit()
+        except Exception:
+            logger.error(f"Order {order_number} not saved after its stock reservation {reservation_id} was committed")
+            raise
+        return created
 
     @staticmethod
-    def get_orders(db: Session, skip: int = 0, limit: int = 100) -> List[Order]:
-        return OrderRepository.get_orders(db, skip, limit)
+    def get_order(db: Session, order_id: int) -> Order:
+        return OrderRepository.get_order(db, order_id)
 
     @staticmethod
-    def get_orders_by_user(db: Session, user_id: int) -> List[Order]:
-        return OrderRepository.get_orders_by_user(db, user_id)
+    def list_orders(db: Session, user_id: Optional[int] = None, order_status: Optional[str] = None,
+                    cursor: Optional[str] = None, skip: int = 0, limit: int = 100,
+                    view: str = "full", search: Optional[OrderSearch] = None) -> Tuple[list, Optional[str]]:
+        """One page of orders, newest first, and the cursor of the next page (None on the last one)"""
+        limit = min(limit, settings.ORDERS_PAGE_MAX)
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        rows = OrderRepository.list_orders(db, user_id, order_status, after, skip, limit + 1,
+                                           summary=view == "summary", search=search)
+        return next_page(rows, limit)
 
     @staticmethod
     def update_order(db: Session, order_id: int, order_update: OrderUpdate) -> Order:
@@ -29,10 +95,6 @@ class OrderService:
     def delete_order(db: Session, order_id: int) -> Order:
         return OrderRepository.delete_order(db, order_id)
     
-    @staticmethod
-    def get_orders_by_status(db: Session, status: str, skip: int = 0, limit: int = 100) -> List[Order]:
-        return OrderRepository.get_orders_by_status(db, status, skip, limit)
-    
     @staticmethod
     def cancel_order(db: Session, order_id: int, reason: str = None) -> Order:
         """Cancel an order"""
@@ -54,7 +116,7 @@ class OrderService:
     @staticmethod
     def get_order_stats(db: Session) -> dict:
         """Get order statistics for admin dashboard"""
-        orders = OrderRepository.get_orders(db, 0, 10000)
+        orders = OrderRepository.list_orders(db, limit=10000, summary=True)
         
         total_orders = len(orders)
         total_revenue = sum(order.total for order in orders)
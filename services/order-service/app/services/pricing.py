@@ -0,0 +1,157 @@
+# Service: Order Service
+# Responsibility: Server-side prices from product-service (pooled batch lookups, local cache, change-feed invalidation)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional
+import httpx
+from fastapi import HTTPException, status
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = ["name", "price", "stock", "image"]
+
+
+class ProductQuote(NamedTuple):
+    product_id: int
+    name: str
+    price: float
+    stock: int
+    image: Optional[str]
+
+
+class ProductPricing:
+    """Current name, price and stock of products, looked up in batches and cached briefly.
+
+    All cache misses of a call go to product-service in one POST
+    /products/batch (compact form) over a pooled keep-alive client, so a
+    cart costs at most one round trip and usually none. Entries live for
+    ``ttl`` seconds and are dropped early when the catalog change feed
+    reports the product, so the TTL only bounds staleness while the feed
+    is unreachable.
+    """
+
+    def __init__(self, base_url: str, ttl: float, max_items: int, timeout: float):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.client = httpx.Client(base_url=base_url, timeout=timeout,
+                                   limits=httpx.Limits(max_connections=50, max_keepalive_connections=20))
+        self._cache: Dict[int, tuple] = {}  # product_id -> (quote, expires_at)
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a fetch that overlapped one is not cached
+        self._epoch = 0
+
+    def quote(self, product_ids: Iterable[int]) -> Dict[int, ProductQuote]:
+        """Quotes for the products that exist; unknown ids are left out. 503 if product-service is unreachable"""
+        ids = list(dict.fromkeys(int(pid) for pid in product_ids))
+        now = time.monotonic()
+        found: Dict[int, ProductQuote] = {}
+        with self._lock:
+            for pid in ids:
+                entry = self._cache.get(pid)
+                if entry and entry[1] > now:
+                    found[pid] = entry[0]
+            epoch = self._epoch
+        missing = [pid for pid in ids if pid not in found]
+        if not missing:
+            return found
+
+        fetched = {}
+        for start in range(0, len(missing), settings.PRODUCT_BATCH_MAX_IDS):
+            fetched.update(self._fetch(missing[start:start + settings.PRODUCT_BATCH_MAX_IDS]))
+        with self._lock:
+            if epoch == self._epoch:
+                if len(self._cache) + len(fetched) > self.max_items:
+                    self._cache.clear()
+                expires_at = time.monotonic() + self.ttl
+                for pid, quote in fetched.items():
+                    self._cache[pid] = (quote, expires_at)
+        found.update(fetched)
+        return found
+
+    def _fetch(self, product_ids) -> Dict[int, ProductQuote]:
+        try:
+            response = self.client.post("/api/v1/products/batch",
+                                        json={"ids": product_ids, "fields": PRICE_FIELDS, "format": "compact"})
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.error(f"Product lookup failed: {e}")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Product service unavailable")
+        body = response.json()
+        columns = {name: i for i, name in enumerate(body["fields"])}
+        return {
+            row[columns["id"]]: ProductQuote(row[columns["id"]], row[columns["name"]], float(row[columns["price"]]),
+                                             int(row[columns["stock"]] or 0), row[columns["image"]])
+            for row in body["rows"]
+        }
+
+    def invalidate(self, product_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop the given products, or everything"""
+        with self._lock:
+            self._epoch += 1
+            if product_ids is None:
+                self._cache.clear()
+            else:
+                for pid in product_ids:
+                    self._cache.pop(pid, None)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class PriceInvalidator:
+    """Long-polls product-service's catalog change feed and evicts changed products from the price cache"""
+
+    def __init__(self, pricing: ProductPricing, wait: float):
+        self.pricing = pricing
+        self.wait = wait
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="price-invalidator", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.wait + 5)
+
+    def _poll(self, since: Optional[int]) -> Optional[int]:
+        params = {} if since is None else {"since": since, "wait": self.wait}
+        response = self.pricing.client.get("/api/v1/products/changes", params=params, timeout=self.wait + 10)
+        if response.status_code == 410:
+            # Fell behind the change log: nothing cached can be trusted, start over from now
+            self.pricing.invalidate()
+            return None
+        response.raise_for_status()
+        page = response.json()
+        if since is None:
+            # Entries cached before we were following the feed may have missed changes
+            self.pricing.invalidate()
+        changed = [c["entity_id"] for c in page["changes"] if c["entity"] == "product"]
+        if changed:
+            self.pricing.invalidate(changed)
+        return page["next_since"]
+
+    def _run(self) -> None:
+        since = None
+        while not self._stop.is_set():
+            try:
+                since = self._poll(since)
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                logger.warning(f"Catalog change feed unavailable, retrying: {e}")
+                self.pricing.invalidate()
+                since = None
+                self._stop.wait(5.0)
+
+
+pricing = ProductPricing(settings.PRODUCT_SERVICE_URL, settings.PRICE_CACHE_TTL_SECONDS,
+                         settings.PRICE_CACHE_MAX_ITEMS, settings.PRODUCT_LOOKUP_TIMEOUT_SECONDS)
+price_invalidator = PriceInvalidator(pricing, settings.PRICE_INVALIDATION_WAIT_SECONDS)
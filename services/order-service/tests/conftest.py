@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.db.session import Base, SessionLocal, engine
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The DATABASE_URL engine with the service schema; tests using it skip when PostgreSQL is unreachable"""
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip("PostgreSQL is not reachable at DATABASE_URL")
+    import app.main  # noqa: F401  (registers every model)
+    from app.db.migrate import run_migrations
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    return engine
+
+
+@pytest.fixture
+def db(database):
+    """A session whose commits land in an outer transaction that is rolled back after the test"""
+    connection = database.connect()
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
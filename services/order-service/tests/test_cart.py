@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.cart import CartStore, RedisCartStore, cart_ttl
+
+client = TestClient(app)
+GUEST = {"X-Cart-Id": "0123456789abcdef0123"}
+
+
+class FakePipeline:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, *args))
+
+    def execute(self):
+        return [1 for _ in self.calls]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.pipe = FakePipeline()
+
+    def pipeline(self, transaction=True):
+        return self.pipe
+
+
+def test_cart_store_is_abstract():
+    with pytest.raises(TypeError):
+        CartStore()
+
+
+def test_redis_remove_renews_expiry():
+    store = RedisCartStore.__new__(RedisCartStore)
+    store.client = FakeRedis()
+    assert store.remove("guest:abc", "7")
+    expired = [call[1:] for call in store.client.pipe.calls if call[0] == "expire"]
+    assert expired == [(name, cart_ttl("guest:abc")) for name in store._keys("guest:abc")]
+
+
+@pytest.mark.parametrize("body", [
+    {"product_id": 1, "quantity": "two"},
+    {"product_id": 1, "quantity": 0},
+    {"product_id": "abc"},
+    {"quantity": 1},
+])
+def test_add_to_cart_rejects_bad_bodies(body):
+    assert client.post("/api/v1/cart", json=body, headers=GUEST).status_code == 422
+
+
+def test_update_cart_item_rejects_a_non_numeric_quantity():
+    assert client.put("/api/v1/cart/1", json={"quantity": "two"}, headers=GUEST).status_code == 422
@@ -0,0 +1,120 @@
+import json
+import re
+import uuid
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.models.order import Order
+from app.repositories.order import OrderRepository
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services import order as order_service
+from app.services.inventory import StockReservations
+from app.services.order import OrderService
+from app.services.pricing import ProductPricing
+
+USER_ID = 876543210
+RESERVATION_URL = re.compile(r"^/api/v1/inventory/reservations/(\w+)/(commit|release)$")
+
+
+class ProductService:
+    """Batch lookups and stock reservations over an in-memory stock table"""
+
+    def __init__(self, stock):
+        self.stock = dict(stock)
+        self.quoted = {}  # Stock the batch lookup reports instead, e.g. from a stale cache
+        self.reservations = {}
+        self.commit_failures = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/api/v1/products/batch":
+            rows = [[pid, f"Product {pid}", 10.0, self.quoted.get(pid, self.stock[pid]), None]
+                    for pid in json.loads(request.content)["ids"] if pid in self.stock]
+            return httpx.Response(200, json={"fields": ["id", "name", "price", "stock", "image"], "rows": rows})
+        if path == "/api/v1/inventory/reservations":
+            body = json.loads(request.content)
+            for item in body["items"]:
+                if item["quantity"] > self.stock[item["product_id"]]:
+                    return httpx.Response(409, json={"detail": {"message": "Insufficient stock",
+                                                                "product_id": item["product_id"]}})
+            for item in body["items"]:
+                self.stock[item["product_id"]] -= item["quantity"]
+            reservation_id = uuid.uuid4().hex
+            self.reservations[reservation_id] = {"status": "pending", **body}
+            return httpx.Response(201, json={"id": reservation_id, "status": "pending"})
+        reservation_id, action = RESERVATION_URL.match(path).groups()
+        reservation = self.reservations[reservation_id]
+        if action == "commit":
+            if self.commit_failures:
+                self.commit_failures -= 1
+                raise httpx.ConnectError("reset", request=request)
+            reservation["status"] = "committed"
+        elif reservation["status"] == "pending":
+            reservation["status"] = "released"
+            for item in reservation["items"]:
+                self.stock[item["product_id"]] += item["quantity"]
+        return httpx.Response(200, json={"id": reservation_id, "status": reservation["status"]})
+
+
+@pytest.fixture
+def product_service(monkeypatch):
+    service = ProductService({1: 5, 2: 1})
+    client = httpx.Client(base_url="http://product-service", transport=httpx.MockTransport(service))
+    pricing = ProductPricing("http://product-service", ttl=0.0, max_items=100, timeout=1.0)
+    pricing.client = client
+    monkeypatch.setattr(order_service, "pricing", pricing)
+    monkeypatch.setattr(order_service, "stock", StockReservations(client, ttl_seconds=60, commit_attempts=2))
+    return service
+
+
+def order(*lines):
+    return OrderCreate(user_id=USER_ID, shipping_address="1 Test Street", payment_method="cod",
+                       items=[OrderItemCreate(product_id=pid, quantity=quantity, price=0.01, product_name="x")
+                              for pid, quantity in lines])
+
+
+def _orders(db):
+    return db.query(Order).filter(Order.user_id == USER_ID).all()
+
+
+def test_order_consumes_a_committed_reservation(db, product_service):
+    product_service.commit_failures = 1  # Transport errors on commit are retried
+    created = OrderService.create_order(db, order((1, 2), (2, 1), (1, 1)))
+    [reservation] = product_service.reservations.values()
+    assert reservation["status"] == "committed"
+    assert reservation["order_ref"] == created.order_number
+    assert sorted((i["product_id"], i["quantity"]) for i in reservation["items"]) == [(1, 3), (2, 1)]
+    assert product_service.stock == {1: 2, 2: 0}
+    assert [o.order_number for o in _orders(db)] == [created.order_number]
+
+
+def test_shortfall_at_reservation_writes_nothing(db, product_service):
+    # The quote still shows stock, but the reservation is what decides
+    product_service.stock[2] = 0
+    product_service.quoted[2] = 1
+    with pytest.raises(HTTPException) as e:
+        OrderService.create_order(db, order((2, 1)))
+    assert e.value.status_code == 409
+    assert product_service.reservations == {}
+    assert _orders(db) == []
+
+
+def test_failed_commit_releases_the_stock_and_rolls_back(db, product_service):
+    product_service.commit_failures = 2
+    with pytest.raises(HTTPException) as e:
+        OrderService.create_order(db, order((1, 2)))
+    assert e.value.status_code == 503
+    assert [r["status"] for r in product_service.reservations.values()] == ["released"]
+    assert product_service.stock[1] == 5
+    assert _orders(db) == []
+
+
+def test_failed_insert_releases_the_stock(db, product_service, monkeypatch):
+    def broken_insert(*args):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(OrderRepository, "insert_order", staticmethod(broken_insert))
+    with pytest.raises(RuntimeError):
+        OrderService.create_order(db, order((1, 1)))
+    assert [r["status"] for r in product_service.reservations.values()] == ["released"]
+    assert product_service.stock[1] == 5
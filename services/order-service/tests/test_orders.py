@@ -0,0 +1,98 @@
+import datetime
+import uuid
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from app.models.order import Order, OrderItem
+from app.repositories.order import OrderRepository
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services.order import OrderService
+
+T0 = datetime.datetime(2026, 3, 1, 12, 0, 0)
+USER_ID = 987654321
+
+
+@pytest.fixture
+def orders(db):
+    """Seven orders of one user; five share a timestamp, so page boundaries fall inside the tie"""
+    created = [datetime.datetime(2026, 3, 1, 12, 0, 1), T0, T0, T0, T0, T0, datetime.datetime(2026, 2, 1)]
+    rows = [
+        Order(order_number=f"TEST-{uuid.uuid4().hex[:12]}", user_id=USER_ID, total=10.0 * (i + 1),
+              status="pending" if i % 2 else "confirmed", shipping_address="1 Test St", payment_method="cod",
+              created_at=at, updated_at=at,
+              items=[OrderItem(product_id=i + 1, product_name=f"Item {i}", quantity=i + 1, price=10.0)])
+        for i, at in enumerate(created)
+    ]
+    db.add_all(rows)
+    db.flush()
+    return sorted(rows, key=lambda r: (r.created_at, r.id), reverse=True)
+
+
+def _walk(db, limit, **filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page, cursor = OrderService.list_orders(db, user_id=USER_ID, cursor=cursor, limit=limit, **filters)
+        ids += [o.id for o in page]
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 50])
+def test_pages_cover_equal_timestamps_exactly_once(db, orders, limit):
+    ids, pages = _walk(db, limit)
+    assert ids == [o.id for o in orders]
+    assert pages == max(1, -(-len(orders) // limit))
+
+
+def test_summary_pages_count_items(db, orders):
+    ids, _ = _walk(db, 3, view="summary")
+    assert ids == [o.id for o in orders]
+    page, _ = OrderService.list_orders(db, user_id=USER_ID, limit=50, view="summary")
+    assert [row.item_count for row in page] == [1] * len(orders)
+
+
+def test_pages_filtered_by_status(db, orders):
+    ids, _ = _walk(db, 2, order_status="pending")
+    assert ids == [o.id for o in orders if o.status == "pending"]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm9waXBl"])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        OrderService.list_orders(None, cursor=cursor)
+    assert e.value.status_code == 400
+
+
+@pytest.fixture
+def statements(database):
+    """SQL statements sent to the database during the test"""
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+    event.listen(database, "before_cursor_execute", record)
+    yield sent
+    event.remove(database, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize("lines", [1, 100])
+def test_insert_order_is_two_statements_with_ids_in_line_order(db, statements, lines):
+    order = OrderCreate(user_id=USER_ID, user_email="a@example.com", shipping_address="1 Test St", payment_method="cod",
+                        items=[OrderItemCreate(product_id=1000 + i, quantity=i % 3 + 1, price=2.5, product_name=f"P{i}")
+                               for i in range(lines)])
+    number = OrderRepository.new_order_number()
+    db.connection()  # Opens the test savepoint first
+    statements.clear()
+    created = OrderRepository.insert_order(db, order, number)
+    assert [s.split()[0] for s in statements] == ["INSERT", "INSERT"]
+
+    assert created.order_number == number and created.status == "pending"
+    assert created.total == sum(2.5 * (i % 3 + 1) for i in range(lines))
+    assert [(i.product_id, i.quantity) for i in created.items] == [(1000 + i, i % 3 + 1) for i in range(lines)]
+    stored = {item.id: item for item in db.query(OrderItem).filter(OrderItem.order_id == created.id)}
+    assert len(stored) == lines
+    for item in created.items:
+        assert (stored[item.id].product_id, stored[item.id].product_name) == (item.product_id, item.product_name)
+    header = db.get(Order, created.id)
+    assert (header.order_number, header.total, header.created_at) == (number, created.total, created.created_at)
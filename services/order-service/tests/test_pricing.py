@@ -0,0 +1,101 @@
+import json
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.schemas.order import OrderCreate, OrderItemCreate
+from app.services import order as order_service
+from app.services.order import OrderService
+from app.services.pricing import ProductPricing
+
+CATALOG = {1: ("Phone", 199.0, 3, "/p1.png"), 2: ("Case", 9.5, 10, None)}
+
+
+class ProductService:
+    """Answers POST /products/batch from CATALOG and counts the requests"""
+
+    def __init__(self, on_request=None):
+        self.requests = []
+        self.on_request = on_request
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        ids = json.loads(request.content)["ids"]
+        self.requests.append(ids)
+        if self.on_request:
+            self.on_request(ids)
+        rows = [[pid, *CATALOG[pid]] for pid in ids if pid in CATALOG]
+        return httpx.Response(200, json={"fields": ["id", "name", "price", "stock", "image"], "rows": rows})
+
+
+def make_pricing(handler, ttl=60.0):
+    pricing = ProductPricing("http://product-service", ttl=ttl, max_items=100, timeout=1.0)
+    pricing.client = httpx.Client(base_url="http://product-service", transport=httpx.MockTransport(handler))
+    return pricing
+
+
+def test_quotes_are_cached():
+    service = ProductService()
+    pricing = make_pricing(service)
+    assert pricing.quote([1, 2, 99])[1].price == 199.0
+    assert set(pricing.quote([2, 1])) == {1, 2}
+    assert service.requests == [[1, 2, 99]]
+
+
+def test_invalidation_drops_cached_quotes():
+    service = ProductService()
+    pricing = make_pricing(service)
+    pricing.quote([1, 2])
+    pricing.invalidate([1])
+    pricing.quote([1, 2])
+    assert service.requests == [[1, 2], [1]]
+
+
+def test_fetch_overlapping_an_invalidation_is_not_cached():
+    def product_changes_mid_fetch(ids):
+        if len(service.requests) == 1:
+            pricing.invalidate(ids)
+
+    service = ProductService(on_request=product_changes_mid_fetch)
+    pricing = make_pricing(service)
+    assert pricing.quote([1])[1].name == "Phone"  # Still answered
+    pricing.quote([1])
+    pricing.quote([1])
+    assert service.requests == [[1], [1]]  # Only the second fetch was cached
+
+
+def test_unreachable_product_service_is_a_503():
+    def down(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    with pytest.raises(HTTPException) as e:
+        make_pricing(down).quote([1])
+    assert e.value.status_code == 503
+
+
+def order(*lines):
+    return OrderCreate(user_id=1, shipping_address="1 Test Street", payment_method="cod",
+                       items=[OrderItemCreate(product_id=pid, quantity=quantity, price=0.01, product_name="x")
+                              for pid, quantity in lines])
+
+
+@pytest.fixture
+def catalog_pricing(monkeypatch):
+    monkeypatch.setattr(order_service, "pricing", make_pricing(ProductService()))
+
+
+def test_price_order_uses_product_service_prices(catalog_pricing):
+    priced = OrderService.price_order(order((1, 1), (2, 4)))
+    assert [(i.product_name, i.price, i.image) for i in priced.items] == [("Phone", 199.0, "/p1.png"),
+                                                                        ("Case", 9.5, None)]
+
+
+def test_price_order_rejects_unknown_products(catalog_pricing):
+    with pytest.raises(HTTPException) as e:
+        OrderService.price_order(order((1, 1), (99, 1)))
+    assert e.value.status_code == 400
+
+
+def test_price_order_checks_stock_across_repeated_lines(catalog_pricing):
+    OrderService.price_order(order((1, 3)))
+    with pytest.raises(HTTPException) as e:
+        OrderService.price_order(order((1, 2), (1, 2)))  # 4 of 3 in stock
+    assert e.value.status_code == 409
@@ -0,0 +1,94 @@
+import datetime
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.models.order import Order
+from app.repositories.order import escape_like
+
+T0 = datetime.datetime(2026, 4, 1, 9, 0, 0)
+
+
+@pytest.fixture
+def client(db):
+    from app.api.v1 import admin_routes
+    from app.main import app
+    app.dependency_overrides[admin_routes.get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def tag():
+    return uuid.uuid4().hex[:10]
+
+
+@pytest.fixture
+def orders(db, tag):
+    """Six orders whose emails, names and numbers carry ``tag``; two share a timestamp"""
+    rows = [
+        # (number suffix, email, name, status, payment, created, total)
+        ("A1", f"ann.{tag}@example.com", f"Ann {tag}", "pending", "cod", T0, 20.0),
+        ("A2", f"ann.{tag}@example.com", f"Ann {tag}", "shipped", "card", T0 + datetime.timedelta(days=1), 75.0),
+        ("B1", f"bob.{tag}@example.com", f"Bob {tag}", "delivered", "card", T0 + datetime.timedelta(days=2), 120.0),
+        ("B2", f"bob.{tag}@example.com", f"Bob 100%_off {tag}", "pending", "card", T0 + datetime.timedelta(days=2), 9.5),
+        ("C1", f"cy.{tag}@example.com", f"Cy {tag}", "cancelled", "cod", T0 + datetime.timedelta(days=3), 50.0),
+        ("C2", f"cy.{tag}@example.com", f"Cy 1000off {tag}", "pending", "cod", T0 + datetime.timedelta(days=4), 60.0),
+    ]
+    created = {}
+    for suffix, email, name, status, payment, at, total in rows:
+        order = Order(order_number=f"ORD-{tag.upper()}-{suffix}", user_id=1, user_email=email, user_name=name,
+                      status=status, payment_method=payment, shipping_address="1 Test St", total=total,
+                      created_at=at, updated_at=at)
+        db.add(order)
+        created[suffix] = order
+    db.flush()
+    return created
+
+
+def _search(client, **params):
+    response = client.get("/api/v1/admin/orders/search", params=params)
+    assert response.status_code == 200, response.text
+    return [row["order_number"].rsplit("-", 1)[1] for row in response.json()]
+
+
+def test_escape_like_takes_wildcards_literally():
+    assert escape_like("100%_off\\") == "100\\%\\_off\\\\"
+
+
+def test_text_filters(client, orders, tag):
+    assert _search(client, q=f"ord-{tag}-a") == ["A2", "A1"]  # Number prefix, any case
+    assert _search(client, q=f"BOB.{tag}") == ["B2", "B1"]  # Part of the email, any case
+    assert _search(client, name=f"cy 1000off {tag}") == ["C2"]
+    assert _search(client, email=tag, order_number=f"ORD-{tag.upper()}-C") == ["C2", "C1"]
+    # % and _ in the input are not wildcards
+    assert _search(client, name="100%_off", email=tag) == ["B2"]
+    assert _search(client, order_number=f"ORD-{tag.upper()}_") == []
+
+
+def test_structured_filters(client, orders, tag):
+    assert _search(client, email=tag, status=["pending", "shipped"]) == ["C2", "B2", "A2", "A1"]
+    assert _search(client, email=tag, payment_method="card", total_min=10, total_max=100) == ["A2"]
+    assert _search(client, email=tag, created_from=(T0 + datetime.timedelta(days=1)).isoformat(),
+                   created_to=(T0 + datetime.timedelta(days=3)).isoformat()) == ["B2", "B1", "A2"]
+
+
+def test_views_and_validation(client, orders, tag):
+    summary = client.get("/api/v1/admin/orders/search", params={"email": tag, "limit": 1}).json()[0]
+    assert summary["item_count"] == 0 and "items" not in summary
+    full = client.get("/api/v1/admin/orders/search", params={"email": tag, "limit": 1, "view": "full"}).json()[0]
+    assert full["items"] == []
+    assert client.get("/api/v1/admin/orders/search", params={"q": "ab"}).status_code == 422
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4])
+def test_keyset_pages_walk_every_match_once(client, orders, tag, limit):
+    numbers, cursor = [], None
+    while True:
+        params = {"email": tag, "limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/admin/orders/search", params=params)
+        numbers += [row["order_number"].rsplit("-", 1)[1] for row in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    expected = sorted(orders.values(), key=lambda o: (o.created_at, o.id), reverse=True)
+    assert numbers == [o.order_number.rsplit("-", 1)[1] for o in expected]
@@ -2,17 +2,24 @@
 # Responsibility: Admin-only API endpoints for product management
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
-from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session
-from typing import List
-from app.schemas.product import ProductCreate, ProductUpdate, ProductRead
+from typing import List, Optional
+from app.schemas.product import ProductCreate, ProductUpdate, ProductRead, ProductImportReport, ProductImageUploadRead
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryRead
 from app.services.product import ProductService
 from app.services.category import CategoryService
+from app.services.inventory import InventoryService
+from app.services.image import ImageService
+from app.services.stats import InventoryStatsService
+from app.services.forecast import StockForecastService
+from app.services.related import RelatedProductsService
+from app.services.copurchase import CopurchaseService
+from app.services.wishlist import WishlistService
+from app.services.snapshot import CatalogSnapshotService
+from app.services.feed import ShoppingFeedService
+from app.services.product_import import ProductImportService, detect_format, get_import_job, SUPPORTED_FORMATS
 from app.db.session import SessionLocal
-import os
-import uuid
-from pathlib import Path
 
 router = APIRouter()
 
@@ -23,10 +30,6 @@ def get_db():
     finally:
         db.close()
 
-# Image upload directory
-UPLOAD_DIR = Path("uploads/products")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 @router.post("/admin/products", response_model=ProductRead, tags=["Admin - Products"], 
              summary="Create product (Admin)", description="Create a new product (Admin only)", 
              status_code=status.HTTP_201_CREATED)
@@ -54,34 +57,69 @@ def admin_delete_product(product_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
-@router.post("/admin/products/upload-image", tags=["Admin - Products"],
+@router.post("/admin/products/upload-image", response_model=ProductImageUploadRead, tags=["Admin - Products"],
              summary="Upload product image", description="Upload product image (Admin only)",
              status_code=status.HTTP_200_OK)
 async def upload_product_image(file: UploadFile = File(...)):
-    """Upload product image and return URL"""
-    try:
-        # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1]
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = UPLOAD_DIR / unique_filename
-        
-        # Save file
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        # Return URL accessible through API Gateway at localhost:8080
-        image_url = f"http://localhost:8080/uploads/products/{unique_filename}"
-        return {"image_url": image_url, "filename": unique_filename}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to upload image: {str(e)}")
+    """Upload product image and return its URL and WebP variant URLs
+
+    The body is hashed and copied to disk in chunks on a worker thread, and the
+    variants are rendered in a process pool, so the event loop never blocks.
+    Uploading the same bytes twice returns the already stored image.
+    """
+    return await ImageService().upload(file)
+
+@router.post("/admin/products/import", response_model=ProductImportReport, tags=["Admin - Products"],
+             summary="Bulk import products (Admin)",
+             description="Stream a CSV or NDJSON file and upsert products on SKU in batches (Admin only)",
+             status_code=status.HTTP_200_OK)
+def admin_import_products(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, alias="format", description="csv or ndjson; detected from the file if omitted"),
+    batch_size: int = Query(1000, ge=1, le=4000),
+    max_errors: int = Query(100, ge=0, le=10000),
+    job_id: Optional[str] = Query(None, max_length=64, description="Client-chosen id to poll progress while the import runs"),
+    db: Session = Depends(get_db)
+):
+    """Bulk upsert products from a CSV/NDJSON upload (Admin only)
+
+    The upload is spooled to disk and parsed row by row, so memory use stays
+    constant regardless of file size. Rows without a SKU or failing validation
+    are reported individually and skipped.
+    """
+    fmt = file_format or detect_format(file.filename, file.content_type)
+    if fmt not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Must be one of: {', '.join(SUPPORTED_FORMATS)}")
+    if job_id and get_import_job(job_id):
+        raise HTTPException(status_code=409, detail="Import job id already in use")
+    return ProductImportService(db).run(file.file, fmt, batch_size, max_errors, job_id)
+
+@router.get("/admin/products/import/{job_id}", response_model=ProductImportReport, tags=["Admin - Products"],
+            summary="Get import progress", description="Get progress and row errors of a bulk import (Admin only)",
+            status_code=status.HTTP_200_OK)
+def admin_get_import_job(job_id: str):
+    """Get bulk import progress (Admin only)"""
+    report = get_import_job(job_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return report
 
 @router.put("/admin/products/{product_id}/stock", response_model=ProductRead, tags=["Admin - Products"],
             summary="Update product stock", description="Update product inventory/stock (Admin only)",
             status_code=status.HTTP_200_OK)
 def update_product_stock(product_id: int, stock: int, db: Session = Depends(get_db)):
     """Update product stock (Admin only)"""
-    product = ProductService(db).update_product(product_id, ProductUpdate(stock=stock))
+    product = ProductService(db).update_stock(product_id, stock)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+@router.put("/admin/products/{product_id}/stock/shards", response_model=ProductRead, tags=["Admin - Products"],
+            summary="Shard product stock", description="Split a hot SKU's stock over several counter rows (Admin only)",
+            status_code=status.HTTP_200_OK)
+def update_product_stock_shards(product_id: int, shards: int = Query(..., ge=0, le=64), db: Session = Depends(get_db)):
+    """Spread stock over `shards` counters to reduce row-lock contention on hot SKUs; 0 disables sharding (Admin only)"""
+    product = InventoryService(db).set_shards(product_id, shards)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -112,5 +150,81 @@ def admin_delete_category(category_id: int, db: Session = Depends(get_db)):
             summary="Get product statistics", description="Get product inventory statistics (Admin only)",
             status_code=status.HTTP_200_OK)
 def get_product_stats(db: Session = Depends(get_db)):
-    """Get product statistics (Admin only)"""
-    return ProductService(db).get_product_stats()
+    """Get product statistics with a per-category breakdown (Admin only)"""
+    return InventoryStatsService(db).get_stats()
+
+@router.get("/admin/products/stats/low-stock", tags=["Admin - Products"],
+            summary="Get low-stock products", description="Products ordered by how soon they will run out (Admin only)",
+            status_code=status.HTTP_200_OK)
+def get_low_stock_products(
+    limit: int = Query(20, ge=1, le=200),
+    horizon_days: Optional[float] = Query(None, gt=0, description="Also list products expected to run out within this many days"),
+    db: Session = Depends(get_db)
+):
+    """Low-stock list ordered by estimated days until out of stock, from the stock forecast's sales velocity (Admin only)"""
+    return InventoryStatsService(db).get_low_stock(limit, horizon_days)
+
+@router.get("/admin/products/most-wishlisted", tags=["Admin - Products"],
+            summary="Get most wishlisted products", description="Products by number of users wishlisting them (Admin only)",
+            status_code=status.HTTP_200_OK)
+def get_most_wishlisted(limit: int = Query(20, ge=1, le=200), db: Session = Depends(get_db)):
+    """Merchandising view backed by incrementally maintained counts (Admin only)"""
+    return WishlistService(db).most_wishlisted(limit)
+
+@router.get("/admin/products/forecast", tags=["Admin - Products"],
+            summary="Get reorder forecast", description="Per-SKU sales velocity, days of cover and reorder points from the last forecast run (Admin only)",
+            status_code=status.HTTP_200_OK)
+def get_stock_forecast(
+    needs_reorder: Optional[bool] = Query(None, description="Filter on needs_reorder; all forecast rows when omitted"),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Forecast rows ordered by days of cover, soonest to run out first (Admin only)"""
+    return StockForecastService(db).list(needs_reorder, limit, offset)
+
+@router.post("/admin/products/forecast/run", tags=["Admin - Products"],
+             summary="Run reorder forecast", description="Recompute the stock forecast now instead of waiting for the scheduled run (Admin only)",
+             status_code=status.HTTP_200_OK)
+def run_stock_forecast_now(db: Session = Depends(get_db)):
+    """Run the forecast job synchronously and return its summary and timings (Admin only)"""
+    return StockForecastService(db).run()
+
+@router.post("/admin/products/related/rebuild", tags=["Admin - Products"],
+             summary="Rebuild related products", description="Recompute precomputed related-product lists (Admin only)",
+             status_code=status.HTTP_200_OK)
+def rebuild_related_products(full: bool = Query(False, description="All categories instead of only changed ones"),
+                             db: Session = Depends(get_db)):
+    """Run the related-products job now (Admin only)"""
+    return RelatedProductsService(db).rebuild(full)
+
+@router.post("/admin/products/also-bought/update", tags=["Admin - Products"],
+             summary="Update co-purchase recommendations", description="Ingest new orders into \"customers also bought\" lists (Admin only)",
+             status_code=status.HTTP_200_OK)
+def update_also_bought(full: bool = Query(False, description="Recount the whole order history instead of new orders only"),
+                       db: Session = Depends(get_db)):
+    """Run the co-purchase job now (Admin only)"""
+    return CopurchaseService(db).update(full)
+
+@router.post("/admin/products/snapshot", tags=["Admin - Products"],
+             summary="Build catalog snapshot", description="Write the precompressed catalog snapshot files and manifest now (Admin only)",
+             status_code=status.HTTP_200_OK)
+def build_catalog_snapshot(force: bool = Query(False, description="Rebuild even if the catalog version is unchanged"),
+                           db: Session = Depends(get_db)):
+    """Run the snapshot job now (Admin only)"""
+    return CatalogSnapshotService(db).build(force)
+
+@router.post("/admin/products/feed/generate", tags=["Admin - Products"],
+             summary="Generate shopping feeds", description="Write the full and delta shopping feed files now (Admin only)",
+             status_code=status.HTTP_200_OK)
+def generate_shopping_feed(force: bool = Query(False, description="Regenerate even if the catalog version is unchanged"),
+                           db: Session = Depends(get_db)):
+    """Run the shopping-feed job now (Admin only)"""
+    return ShoppingFeedService(db).generate(force)
+
+@router.post("/admin/products/stats/rebuild", tags=["Admin - Products"],
+             summary="Rebuild product statistics", description="Recompute incremental inventory statistics from products (Admin only)",
+             status_code=status.HTTP_200_OK)
+def rebuild_product_stats(db: Session = Depends(get_db)):
+    """Recompute the per-category stats table from scratch (Admin only)"""
+    return InventoryStatsService(db).rebuild()
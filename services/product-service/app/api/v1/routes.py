@@ -2,16 +2,43 @@
 # Responsibility: API endpoints for product
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
-from fastapi import APIRouter, Depends, status, HTTPException, Query
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from itertools import groupby
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List, Literal, Optional, Union
+import asyncio
+import json
 import logging
-from app.schemas.product import ProductCreate, ProductUpdate, ProductRead
-from app.schemas.wishlist import WishlistCreate, WishlistRead
-from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryRead
-from app.services.product import ProductService
+import os
+from app.schemas.product import (
+    ProductCreate, ProductUpdate, ProductRead, ProductBatchRequest, ProductBatchRead, ProductBatchCompactRead,
+    ProductEventBatch, TrendingProductRead, SpecFacetRead
+)
+from app.schemas.wishlist import (
+    WishlistCreate, WishlistRead, WishlistCheckRequest, WishlistCheckRead, WishlistBulkRequest, WishlistBulkRead
+)
+from app.schemas.inventory import ReservationCreate, ReservationRead
+from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryRead, CategoryTreeNode
+from app.schemas.catalog import CatalogChangesRead
+from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewRead, ReviewPage, RatingSummaryRead
+from app.services.product import ProductService, SPEC_FACETS_CODEC, render_product, render_products
 from app.services.wishlist import WishlistService
-from app.services.category import CategoryService
+from app.services.category import CategoryService, render_category, render_categories, render_category_tree
+from app.services.catalog import CatalogService, changes_listener, read_changes
+from app.services.copurchase import CopurchaseService
+from app.services.review import ReviewService
+from app.services.trending import TrendingService, record_event
+from app.services.feed import FEED_FORMATS, stream_feed
+from app.services.inventory import InventoryService
+from app.services.image import ImageService
+from app.core.auth import AuthUser, current_user
+from app.core.config import settings
+from app.core.static import static_file_response, CACHE_SELECTED_VARIANT
+from app.core.http_cache import (
+    conditional_response, make_etag, CACHE_PRODUCT, CACHE_PRODUCT_LIST, CACHE_CATEGORY
+)
 from app.db.session import SessionLocal
 
 logger = logging.getLogger(__name__)
@@ -25,34 +52,225 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/products", response_model=List[ProductRead], tags=["Products"], summary="List products", description="Get all products", status_code=status.HTTP_200_OK)
-def list_products(db: Session = Depends(get_db)):
+def spec_filters(request: Request) -> Dict[str, List[str]]:
+    """``spec.<key>=<value>`` query parameters; repeating a key accepts any of its values"""
+    filters: Dict[str, List[str]] = {}
+    count = 0
+    for name, value in request.query_params.multi_items():
+        if name.startswith("spec.") and len(name) > 5:
+            filters.setdefault(name[5:], []).append(value)
+            count += 1
+    if count > settings.SPEC_FILTERS_MAX:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {settings.SPEC_FILTERS_MAX} spec filters per request")
+    return filters
+
+@router.get("/products", response_model=List[ProductRead], tags=["Products"], summary="List products", description="Get all products; `spec.<key>=<value>` parameters filter on specifications (e.g. `spec.Size=L&spec.Size=XL&spec.Color=Red`)", status_code=status.HTTP_200_OK)
+def list_products(request: Request, db: Session = Depends(get_db)):
     logger.info("=== List Products Request ===")
-    products = ProductService(db).get_products()
-    logger.info(f"Returning {len(products)} products")
-    return products
+    version, updated_at = CatalogService(db).get_version()
+    filters = spec_filters(request)
+
+    def render():
+        service = ProductService(db)
+        products = service.get_products_by_specs(filters) if filters else service.get_products()
+        logger.info(f"Returning {len(products)} products")
+        return render_products(products)
+    return conditional_response(request, make_etag("catalog", version), CACHE_PRODUCT_LIST, render, updated_at)
+
+@router.get("/products/facets", response_model=List[SpecFacetRead], tags=["Products"], summary="Get specification facets", description="Product counts per specification value for a listing (optionally a category and `spec.<key>=<value>` filters); a filtered attribute still counts its other values", status_code=status.HTTP_200_OK)
+def get_spec_facets(request: Request, category: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    filters = spec_filters(request)
+    version, updated_at = CatalogService(db).get_version()
+    return conditional_response(
+        request, make_etag("catalog", version), CACHE_PRODUCT_LIST,
+        lambda: SPEC_FACETS_CODEC.dump_json(ProductService(db).get_spec_facets(filters, category, version)), updated_at
+    )
 
 @router.get("/products/search", response_model=List[ProductRead], tags=["Products"], summary="Search products", description="Search products by name, description, category, or brand", status_code=status.HTTP_200_OK)
 def search_products(q: str = Query(..., description="Search query"), db: Session = Depends(get_db)):
     return ProductService(db).search_products(q)
 
-@router.get("/products/category/{category}", response_model=List[ProductRead], tags=["Products"], summary="Get products by category", description="Get all products in a category", status_code=status.HTTP_200_OK)
-def get_products_by_category(category: str, db: Session = Depends(get_db)):
-    return ProductService(db).get_products_by_category(category)
+@router.get("/products/batch", response_model=Union[ProductBatchRead, ProductBatchCompactRead], tags=["Products"], summary="Get products by IDs", description="Get many products by ID in one request, with optional field projection", status_code=status.HTTP_200_OK)
+def get_products_batch(
+    ids: str = Query(..., description="Comma-separated product IDs"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    format: Literal["full", "compact"] = Query("full"),
+    db: Session = Depends(get_db)
+):
+    try:
+        product_ids = [int(pid) for pid in ids.split(",") if pid.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not product_ids:
+        raise HTTPException(status_code=400, detail="At least one id is required")
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    return ProductService(db).batch_lookup(product_ids, field_list, format)
+
+@router.post("/products/batch", response_model=Union[ProductBatchRead, ProductBatchCompactRead], tags=["Products"], summary="Get products by IDs", description="Get many products by ID (body form for long ID lists)", status_code=status.HTTP_200_OK)
+def post_products_batch(batch_in: ProductBatchRequest, db: Session = Depends(get_db)):
+    return ProductService(db).batch_lookup(batch_in.ids, batch_in.fields, batch_in.format)
+
+@router.get("/products/trending", response_model=List[TrendingProductRead], tags=["Products"], summary="Get trending products", description="Products with the most recent views and add-to-carts (trending) or views (most-viewed), with exponential decay", status_code=status.HTTP_200_OK)
+def get_trending_products(
+    ranking: Literal["trending", "most-viewed"] = Query("trending"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    return TrendingService(db).top(ranking, limit)
+
+@router.post("/products/events", tags=["Products"], summary="Record product events", description="Record view and add-to-cart events for trending rankings", status_code=status.HTTP_202_ACCEPTED)
+def record_product_events(batch_in: ProductEventBatch):
+    for event in batch_in.events:
+        record_event(event.product_id, event.type)
+    return {"accepted": len(batch_in.events)}
+
+@router.get("/products/changes", response_model=CatalogChangesRead, tags=["Products"], summary="Get catalog changes", description="Products and categories created, updated or deleted after catalog version `since`; `wait` long-polls until something changes. Without `since`, returns the current version to start from. 410 means the log no longer covers `since`: reload the catalog and restart from its version", status_code=status.HTTP_200_OK)
+async def get_catalog_changes(
+    since: Optional[int] = Query(None, ge=0, description="Catalog version already applied by the consumer; omit to get the current version"),
+    limit: int = Query(500, ge=1, le=5000),
+    wait: float = Query(0, ge=0, le=settings.CATALOG_CHANGES_MAX_WAIT_SECONDS, description="Seconds to wait for a change when there is none yet")
+):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    page = await run_in_threadpool(read_changes, since, limit)
+    # NOTIFY only shortens the wait; every wake-up (or slice timeout) re-reads the log
+    while since is not None and not page["changes"] and (remaining := deadline - loop.time()) > 0:
+        await changes_listener.wait_beyond(page["next_since"], min(remaining, 5.0))
+        page = await run_in_threadpool(read_changes, since, limit)
+    return page
+
+@router.get("/products/changes/stream", tags=["Products"], summary="Stream catalog changes", description="Server-sent events, one per catalog version with its changes; resumes from the Last-Event-ID header on reconnect. Not streamed through the API gateway, which buffers responses: use long-polling there", status_code=status.HTTP_200_OK)
+async def stream_catalog_changes(
+    request: Request,
+    since: int = Query(..., ge=0, description="Catalog version already applied by the consumer"),
+    limit: int = Query(500, ge=1, le=5000)
+):
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    # The first read happens before streaming so a stale ``since`` still gets a real 410
+    page = await run_in_threadpool(read_changes, since, limit)
+
+    async def events():
+        nonlocal page
+        while True:
+            for version, changes in groupby(page["changes"], key=lambda change: change.version):
+                data = json.dumps([change.model_dump() for change in changes])
+                yield f"id: {version}\ndata: {data}\n\n"
+            if not page["has_more"]:
+                woken = await changes_listener.wait_beyond(page["next_since"], settings.CATALOG_CHANGES_HEARTBEAT_SECONDS)
+                if await request.is_disconnected():
+                    return
+                if not woken:
+                    yield ": keepalive\n\n"
+            try:
+                page = await run_in_threadpool(read_changes, page["next_since"], limit)
+            except HTTPException:
+                # Log pruned past this consumer while it was connected
+                yield "event: resync\ndata: {}\n\n"
+                return
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/products/feed", tags=["Products"], summary="Get shopping feed", description="Every product as a Google Merchant RSS (xml) or Meta catalog CSV feed, streamed as it is read. Scheduled copies are also published under /uploads/feeds", status_code=status.HTTP_200_OK)
+def get_shopping_feed(format: Literal["xml", "csv"] = Query("xml")):
+    return StreamingResponse(stream_feed(format), media_type=FEED_FORMATS[format],
+                             headers={"Content-Disposition": f'inline; filename="products.{format}"'})
+
+@router.get("/products/images/{filename}", tags=["Products"], summary="Get product image", description="Get a product image or one of its WebP variants", status_code=status.HTTP_200_OK)
+def get_product_image(
+    request: Request,
+    filename: str,
+    w: Optional[int] = Query(None, ge=1, le=4096, description="Smallest WebP variant at least this wide"),
+    variant: Optional[Literal["thumb", "webp"]] = Query(None, description="thumb, or webp for the largest WebP"),
+):
+    path = ImageService().resolve(filename, w, variant)
+    cache_control = CACHE_SELECTED_VARIANT if (w or variant) else None
+    return static_file_response(path, os.stat(path), request.headers, cache_control)
+
+@router.get("/products/category/{category}", response_model=List[ProductRead], tags=["Products"], summary="Get products by category", description="Get all products in a category; accepts the same `spec.<key>=<value>` filters as the product list", status_code=status.HTTP_200_OK)
+def get_products_by_category(category: str, request: Request, db: Session = Depends(get_db)):
+    service = ProductService(db)
+    version, updated_at = CatalogService(db).get_version()
+    filters = spec_filters(request)
+    if filters:
+        return conditional_response(
+            request, make_etag("catalog", version), CACHE_PRODUCT_LIST,
+            lambda: render_products(service.get_products_by_specs(filters, category)), updated_at
+        )
+    return conditional_response(
+        request, make_etag("catalog", version, service.listing_version(category)), CACHE_PRODUCT_LIST,
+        lambda: render_products(service.get_products_by_category(category)), updated_at
+    )
 
 @router.get("/products/{product_id}", response_model=ProductRead, tags=["Products"], summary="Get product", description="Get product by ID", status_code=status.HTTP_200_OK)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(product_id: int, request: Request, db: Session = Depends(get_db)):
     logger.info(f"=== Get Product Request: {product_id} ===")
     product = ProductService(db).get_product(product_id)
     if not product:
         logger.warning(f"Product not found: {product_id}")
         raise HTTPException(status_code=404, detail="Product not found")
     logger.info(f"Product found: {product.name}")
-    return product
+    record_event(product_id, "view")
+    return conditional_response(
+        request, make_etag("product", product.id, product.version), CACHE_PRODUCT,
+        lambda: render_product(product), product.updated_at
+    )
+
+@router.get("/products/{product_id}/related", response_model=List[ProductRead], tags=["Products"], summary="Get related products", description="Precomputed most-similar products (brand, price band, name, specifications) within the category", status_code=status.HTTP_200_OK)
+def get_related_products(product_id: int, request: Request, limit: int = Query(4, ge=1, le=20), db: Session = Depends(get_db)):
+    service = ProductService(db)
+    version, updated_at = CatalogService(db).get_version()
+    product = service.get_product(product_id)
+    listing_version = service.listing_version(product.category) if product else 0
+    return conditional_response(
+        request, make_etag("catalog", version, listing_version), CACHE_PRODUCT_LIST,
+        lambda: render_products(service.get_related_products(product_id, limit)), updated_at
+    )
 
-@router.get("/products/{product_id}/related", response_model=List[ProductRead], tags=["Products"], summary="Get related products", description="Get related products based on category", status_code=status.HTTP_200_OK)
-def get_related_products(product_id: int, limit: int = Query(4, ge=1, le=20), db: Session = Depends(get_db)):
-    return ProductService(db).get_related_products(product_id, limit)
+@router.get("/products/{product_id}/also-bought", response_model=List[ProductRead], tags=["Products"], summary="Get products customers also bought", description="Products most often bought together with this one, from order history", status_code=status.HTTP_200_OK)
+def get_also_bought(product_id: int, request: Request, limit: int = Query(8, ge=1, le=20), db: Session = Depends(get_db)):
+    service = CopurchaseService(db)
+    version, _ = CatalogService(db).get_version()
+    # No Last-Modified: lists change without the catalog changing
+    return conditional_response(
+        request, make_etag("also-bought", version, service.version(), limit), CACHE_PRODUCT_LIST,
+        lambda: render_products(service.also_bought(product_id, limit))
+    )
+
+@router.get("/products/{product_id}/reviews", response_model=ReviewPage, tags=["Reviews"], summary="List reviews", description="Reviews of a product, newest first, optionally only one star rating; pass `next_cursor` back as `cursor` for the next page", status_code=status.HTTP_200_OK)
+def list_reviews(
+    product_id: int,
+    rating: Optional[int] = Query(None, ge=1, le=5),
+    limit: int = Query(20, ge=1),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    return ReviewService(db).list_reviews(product_id, rating, limit, cursor)
+
+@router.get("/products/{product_id}/reviews/summary", response_model=RatingSummaryRead, tags=["Reviews"], summary="Get rating summary", description="Average rating, review count and star histogram, maintained as running totals", status_code=status.HTTP_200_OK)
+def get_rating_summary(product_id: int, db: Session = Depends(get_db)):
+    summary = ReviewService(db).get_summary(product_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return summary
+
+@router.post("/products/{product_id}/reviews", response_model=ReviewRead, tags=["Reviews"], summary="Create review", description="Review a product as the signed-in user (one review per user); updates the product's rating and review count", status_code=status.HTTP_201_CREATED)
+def create_review(product_id: int, review_in: ReviewCreate, user: AuthUser = Depends(current_user),
+                  db: Session = Depends(get_db)):
+    return ReviewService(db).create_review(product_id, user.id, review_in)
+
+@router.put("/products/{product_id}/reviews/{review_id}", response_model=ReviewRead, tags=["Reviews"], summary="Update review", description="Change the rating and/or comment of your own review", status_code=status.HTTP_200_OK)
+def update_review(product_id: int, review_id: int, review_in: ReviewUpdate, user: AuthUser = Depends(current_user),
+                  db: Session = Depends(get_db)):
+    return ReviewService(db).update_review(product_id, review_id, user.id, review_in)
+
+@router.delete("/products/{product_id}/reviews/{review_id}", response_model=ReviewRead, tags=["Reviews"], summary="Delete review", description="Delete your own review and take it out of the product's rating", status_code=status.HTTP_200_OK)
+def delete_review(product_id: int, review_id: int, user: AuthUser = Depends(current_user),
+                  db: Session = Depends(get_db)):
+    return ReviewService(db).delete_review(product_id, review_id, user.id)
 
 @router.post("/products", response_model=ProductRead, tags=["Products"], summary="Create product", description="Create a new product", status_code=status.HTTP_201_CREATED)
 def create_product(product_in: ProductCreate, db: Session = Depends(get_db)):
@@ -72,11 +290,36 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
+# Inventory reservation endpoints (service-to-service, used by checkout)
+@router.post("/inventory/reservations", response_model=ReservationRead, tags=["Inventory"], summary="Reserve stock", description="Atomically reserve stock for several products; all items succeed or none do", status_code=status.HTTP_201_CREATED)
+def reserve_stock(reservation_in: ReservationCreate, db: Session = Depends(get_db)):
+    return InventoryService(db).reserve(reservation_in)
+
+@router.get("/inventory/reservations/{reservation_id}", response_model=ReservationRead, tags=["Inventory"], summary="Get reservation", description="Get a stock reservation by ID", status_code=status.HTTP_200_OK)
+def get_reservation(reservation_id: str, db: Session = Depends(get_db)):
+    return InventoryService(db).get_reservation(reservation_id)
+
+@router.post("/inventory/reservations/{reservation_id}/commit", response_model=ReservationRead, tags=["Inventory"], summary="Commit reservation", description="Consume a pending reservation once the order is placed", status_code=status.HTTP_200_OK)
+def commit_reservation(reservation_id: str, db: Session = Depends(get_db)):
+    return InventoryService(db).commit_reservation(reservation_id)
+
+@router.post("/inventory/reservations/{reservation_id}/release", response_model=ReservationRead, tags=["Inventory"], summary="Release reservation", description="Return the stock of a pending reservation", status_code=status.HTTP_200_OK)
+def release_reservation(reservation_id: str, db: Session = Depends(get_db)):
+    return InventoryService(db).release_reservation(reservation_id)
+
 # Wishlist/Favorites endpoints
 @router.post("/wishlist", response_model=WishlistRead, tags=["Wishlist"], summary="Add to wishlist", description="Add a product to user's wishlist", status_code=status.HTTP_201_CREATED)
 def add_to_wishlist(user_id: int, wishlist_in: WishlistCreate, db: Session = Depends(get_db)):
     return WishlistService(db).add_to_wishlist(user_id, wishlist_in.product_id)
 
+@router.post("/wishlist/{user_id}/bulk-add", response_model=WishlistBulkRead, tags=["Wishlist"], summary="Add many to wishlist", description="Add many products in one statement, e.g. to merge a guest wishlist at login", status_code=status.HTTP_200_OK)
+def bulk_add_to_wishlist(user_id: int, bulk_in: WishlistBulkRequest, db: Session = Depends(get_db)):
+    return WishlistService(db).bulk_add(user_id, bulk_in.product_ids)
+
+@router.post("/wishlist/{user_id}/bulk-remove", response_model=WishlistBulkRead, tags=["Wishlist"], summary="Remove many from wishlist", description="Remove many products in one statement", status_code=status.HTTP_200_OK)
+def bulk_remove_from_wishlist(user_id: int, bulk_in: WishlistBulkRequest, db: Session = Depends(get_db)):
+    return WishlistService(db).bulk_remove(user_id, bulk_in.product_ids)
+
 @router.delete("/wishlist/{user_id}/{product_id}", tags=["Wishlist"], summary="Remove from wishlist", description="Remove a product from user's wishlist", status_code=status.HTTP_200_OK)
 def remove_from_wishlist(user_id: int, product_id: int, db: Session = Depends(get_db)):
     success = WishlistService(db).remove_from_wishlist(user_id, product_id)
@@ -93,14 +336,42 @@ def check_wishlist(user_id: int, product_id: int, db: Session = Depends(get_db))
     is_in_wishlist = WishlistService(db).is_in_wishlist(user_id, product_id)
     return {"is_in_wishlist": is_in_wishlist}
 
+@router.post("/wishlist/{user_id}/check", response_model=WishlistCheckRead, tags=["Wishlist"], summary="Check many products", description="Check which of the given products are in user's wishlist (one call per product grid)", status_code=status.HTTP_200_OK)
+def check_wishlist_many(user_id: int, check_in: WishlistCheckRequest, db: Session = Depends(get_db)):
+    return {"in_wishlist": WishlistService(db).check_many(user_id, check_in.product_ids)}
+
 # Category Management endpoints (Admin only)
 @router.get("/categories", response_model=List[CategoryRead], tags=["Categories"], summary="List categories", description="Get all product categories", status_code=status.HTTP_200_OK)
-def list_categories(skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=100), db: Session = Depends(get_db)):
-    return CategoryService(db).get_all_categories(skip, limit)
+def list_categories(request: Request, skip: int = Query(0, ge=0), limit: int = Query(100, ge=1, le=100), db: Session = Depends(get_db)):
+    version, updated_at = CatalogService(db).get_version()
+    return conditional_response(
+        request, make_etag("catalog", version), CACHE_CATEGORY,
+        lambda: render_categories(CategoryService(db).get_all_categories(skip, limit)), updated_at
+    )
+
+@router.get("/categories/tree", response_model=List[CategoryTreeNode], tags=["Categories"], summary="Get category tree", description="Every category nested under its parent, with product counts for the category itself and its whole subtree", status_code=status.HTTP_200_OK)
+def get_category_tree(request: Request, db: Session = Depends(get_db)):
+    version, updated_at = CatalogService(db).get_version()
+    return conditional_response(
+        request, make_etag("category-tree", version), CACHE_CATEGORY,
+        lambda: render_category_tree(CategoryService(db).get_tree(version)), updated_at
+    )
 
 @router.get("/categories/{category_id}", response_model=CategoryRead, tags=["Categories"], summary="Get category", description="Get category by ID", status_code=status.HTTP_200_OK)
-def get_category(category_id: int, db: Session = Depends(get_db)):
-    return CategoryService(db).get_category_by_id(category_id)
+def get_category(category_id: int, request: Request, db: Session = Depends(get_db)):
+    category = CategoryService(db).get_category_by_id(category_id)
+    return conditional_response(
+        request, make_etag("category", category.id, int(category.updated_at.timestamp() * 1e6)),
+        CACHE_CATEGORY, lambda: render_category(category), category.updated_at
+    )
+
+@router.get("/categories/{category_id}/products", response_model=List[ProductRead], tags=["Categories"], summary="Get products in category tree", description="Products of a category and all of its subcategories", status_code=status.HTTP_200_OK)
+def get_category_tree_products(category_id: int, request: Request, db: Session = Depends(get_db)):
+    version, updated_at = CatalogService(db).get_version()
+    return conditional_response(
+        request, make_etag("category-products", category_id, version), CACHE_PRODUCT_LIST,
+        lambda: render_products(CategoryService(db).get_subtree_products(category_id, version)), updated_at
+    )
 
 @router.post("/categories", response_model=CategoryRead, tags=["Categories"], summary="Create category", description="Create a new product category (Admin only)", status_code=status.HTTP_201_CREATED)
 def create_category(category_in: CategoryCreate, db: Session = Depends(get_db)):
@@ -0,0 +1,35 @@
+# Service: Product Service
+# Responsibility: Resolve the signed-in user from the JWT the gateway verified and forwarded
+# Architecture: FastAPI + python-jose
+
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Header, HTTPException, status
+from jose import jwt, JWTError
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    id: int
+    role: Optional[str] = None
+
+
+def current_user(authorization: Optional[str] = Header(None)) -> AuthUser:
+    """The user of the bearer token; 401 without a valid one.
+
+    Tokens carry the numeric user id in ``uid`` (``sub`` is the email);
+    tokens issued before that claim existed must sign in again.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    try:
+        if scheme.lower() != "bearer":
+            raise JWTError("not a bearer token")
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        return AuthUser(id=int(payload["uid"]), role=payload.get("role"))
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
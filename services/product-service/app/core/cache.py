@@ -0,0 +1,335 @@
+# Service: Product Service
+# Responsibility: Read-through product cache (in-process LRU+TTL tier, optional Redis tier)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import itertools
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from pydantic import TypeAdapter
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISS = object()
+
+
+class LocalTTLCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL"""
+
+    def __init__(self, max_items: int, ttl: float):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISS
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return _MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _Flight:
+    """Per-key lock used to collapse concurrent loads of the same key"""
+    __slots__ = ("lock", "__weakref__")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+
+class ProductCache:
+    """Two-tier read-through cache with versioned namespaces.
+
+    Every key lives in a namespace (``product:<id>``, ``category:<name>``) whose
+    version is part of the storage key. Invalidation bumps the namespace version,
+    so stale entries are never read again on any replica: with Redis the version
+    is shared (``INCR``) and each replica re-reads it at most every
+    ``CACHE_VERSION_TTL_SECONDS``; without Redis the version is process-local.
+
+    Known versions are themselves an LRU of ``max_versions`` namespaces. Without
+    Redis every version is drawn from one process-wide counter, so a namespace
+    that was evicted comes back under a number no entry was ever stored with.
+    A bump that cannot reach Redis pins the namespace locally above the version
+    Redis still has and is replayed on the next refresh, so stale entries are
+    not read again once the pin would otherwise lapse.
+    """
+
+    def __init__(self, local: LocalTTLCache, redis_url: Optional[str] = None,
+                 shared_ttl: int = 300, version_ttl: float = 1.0, max_versions: int = 100000):
+        self.local = local
+        self.redis_url = redis_url
+        self.shared_ttl = shared_ttl
+        self.version_ttl = version_ttl
+        self._redis = None
+        # namespace -> (version, re-read from Redis after); never expires on its own, only LRU-evicted
+        self._versions = LocalTTLCache(max_versions, float("inf"))
+        # Bumps Redis has not seen yet: namespace -> lowest version to serve until it has
+        self._pending: "OrderedDict[str, int]" = OrderedDict()
+        self._max_pending = max_versions
+        self._generation = itertools.count(1)
+        self._versions_lock = threading.Lock()
+        self._flights: "weakref.WeakValueDictionary[str, _Flight]" = weakref.WeakValueDictionary()
+        self._flights_lock = threading.Lock()
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=0.25,
+                                               socket_connect_timeout=0.25)
+        return self._redis
+
+    # Namespace versions
+    def version(self, namespace: str) -> int:
+        return self.versions([namespace])[namespace]
+
+    def bump(self, *namespaces: str) -> None:
+        """Invalidate every entry of the given namespaces on all replicas"""
+        namespaces = list(dict.fromkeys(namespaces))
+        if not namespaces:
+            return
+        if self.redis is None:
+            with self._versions_lock:
+                for namespace in namespaces:
+                    self._versions.set(namespace, (next(self._generation), 0.0))
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for namespace in namespaces:
+                pipe.incr(f"ver:{namespace}")
+            versions = [int(v) for v in pipe.execute()]
+        except Exception as e:
+            logger.warning(f"Cache version bump failed for {len(namespaces)} namespaces, pinning locally: {e}")
+            versions = self._pin(namespaces)
+        expires_at = time.monotonic() + self.version_ttl
+        for namespace, version in zip(namespaces, versions):
+            self._versions.set(namespace, (version, expires_at))
+
+    def _pin(self, namespaces: List[str]) -> List[int]:
+        """Record bumps Redis missed; returns the local versions to serve meanwhile"""
+        versions = []
+        with self._versions_lock:
+            for namespace in namespaces:
+                cached = self._versions.get(namespace)
+                floor = max(cached[0] if cached is not _MISS else 0, self._pending.get(namespace, 0)) + 1
+                self._pending[namespace] = floor
+                self._pending.move_to_end(namespace)
+                versions.append(floor)
+            overflow = len(self._pending) > self._max_pending
+            while len(self._pending) > self._max_pending:
+                self._pending.popitem(last=False)
+        if overflow:
+            # Forgotten pins can no longer hide this replica's stale entries; shared ones age out by TTL
+            self.local.clear()
+        return versions
+
+    def _replay_bumps(self, fresh: Dict[str, int]) -> Dict[str, int]:
+        """INCR the namespaces whose bump Redis missed; their stale entries may be under any older version"""
+        with self._versions_lock:
+            missed = [namespace for namespace in fresh if namespace in self._pending]
+        if not missed:
+            return {}
+        pipe = self.redis.pipeline(transaction=False)
+        for namespace in missed:
+            pipe.incr(f"ver:{namespace}")
+        replayed = dict(zip(missed, (int(v) for v in pipe.execute())))
+        with self._versions_lock:
+            for namespace, version in replayed.items():
+                if version >= self._pending.get(namespace, 0):
+                    self._pending.pop(namespace, None)
+        return replayed
+
+    def versions(self, namespaces: List[str]) -> Dict[str, int]:
+        """Current version of each namespace, with a single MGET for those due a re-read"""
+        now = time.monotonic()
+        result: Dict[str, int] = {}
+        stale: List[str] = []
+        for namespace in namespaces:
+            cached = self._versions.get(namespace)
+            if cached is not _MISS and (self.redis is None or cached[1] > now):
+                result[namespace] = cached[0]
+            elif self.redis is None:
+                with self._versions_lock:
+                    cached = self._versions.get(namespace)
+                    if cached is _MISS:
+                        cached = (next(self._generation), 0.0)
+                        self._versions.set(namespace, cached)
+                result[namespace] = cached[0]
+            else:
+                stale.append(namespace)
+                result[namespace] = cached[0] if cached is not _MISS else 0
+        if stale:
+            fresh: Dict[str, int] = {}
+            try:
+                values = self.redis.mget([f"ver:{ns}" for ns in stale])
+                fresh = {ns: int(v or 0) for ns, v in zip(stale, values)}
+                fresh.update(self._replay_bumps(fresh))
+            except Exception as e:
+                logger.warning(f"Cache version read failed for {len(stale)} namespaces: {e}")
+            with self._versions_lock:
+                for namespace in stale:
+                    version = max(fresh.get(namespace, result[namespace]), self._pending.get(namespace, 0))
+                    result[namespace] = version
+                    self._versions.set(namespace, (version, now + self.version_ttl))
+        return result
+
+    def _storage_key(self, namespace: str, key: str) -> str:
+        return f"{namespace}@{self.version(namespace)}:{key}"
+
+    # Shared tier
+    def _shared_get(self, storage_key: str, codec: TypeAdapter) -> Any:
+        if self.redis is None:
+            return _MISS
+        try:
+            raw = self.redis.get(storage_key)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return _MISS
+        return _MISS if raw is None else codec.validate_json(raw)
+
+    def _shared_set(self, storage_key: str, value: Any, codec: TypeAdapter) -> None:
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(storage_key, codec.dump_json(value), ex=self._jitter(self.shared_ttl))
+        except Exception as e:
+            logger.warning(f"Shared cache write failed: {e}")
+
+    @staticmethod
+    def _jitter(ttl: float) -> int:
+        # Spread expiries so popular keys loaded together do not expire together
+        return max(1, int(ttl * random.uniform(0.9, 1.1)))
+
+    def _flight(self, storage_key: str) -> _Flight:
+        with self._flights_lock:
+            flight = self._flights.get(storage_key)
+            if flight is None:
+                flight = _Flight()
+                self._flights[storage_key] = flight
+            return flight
+
+    def get_or_load(self, namespace: str, key: str, loader: Callable[[], Any],
+                    codec: TypeAdapter) -> Any:
+        """Return the cached value, loading it once per process on a miss.
+
+        Concurrent misses for the same key wait for the first loader instead of
+        all hitting the database. ``None`` results are not cached.
+        """
+        storage_key = self._storage_key(namespace, key)
+        value = self.local.get(storage_key)
+        if value is not _MISS:
+            return value
+
+        flight = self._flight(storage_key)
+        with flight.lock:
+            value = self.local.get(storage_key)
+            if value is not _MISS:
+                return value
+            value = self._shared_get(storage_key, codec)
+            if value is _MISS:
+                value = loader()
+                if value is None:
+                    return None
+                self._shared_set(storage_key, value, codec)
+            self.local.set(storage_key, value, self._jitter(self.local.ttl))
+            return value
+
+    def reload(self, namespace: str, key: str, loader: Callable[[], Any], codec: TypeAdapter) -> Any:
+        """Invalidate ``namespace`` and store a fresh value for one key under the new version.
+
+        For write-through after a database write: ``loader`` runs after the
+        bump, so it sees every write that bumped before it, and a slower
+        concurrent writer can only store under an older version.
+        """
+        self.bump(namespace)
+        storage_key = self._storage_key(namespace, key)
+        value = loader()
+        self._shared_set(storage_key, value, codec)
+        self.local.set(storage_key, value, self._jitter(self.local.ttl))
+        return value
+
+    def get_many(self, entries: Dict[Hashable, Tuple[str, str]],
+                 loader: Callable[[List[Hashable]], Dict[Hashable, Any]],
+                 codec: TypeAdapter) -> Dict[Hashable, Any]:
+        """Batch read-through: local tier, then one shared-tier MGET, then one load for the rest.
+
+        ``entries`` maps a caller id to its ``(namespace, key)``; ``loader`` gets
+        only the ids missing from both tiers and returns the values it found.
+        """
+        versions = self.versions(list({namespace for namespace, _ in entries.values()}))
+        storage_keys = {ident: f"{namespace}@{versions[namespace]}:{key}"
+                        for ident, (namespace, key) in entries.items()}
+        found: Dict[Hashable, Any] = {}
+        missing: List[Hashable] = []
+        for ident, storage_key in storage_keys.items():
+            value = self.local.get(storage_key)
+            if value is _MISS:
+                missing.append(ident)
+            else:
+                found[ident] = value
+
+        if missing and self.redis is not None:
+            try:
+                raw_values = self.redis.mget([storage_keys[ident] for ident in missing])
+            except Exception as e:
+                logger.warning(f"Shared cache read failed: {e}")
+                raw_values = [None] * len(missing)
+            still_missing = []
+            for ident, raw in zip(missing, raw_values):
+                if raw is None:
+                    still_missing.append(ident)
+                else:
+                    found[ident] = codec.validate_json(raw)
+                    self.local.set(storage_keys[ident], found[ident], self._jitter(self.local.ttl))
+            missing = still_missing
+
+        if missing:
+            loaded = loader(missing)
+            if loaded and self.redis is not None:
+                try:
+                    pipe = self.redis.pipeline(transaction=False)
+                    for ident, value in loaded.items():
+                        pipe.set(storage_keys[ident], codec.dump_json(value), ex=self._jitter(self.shared_ttl))
+                    pipe.execute()
+                except Exception as e:
+                    logger.warning(f"Shared cache write failed: {e}")
+            for ident, value in loaded.items():
+                self.local.set(storage_keys[ident], value, self._jitter(self.local.ttl))
+            found.update(loaded)
+        return found
+
+
+product_cache = ProductCache(
+    LocalTTLCache(settings.CACHE_LOCAL_MAX_ITEMS, settings.CACHE_LOCAL_TTL_SECONDS),
+    redis_url=settings.REDIS_URL,
+    shared_ttl=settings.CACHE_SHARED_TTL_SECONDS,
+    version_ttl=settings.CACHE_VERSION_TTL_SECONDS,
+    max_versions=settings.CACHE_VERSION_MAX_ITEMS,
+)
@@ -1,3 +1,4 @@
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,7 +7,104 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Product cache: in-process LRU tier, plus a shared tier when REDIS_URL is set
+    REDIS_URL: Optional[str] = None
+    CACHE_LOCAL_MAX_ITEMS: int = 10000
+    CACHE_LOCAL_TTL_SECONDS: int = 30
+    CACHE_SHARED_TTL_SECONDS: int = 300
+    CACHE_VERSION_TTL_SECONDS: float = 1.0
+    CACHE_VERSION_MAX_ITEMS: int = 100000  # Namespaces whose version is kept in memory (LRU)
+
+    # Upper bound on ids accepted by GET/POST /products/batch
+    PRODUCT_BATCH_MAX_IDS: int = 200
+    SPEC_FILTERS_MAX: int = 20  # spec.<key>=<value> parameters per listing request
+    SPEC_FACET_MAX_VALUES: int = 50  # Values listed per attribute, most common first
+    REVIEWS_PAGE_MAX: int = 50  # Reviews per page of GET /products/{id}/reviews
+
+    # Inventory reservations
+    RESERVATION_TTL_SECONDS: int = 900
+    RESERVATION_MAX_TTL_SECONDS: int = 3600
+    RESERVATION_SWEEP_INTERVAL_SECONDS: float = 5.0
+    RESERVATION_SWEEP_BATCH: int = 500
+
+    # Inventory stats: trigger-maintained per-category totals, or one aggregate query when disabled
+    INVENTORY_STATS_INCREMENTAL: bool = True
+    INVENTORY_STATS_COMPACT_INTERVAL_SECONDS: float = 30.0
+    LOW_STOCK_HORIZON_DAYS: float = 14.0
+
+    # Stock forecast job: daily sales come from order-service
+    ORDER_SERVICE_URL: str = "http://order-service:8000"
+    FORECAST_INTERVAL_SECONDS: float = 3600.0
+    FORECAST_FETCH_TIMEOUT_SECONDS: float = 120.0
+    FORECAST_WINDOW_DAYS: int = 90
+    FORECAST_HALF_LIFE_DAYS: float = 14.0
+    FORECAST_LEAD_TIME_DAYS: float = 7.0
+    FORECAST_REVIEW_DAYS: float = 14.0
+    FORECAST_SERVICE_LEVEL_Z: float = 1.65  # ~95% cycle service level
+
+    # Related products: feature-hashed content vectors, exact top-k within category buckets
+    RELATED_INTERVAL_SECONDS: float = 900.0
+    RELATED_TOP_K: int = 20
+    RELATED_FEATURE_DIMS: int = 256
+    RELATED_MAX_BUCKET: int = 4096
+    RELATED_BLOCK_ELEMENTS: int = 8_000_000  # Similarity scores held in memory per block
+
+    # "Customers also bought": co-purchase counts ingested incrementally from order-service baskets
+    COPURCHASE_INTERVAL_SECONDS: float = 600.0
+    COPURCHASE_FETCH_TIMEOUT_SECONDS: float = 60.0
+    COPURCHASE_BATCH_ORDERS: int = 50000
+    COPURCHASE_SETTLE_SECONDS: int = 60  # Orders younger than this are counted by a later run
+    COPURCHASE_MAX_BASKET: int = 50  # Larger orders add no pairs
+    COPURCHASE_MIN_SUPPORT: int = 2  # Orders a pair needs before it is recommended
+    COPURCHASE_TOP_K: int = 20
+    COPURCHASE_SIMILARITY: Literal["cosine", "lift"] = "cosine"
+
+    # Trending / most-viewed: decayed count-min sketch + Space-Saving counters per replica
+    TRENDING_HALF_LIFE_SECONDS: float = 6 * 3600
+    MOST_VIEWED_HALF_LIFE_SECONDS: float = 7 * 86400
+    TRENDING_CART_WEIGHT: float = 5.0  # One add-to-cart counts as this many views
+    TRENDING_SKETCH_WIDTH: int = 4096  # Power of two
+    TRENDING_SKETCH_DEPTH: int = 4
+    TRENDING_CAPACITY: int = 1000  # Products tracked exactly enough to rank
+    TRENDING_CHECKPOINT_INTERVAL_SECONDS: float = 60.0
+    TRENDING_CHECKPOINT_KEY: str = "product-service"  # Give each replica its own key
+
+    # Catalog change feed (GET /products/changes)
+    CATALOG_CHANGES_RETENTION_SECONDS: int = 7 * 86400  # Older consumers get 410 and must resync
+    CATALOG_CHANGES_COMPACTION: bool = True  # Keep only the latest change per entity
+    CATALOG_CHANGES_MAINTENANCE_INTERVAL_SECONDS: float = 300.0
+    CATALOG_CHANGES_MAX_WAIT_SECONDS: float = 25.0  # Long-poll cap; stay under the gateway timeout
+    CATALOG_CHANGES_HEARTBEAT_SECONDS: float = 15.0  # Comment lines keeping idle event streams open
+
+    # Catalog snapshots: precompressed files under <UPLOAD_ROOT>/snapshots, listed in catalog.json
+    SNAPSHOT_INTERVAL_SECONDS: float = 600.0
+    SNAPSHOT_FORMATS: List[str] = ["ndjson.gz", "ndjson.br", "msgpack.gz", "msgpack.br"]
+    SNAPSHOT_BROTLI_QUALITY: int = 9  # 11 is markedly slower for a few percent
+    SNAPSHOT_BATCH_SIZE: int = 1000  # Products per server-side cursor fetch
+    SNAPSHOT_RETAIN_SECONDS: float = 3600.0  # Superseded files stay this long for in-flight downloads
+
+    # Shopping feeds: <UPLOAD_ROOT>/feeds/products[-delta].<format>, served from /uploads/feeds
+    FEED_INTERVAL_SECONDS: float = 3600.0
+    FEED_FORMATS: List[str] = ["xml", "csv"]
+    FEED_TITLE: str = "E-Commerce product feed"
+    FEED_CURRENCY: str = "VND"
+    STOREFRONT_BASE_URL: str = "http://localhost:3000"  # Product links: <base>/products/<id>
+    FEED_BATCH_SIZE: int = 1000  # Products per server-side cursor fetch
+    FEED_CHUNK_CHARS: int = 256 * 1024  # Streaming response chunk size
+
+    # Product images: public URLs are built from PUBLIC_BASE_URL (the gateway address)
+    PUBLIC_BASE_URL: str = "http://localhost:8080"
+    UPLOAD_ROOT: str = "uploads"
+    IMAGE_MAX_BYTES: int = 20 * 1024 * 1024
+    IMAGE_VARIANT_WIDTHS: List[int] = [320, 640, 1024, 1600]
+    IMAGE_THUMBNAIL_SIZE: int = 200
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_WORKERS: int = 2
+
+    # Periodic background jobs (reservation sweeper, ...); disable for one-off scripts
+    BACKGROUND_TASKS_ENABLED: bool = True
+
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,60 @@
+# Service: Product Service
+# Responsibility: HTTP conditional GET helpers (ETag / Last-Modified / Cache-Control)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Optional
+from fastapi import Request, Response
+
+# Cache-Control directives per endpoint family
+CACHE_PRODUCT = "public, max-age=60, stale-while-revalidate=30"
+CACHE_PRODUCT_LIST = "public, max-age=30, stale-while-revalidate=30"
+CACHE_CATEGORY = "public, max-age=300, stale-while-revalidate=60"
+
+
+def make_etag(*parts) -> str:
+    return '"' + "-".join(str(p) for p in parts) + '"'
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value, usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since when it is absent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses the weak comparison function (RFC 9110 13.1.2)
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_response(request: Request, etag: str, cache_control: str,
+                         render: Callable[[], bytes],
+                         last_modified: Optional[datetime] = None) -> Response:
+    """Return 304 when the client copy is current, otherwise render the JSON body.
+
+    ``render`` is only called on a miss, so unchanged resources are never serialized.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=render(), media_type="application/json", headers=headers)
@@ -0,0 +1,98 @@
+# Service: Product Service
+# Responsibility: PostgreSQL LISTEN/NOTIFY watcher that wakes async waiters
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import asyncio
+import logging
+import select
+import threading
+from typing import Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class VersionListener:
+    """Track the highest integer payload NOTIFYed on ``channel`` and wake waiters when it grows.
+
+    One daemon thread per process holds a dedicated connection in LISTEN
+    mode, so any number of long-poll or streaming clients cost no database
+    work while idle. Notifications are a latency optimisation only: waiters
+    also time out and re-check the database, so a lost connection delays
+    them but never loses a change.
+    """
+
+    def __init__(self, engine, channel: str):
+        self.engine = engine
+        self.channel = channel
+        self.latest = 0
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.engine.dialect.name != "postgresql" or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"listen-{self.channel}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = self.engine.raw_connection()
+                conn = raw.driver_connection
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {self.channel}")
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.poll()
+                        payloads = [n.payload for n in conn.notifies]
+                        conn.notifies.clear()
+                        self._publish(max(int(p) for p in payloads if p.isdigit()) if payloads else 0)
+            except Exception as e:
+                logger.warning(f"LISTEN {self.channel} failed, retrying: {e}")
+                self._stop.wait(5.0)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.invalidate()
+                    except Exception:
+                        pass
+
+    def _publish(self, version: int) -> None:
+        with self._lock:
+            if version <= self.latest:
+                return
+            self.latest = version
+            waiters, self._waiters = self._waiters, set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_result(None))
+
+    def observe(self, version: int) -> None:
+        """Record a version seen elsewhere (e.g. read from the database)"""
+        self._publish(version)
+
+    async def wait_beyond(self, version: int, timeout: float) -> bool:
+        """Wait until a version above ``version`` is announced; False on timeout"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = (loop, future)
+        with self._lock:
+            if self.latest > version:
+                return True
+            self._waiters.add(entry)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(entry)
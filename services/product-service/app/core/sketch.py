@@ -0,0 +1,180 @@
+# Service: Product Service
+# Responsibility: Bounded-memory streaming counters (count-min sketch, Space-Saving top-k, forward decay)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import heapq
+import io
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+_MASK64 = (1 << 64) - 1
+
+
+class CountMinSketch:
+    """``depth`` rows of ``width`` counters; estimates may overcount but never undercount.
+
+    Uses conservative update: an add only raises the counters that are below
+    the new estimate, which keeps hash collisions from inflating heavy keys.
+    """
+
+    def __init__(self, width: int, depth: int, seed: int = 0x5EED):
+        if width & (width - 1):
+            raise ValueError("width must be a power of two")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.float64)
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: one odd 64-bit multiplier and offset per row
+        self._hashes = [(int(a) | 1, int(b)) for a, b in rng.integers(0, 2 ** 63, (depth, 2), dtype=np.int64)]
+        self._shift = 64 - int(math.log2(width))
+        self._rows = np.arange(depth)
+
+    def _columns(self, key: int) -> List[int]:
+        return [(((a * key + b) & _MASK64) >> self._shift) for a, b in self._hashes]
+
+    def add(self, key: int, amount: float) -> float:
+        """Add ``amount`` to ``key`` and return its new estimate"""
+        columns = self._columns(key)
+        current = self.table[self._rows, columns]
+        estimate = current.min() + amount
+        self.table[self._rows, columns] = np.maximum(current, estimate)
+        return float(estimate)
+
+    def estimate(self, key: int) -> float:
+        return float(self.table[self._rows, self._columns(key)].min())
+
+    def scale(self, factor: float) -> None:
+        self.table *= factor
+
+
+class SpaceSaving:
+    """Top-k heavy hitters in ``capacity`` counters (Metwally et al.).
+
+    A new key evicts the smallest counter and inherits its count as an error
+    bound, so every reported count overestimates by at most ``error``. The
+    minimum is tracked with a lazily updated heap that is rebuilt when stale
+    entries pile up, keeping updates O(log capacity) amortized.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[int, List[float]] = {}  # key -> [count, error]
+        self._heap: List[Tuple[float, int]] = []
+
+    def add(self, key: int, amount: float, ceiling: Optional[float] = None) -> None:
+        """Count ``amount`` for ``key``; ``ceiling`` is an independent overestimate (e.g. a sketch) that tightens evictions"""
+        entry = self.counts.get(key)
+        if entry is None:
+            if len(self.counts) < self.capacity:
+                entry = self.counts[key] = [0.0, 0.0]
+            else:
+                floor = self._pop_min()
+                prior = floor if ceiling is None else min(floor, ceiling - amount)
+                entry = self.counts[key] = [prior, prior]
+        entry[0] += amount
+        heapq.heappush(self._heap, (entry[0], key))
+        if len(self._heap) > 4 * self.capacity + 64:
+            self._rebuild_heap()
+
+    def _pop_min(self) -> float:
+        while True:
+            count, key = heapq.heappop(self._heap)
+            entry = self.counts.get(key)
+            if entry is not None and entry[0] == count:
+                del self.counts[key]
+                return count
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(entry[0], key) for key, entry in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, limit: int) -> List[Tuple[int, float, float]]:
+        """(key, count, error), largest count first"""
+        best = heapq.nlargest(limit, self.counts.items(), key=lambda item: item[1][0])
+        return [(key, entry[0], entry[1]) for key, entry in best]
+
+    def scale(self, factor: float) -> None:
+        for entry in self.counts.values():
+            entry[0] *= factor
+            entry[1] *= factor
+        self._rebuild_heap()
+
+
+class DecayedTopK:
+    """Exponentially decayed event counts: a count-min sketch for any key plus Space-Saving for the top.
+
+    Forward decay: an event at time t is added with weight 2^((t - landmark) / half_life)
+    and counts are divided by the current weight when read, which equals decaying
+    every counter continuously but costs O(1) per event. Counters are rescaled
+    (and the landmark moved) before the weights could overflow. Memory depends
+    only on the sketch size and ``capacity``, not on catalog size or traffic.
+    """
+
+    _RESCALE_AFTER = 40  # Half-lives since the landmark; keeps weights far from overflow
+
+    def __init__(self, half_life: float, width: int, depth: int, capacity: int):
+        self.half_life = half_life
+        self.sketch = CountMinSketch(width, depth)
+        self.heavy = SpaceSaving(capacity)
+        self.landmark = time.time()
+        self._lock = threading.Lock()
+
+    def _half_lives(self, now: float) -> float:
+        return (now - self.landmark) / self.half_life
+
+    def _decay(self, now: float) -> float:
+        """Factor turning stored counts into counts decayed to ``now`` (0 once everything has faded)"""
+        return 2.0 ** -min(self._half_lives(now), 1000.0)
+
+    def add(self, key: int, amount: float = 1.0, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._half_lives(now) > self._RESCALE_AFTER:
+                factor = self._decay(now)
+                self.sketch.scale(factor)
+                self.heavy.scale(factor)
+                self.landmark = now
+            weighted = amount * 2.0 ** self._half_lives(now)
+            ceiling = self.sketch.add(key, weighted)
+            self.heavy.add(key, weighted, ceiling)
+
+    def top(self, limit: int, now: Optional[float] = None) -> List[Tuple[int, float]]:
+        """(key, decayed count) of the heaviest keys, best first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            factor = self._decay(now)
+            return [(key, count * factor) for key, count, _ in self.heavy.top(limit)]
+
+    def estimate(self, key: int, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        with self._lock:
+            return self.sketch.estimate(key) * self._decay(now)
+
+    def dump(self) -> bytes:
+        """Serialize counters and landmark (wall-clock) for a checkpoint"""
+        with self._lock:
+            keys = np.fromiter(self.heavy.counts, dtype=np.int64, count=len(self.heavy.counts))
+            entries = np.array(list(self.heavy.counts.values()), dtype=np.float64).reshape(-1, 2)
+            buffer = io.BytesIO()
+            np.savez_compressed(buffer, table=self.sketch.table, keys=keys, entries=entries,
+                                landmark=np.float64(self.landmark), half_life=np.float64(self.half_life))
+        return buffer.getvalue()
+
+    def load(self, payload: bytes) -> bool:
+        """Restore a checkpoint; returns False (keeping current counters) if it does not fit this configuration"""
+        with np.load(io.BytesIO(payload)) as data:
+            if data["table"].shape != self.sketch.table.shape or float(data["half_life"]) != self.half_life:
+                return False
+            with self._lock:
+                self.sketch.table = data["table"].copy()
+                self.heavy.counts = {int(key): [float(count), float(error)]
+                                     for key, (count, error) in zip(data["keys"], data["entries"])}
+                self.heavy._rebuild_heap()
+                # A smaller capacity keeps only the heaviest restored keys
+                while len(self.heavy.counts) > self.heavy.capacity:
+                    self.heavy._pop_min()
+                self.landmark = float(data["landmark"])
+        return True
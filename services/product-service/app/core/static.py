@@ -0,0 +1,139 @@
+# Service: Product Service
+# Responsibility: Static file responses with long-lived caching and byte ranges
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import mimetypes
+import os
+import re
+from email.utils import parsedate
+from typing import Optional, Tuple
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+# Content-addressed names (<sha256>[_variant].<ext>) never change content
+HASHED_NAME_RE = re.compile(r"^[0-9a-f]{64}(?:_[a-z0-9]+)?\.[a-z0-9]+$")
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_MUTABLE = "public, max-age=300"
+# Query-selected image variants: the file is immutable, the choice behind the URL may change
+CACHE_SELECTED_VARIANT = "public, max-age=86400"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive ``(start, end)``.
+
+    Returns None when there is no usable range (absent, malformed or
+    multi-range), in which case the full body is sent. Raises ValueError
+    when the range cannot be satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, sep, end_s = header[6:].strip().partition("-")
+    if not sep or not (start_s or end_s) or not all(p.isdigit() for p in (start_s, end_s) if p):
+        return None
+    if start_s:
+        start, end = int(start_s), int(end_s) if end_s else size - 1
+        if end_s and end < start:
+            return None
+    else:
+        if int(end_s) == 0:
+            raise ValueError("empty suffix range")
+        start, end = max(0, size - int(end_s)), size - 1
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, min(end, size - 1)
+
+
+class RangeFileResponse(FileResponse):
+    """FileResponse that sends only ``byte_range`` with a 206 status"""
+
+    def __init__(self, path, byte_range: Tuple[int, int], stat_result: os.stat_result, **kwargs):
+        super().__init__(path, status_code=206, stat_result=stat_result, **kwargs)
+        start, end = byte_range
+        self.byte_range = byte_range
+        self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        start, end = self.byte_range
+        remaining = end - start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(start)
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _not_modified(response_headers: Headers, request_headers: Headers) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison, as If-None-Match requires
+        return response_headers["etag"] in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    since = parsedate(request_headers.get("if-modified-since", ""))
+    modified = parsedate(response_headers["last-modified"])
+    return since is not None and modified is not None and since >= modified
+
+
+def _if_range_matches(if_range: Optional[str], response_headers: Headers) -> bool:
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        # If-Range needs a strong match
+        return if_range == response_headers["etag"]
+    since, modified = parsedate(if_range), parsedate(response_headers["last-modified"])
+    return since is not None and modified is not None and since >= modified
+
+
+def static_file_response(path, stat_result: os.stat_result, request_headers: Headers,
+                         cache_control: Optional[str] = None) -> Response:
+    """Build a file response with cache headers, 304 and single-range support.
+
+    Content-addressed files get a strong ETag equal to their hash name and an
+    immutable one-year Cache-Control; others get a short public max-age.
+    """
+    name = os.path.basename(path)
+    headers = {"accept-ranges": "bytes"}
+    # Compressed files (e.g. catalog snapshots) are sent as stored, without Content-Encoding
+    media_type, encoding = mimetypes.guess_type(name)
+    media_type = "application/octet-stream" if encoding else media_type
+    if HASHED_NAME_RE.match(name):
+        headers["etag"] = f'"{os.path.splitext(name)[0]}"'
+        headers["cache-control"] = cache_control or CACHE_IMMUTABLE
+    else:
+        headers["cache-control"] = cache_control or CACHE_MUTABLE
+
+    response = FileResponse(path, stat_result=stat_result, headers=headers, media_type=media_type)
+    if _not_modified(response.headers, request_headers):
+        return NotModifiedResponse(response.headers)
+
+    if not _if_range_matches(request_headers.get("if-range"), response.headers):
+        return response
+    try:
+        byte_range = parse_range(request_headers.get("range"), stat_result.st_size)
+    except ValueError:
+        return Response(status_code=416, headers={"content-range": f"bytes */{stat_result.st_size}"})
+    if byte_range is None:
+        return response
+    return RangeFileResponse(path, byte_range, stat_result, headers=headers, media_type=media_type)
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles with long-lived caching for hashed names and Range requests"""
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200) -> Response:
+        if status_code != 200:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        return static_file_response(full_path, stat_result, Headers(scope=scope))
@@ -0,0 +1,59 @@
+# Service: Product Service
+# Responsibility: Periodic background jobs run on daemon threads
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run ``func`` every ``interval`` seconds until stopped; errors are logged, not raised"""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 5)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception as e:
+                logger.error(f"Background task {self.name} failed: {e}")
+
+
+_tasks: List[PeriodicTask] = []
+
+
+def register_task(name: str, interval: float, func: Callable[[], None]) -> PeriodicTask:
+    task = PeriodicTask(name, interval, func)
+    _tasks.append(task)
+    return task
+
+
+def start_all() -> None:
+    for task in _tasks:
+        task.start()
+        logger.info(f"Background task started: {task.name} (every {task.interval}s)")
+
+
+def stop_all() -> None:
+    for task in _tasks:
+        task.stop()
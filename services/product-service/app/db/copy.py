@@ -0,0 +1,67 @@
+# Service: Product Service
+# Responsibility: PostgreSQL binary COPY encoding for bulk I/O with NumPy arrays
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import io
+from typing import Dict, Sequence, Tuple
+import numpy as np
+
+_SIGNATURE = b"PGCOPY\n\xff\r\n\x00" + b"\x00\x00\x00\x00" * 2
+_TRAILER = b"\xff\xff"
+
+
+def _row_dtype(layout: Sequence[Tuple[str, str]]) -> np.dtype:
+    fields = [("field_count", ">i2")]
+    for name, wire_type in layout:
+        fields += [(f"{name}_length", ">i4"), (name, wire_type)]
+    return np.dtype(fields)
+
+
+def binary_copy_payload(columns: Dict[str, np.ndarray], layout: Sequence[Tuple[str, str]]) -> bytes:
+    """Encode fixed-width, non-NULL rows in binary COPY format.
+
+    ``layout`` lists ``(column, wire dtype)`` in table order, e.g.
+    ``(">i4", ">f8", "i1")`` for integer, double precision and boolean. The
+    rows are built as one NumPy record array, so nothing is formatted as text
+    on the way in or parsed again by the server.
+    """
+    rows = np.empty(len(columns[layout[0][0]]), dtype=_row_dtype(layout))
+    rows["field_count"] = len(layout)
+    for name, wire_type in layout:
+        rows[f"{name}_length"] = np.dtype(wire_type).itemsize
+        rows[name] = columns[name]
+    return _SIGNATURE + rows.tobytes() + _TRAILER
+
+
+def parse_binary_copy(payload: bytes, layout: Sequence[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+    """Decode binary COPY output of fixed-width, non-NULL columns into arrays.
+
+    The inverse of :func:`binary_copy_payload`: the rows are viewed in place
+    as one record array, and each column is returned in native byte order.
+    """
+    if not payload.startswith(_SIGNATURE) or not payload.endswith(_TRAILER):
+        raise ValueError("not a binary COPY payload without header extensions")
+    dtype = _row_dtype(layout)
+    count = (len(payload) - len(_SIGNATURE) - len(_TRAILER)) // dtype.itemsize
+    rows = np.frombuffer(payload, dtype=dtype, offset=len(_SIGNATURE), count=count)
+    return {name: rows[name].astype(np.dtype(wire_type).newbyteorder("=")) for name, wire_type in layout}
+
+
+def copy_into(cursor, table: str, columns: Dict[str, np.ndarray], layout: Sequence[Tuple[str, str]]) -> int:
+    """COPY ``columns`` into ``table`` on a raw DB-API cursor; returns the row count"""
+    payload = binary_copy_payload(columns, layout)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(name for name, _ in layout)}) FROM STDIN WITH (FORMAT binary)",
+        io.BytesIO(payload)
+    )
+    return len(columns[layout[0][0]])
+
+
+def copy_out(cursor, query: str, layout: Sequence[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+    """Run ``COPY (query) TO STDOUT`` in binary format on a raw DB-API cursor.
+
+    ``layout`` must match the query's output columns, none of which may be NULL.
+    """
+    buffer = io.BytesIO()
+    cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT binary)", buffer)
+    return parse_binary_copy(buffer.getvalue(), layout)
@@ -0,0 +1,49 @@
+# Service: Product Service
+# Responsibility: Idempotent schema upgrades for tables that predate create_all
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.repositories.stats import sync_stats_triggers
+
+logger = logging.getLogger(__name__)
+
+# Statements must be safe to run on every startup
+MIGRATIONS = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT now()",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS stock_shards INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE catalog_version ADD COLUMN IF NOT EXISTS changes_floor BIGINT NOT NULL DEFAULT 0",
+    "INSERT INTO catalog_version (id, version, updated_at) VALUES (1, 0, now()) ON CONFLICT (id) DO NOTHING",
+    # Rewrites the table once on upgrade
+    """ALTER TABLE products ADD COLUMN IF NOT EXISTS specifications_jsonb JSONB
+       GENERATED ALWAYS AS (CASE WHEN json_typeof(specifications) = 'object' THEN specifications::jsonb END) STORED""",
+    # Attribute filters are containment tests (specifications_jsonb @> '{"Size": "L"}')
+    "CREATE INDEX IF NOT EXISTS ix_products_specifications ON products USING gin (specifications_jsonb jsonb_path_ops)",
+    # Category listings and per-category jobs (related products) filter on category
+    "CREATE INDEX IF NOT EXISTS ix_products_category ON products (category)",
+    # Category tree: parent link plus materialized path; existing categories become roots
+    "ALTER TABLE categories ADD COLUMN IF NOT EXISTS parent_id INTEGER REFERENCES categories(id) ON DELETE RESTRICT",
+    "ALTER TABLE categories ADD COLUMN IF NOT EXISTS path VARCHAR",
+    "UPDATE categories SET path = '/' || id || '/' WHERE path IS NULL AND parent_id IS NULL",
+    "CREATE INDEX IF NOT EXISTS ix_categories_parent_id ON categories (parent_id)",
+    "CREATE INDEX IF NOT EXISTS ix_categories_path ON categories (path text_pattern_ops)",
+    # The low-stock report reads velocity from stock_forecasts, not committed reservations
+    "DROP INDEX IF EXISTS ix_inventory_reservations_status_updated",
+    # Backfill while the table is empty; afterwards wishlist writes maintain the counts
+    """INSERT INTO wishlist_counts (product_id, users)
+       SELECT product_id, count(*) FROM wishlists
+       WHERE NOT EXISTS (SELECT 1 FROM wishlist_counts)
+       GROUP BY product_id""",
+]
+
+def run_migrations(engine: Engine) -> None:
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for statement in MIGRATIONS:
+            conn.execute(text(statement))
+        sync_stats_triggers(conn, settings.INVENTORY_STATS_INCREMENTAL)
+    logger.info(f"Applied {len(MIGRATIONS)} schema migrations")
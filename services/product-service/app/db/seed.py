@@ -4,8 +4,16 @@
 
 from app.db.session import SessionLocal
 from app.models.product import Product
+from app.models.inventory import InventoryReservation  # noqa: F401 - tables referenced by migrations
+from app.models.stats import InventoryStats  # noqa: F401
+from app.models.related import ProductNeighbor  # noqa: F401
+from app.models.copurchase import ProductAlsoBought  # noqa: F401
+from app.models.trending import TrendingCheckpoint  # noqa: F401
 from app.db.session import engine, Base
+from app.db.migrate import run_migrations
+import app.repositories.catalog  # noqa: F401 - registers the catalog version listener
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 def seed():
     db = SessionLocal()
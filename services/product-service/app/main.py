@@ -4,14 +4,36 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 import logging
 from app.db.session import engine, Base
+from app.db.migrate import run_migrations
 from app.api.v1.routes import router as api_router
 from app.api.v1.admin_routes import router as admin_router
 from app.models.product import Product
 from app.models.wishlist import Wishlist
+from app.models.catalog import CatalogVersion, CatalogChange
+from app.models.inventory import InventoryReservation, InventoryReservationItem, ProductStockShard
+from app.models.stats import InventoryStats, InventoryStatsDelta
+from app.models.forecast import StockForecast
+from app.models.related import ProductNeighbor, RelatedBuildState
+from app.models.copurchase import CopurchasePair, CopurchaseItem, CopurchaseState, ProductAlsoBought
+from app.models.trending import TrendingCheckpoint
+from app.models.feed import FeedItem, FeedState
+from app.models.review import ProductReview, ProductRatingStats
+from app.core.config import settings
+from app.core.static import ImmutableStaticFiles
+from app.core.tasks import register_task, start_all, stop_all
+from app.services.inventory import run_reservation_maintenance
+from app.services.image import shutdown_image_pool
+from app.services.stats import run_stats_compaction
+from app.services.forecast import run_stock_forecast
+from app.services.related import run_related_build
+from app.services.copurchase import run_copurchase_update
+from app.services.catalog import changes_listener, run_catalog_change_maintenance
+from app.services.snapshot import run_catalog_snapshot
+from app.services.feed import run_shopping_feed
+from app.services.trending import restore_checkpoint, run_trending_checkpoint, save_checkpoint
 
 # Configure logging
 logging.basicConfig(
@@ -35,17 +57,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+register_task("reservation-sweeper", settings.RESERVATION_SWEEP_INTERVAL_SECONDS, run_reservation_maintenance)
+register_task("inventory-stats-compactor", settings.INVENTORY_STATS_COMPACT_INTERVAL_SECONDS, run_stats_compaction)
+register_task("stock-forecast", settings.FORECAST_INTERVAL_SECONDS, run_stock_forecast)
+register_task("related-products", settings.RELATED_INTERVAL_SECONDS, run_related_build)
+register_task("copurchase", settings.COPURCHASE_INTERVAL_SECONDS, run_copurchase_update)
+register_task("trending-checkpoint", settings.TRENDING_CHECKPOINT_INTERVAL_SECONDS, run_trending_checkpoint)
+register_task("catalog-snapshot", settings.SNAPSHOT_INTERVAL_SECONDS, run_catalog_snapshot)
+register_task("shopping-feed", settings.FEED_INTERVAL_SECONDS, run_shopping_feed)
+register_task("catalog-change-maintenance", settings.CATALOG_CHANGES_MAINTENANCE_INTERVAL_SECONDS, run_catalog_change_maintenance)
+
 @app.on_event("startup")
 def on_startup():
     logger.info("=== Product Service Starting ===")
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
     logger.info("Database tables created/verified")
+    changes_listener.start()
+    if settings.BACKGROUND_TASKS_ENABLED:
+        restore_checkpoint()
+        start_all()
     logger.info("Product Service ready")
 
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_all()
+    changes_listener.stop()
+    if settings.BACKGROUND_TASKS_ENABLED:
+        save_checkpoint()
+    shutdown_image_pool()
+
 # Mount static files for uploaded images
-UPLOAD_DIR = Path("uploads")
+UPLOAD_DIR = Path(settings.UPLOAD_ROOT)
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+app.mount("/uploads", ImmutableStaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(admin_router, prefix="/api/v1")
@@ -0,0 +1,33 @@
+# Service: Product Service
+# Responsibility: Catalog-wide version counter and change log
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index
+from datetime import datetime
+from app.db.session import Base
+
+class CatalogVersion(Base):
+    """Single-row counter bumped in the same transaction as any product/category write"""
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Changes up to this version have been dropped by retention; older consumers must resync
+    changes_floor = Column(BigInteger, nullable=False, server_default="0")
+
+
+class CatalogChange(Base):
+    """Append-only change log: one row per entity touched by a catalog version"""
+    __tablename__ = "catalog_changes"
+
+    version = Column(BigInteger, primary_key=True)
+    entity = Column(String(16), primary_key=True)  # product, category
+    entity_id = Column(Integer, primary_key=True)
+    op = Column(String(8), nullable=False)  # upsert, delete
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Compaction looks up newer changes of the same entity
+        Index("ix_catalog_changes_entity", "entity", "entity_id", "version"),
+    )
@@ -2,7 +2,7 @@
 # Responsibility: Category model
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from datetime import datetime
 from app.db.session import Base
 
@@ -12,5 +12,12 @@ class Category(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
     description = Column(Text, nullable=True)
+    parent_id = Column(Integer, ForeignKey("categories.id", ondelete="RESTRICT"), nullable=True, index=True)
+    # Materialized path of ids from the root, e.g. "/1/4/9/"; a subtree is one prefix range
+    path = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_categories_path", "path", postgresql_ops={"path": "text_pattern_ops"}),
+    )
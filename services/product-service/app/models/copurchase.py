@@ -0,0 +1,44 @@
+# Service: Product Service
+# Responsibility: Co-purchase counts and precomputed "customers also bought" lists
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, Float
+from app.db.session import Base
+
+# Product ids come from order history, so none of these tables reference
+# products: orders may mention products that were deleted since.
+
+class CopurchasePair(Base):
+    """Number of orders containing both products; stored in both directions"""
+    __tablename__ = "copurchase_pairs"
+
+    product_id = Column(Integer, primary_key=True)
+    other_id = Column(Integer, primary_key=True)
+    orders = Column(Integer, nullable=False)
+
+
+class CopurchaseItem(Base):
+    """Number of orders containing the product"""
+    __tablename__ = "copurchase_items"
+
+    product_id = Column(Integer, primary_key=True)
+    orders = Column(Integer, nullable=False)
+
+
+class CopurchaseState(Base):
+    """Single-row ingestion watermark: orders up to last_order_id are counted"""
+    __tablename__ = "copurchase_state"
+
+    id = Column(Integer, primary_key=True)
+    last_order_id = Column(Integer, nullable=False, default=0)
+    total_orders = Column(BigInteger, nullable=False, default=0)
+
+
+class ProductAlsoBought(Base):
+    """Top-k co-purchased products per product, best first"""
+    __tablename__ = "product_also_bought"
+
+    product_id = Column(Integer, primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)  # 0 = strongest
+    other_id = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)  # Cosine or lift, see COPURCHASE_SIMILARITY
@@ -0,0 +1,22 @@
+# Service: Product Service
+# Responsibility: Shopping-feed generator state (what the last feed contained)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey
+from app.db.session import Base
+
+class FeedItem(Base):
+    """Fingerprint of each product's feed entry as of the last run; unchanged entries are left out of the delta feed"""
+    __tablename__ = "feed_items"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    fingerprint = Column(BigInteger, nullable=False)
+
+
+class FeedState(Base):
+    """Single row: catalog version the current feed files were generated from"""
+    __tablename__ = "feed_state"
+
+    id = Column(Integer, primary_key=True)
+    catalog_version = Column(BigInteger, nullable=False)
+    generated_at = Column(DateTime, nullable=False)
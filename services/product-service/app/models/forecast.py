@@ -0,0 +1,25 @@
+# Service: Product Service
+# Responsibility: Per-SKU demand forecast and reorder recommendations
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, Index, text
+from app.db.session import Base
+
+class StockForecast(Base):
+    """Output of the stock forecast job; the whole table is replaced on every run"""
+    __tablename__ = "stock_forecasts"
+
+    product_id = Column(Integer, primary_key=True)
+    stock = Column(Integer, nullable=False)
+    daily_velocity = Column(Float, nullable=False)  # Recency-weighted units per day
+    demand_std = Column(Float, nullable=False)  # Std-dev of daily units over the window
+    days_of_cover = Column(Float, nullable=True)  # NULL when nothing sells
+    safety_stock = Column(Float, nullable=False)
+    reorder_point = Column(Float, nullable=False)
+    reorder_quantity = Column(Integer, nullable=False)
+    needs_reorder = Column(Boolean, nullable=False)
+    computed_at = Column(DateTime, nullable=False, server_default=text("(now() at time zone 'utc')"))  # Job transaction start
+
+    __table_args__ = (
+        Index("ix_stock_forecasts_reorder_cover", "needs_reorder", "days_of_cover"),
+    )
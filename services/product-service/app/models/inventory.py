@@ -0,0 +1,49 @@
+# Service: Product Service
+# Responsibility: Inventory reservation and sharded stock counter models
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.db.session import Base
+
+class InventoryReservation(Base):
+    __tablename__ = "inventory_reservations"
+
+    id = Column(String, primary_key=True)  # uuid hex
+    order_ref = Column(String, nullable=True, index=True)
+    status = Column(String, nullable=False, default="pending")  # pending, committed, released, expired
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    items = relationship("InventoryReservationItem", back_populates="reservation",
+                         cascade="all, delete-orphan", lazy="selectin")
+
+    __table_args__ = (
+        # The expiry sweeper only ever scans pending reservations by expiry
+        Index("ix_inventory_reservations_pending_expiry", "expires_at",
+              postgresql_where=(status == "pending")),
+    )
+
+
+class InventoryReservationItem(Base):
+    __tablename__ = "inventory_reservation_items"
+
+    id = Column(Integer, primary_key=True)
+    reservation_id = Column(String, ForeignKey("inventory_reservations.id", ondelete="CASCADE"),
+                            nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)
+    shard = Column(Integer, nullable=True)  # Stock shard decremented, NULL for products.stock
+
+    reservation = relationship("InventoryReservation", back_populates="items")
+
+
+class ProductStockShard(Base):
+    """Stock of a hot SKU split over several rows so concurrent reservations do not queue on one row lock"""
+    __tablename__ = "product_stock_shards"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    stock = Column(Integer, nullable=False, default=0)
@@ -2,7 +2,10 @@
 # Responsibility: Product model for catalog
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
-from sqlalchemy import Column, Integer, String, Float, Text, JSON
+from sqlalchemy import Column, Computed, Integer, String, Float, Text, JSON, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
+from datetime import datetime
 from app.db.session import Base
 
 class Product(Base):
@@ -14,10 +17,16 @@ class Product(Base):
     image = Column(String, nullable=True)
     price = Column(Float, nullable=False)
     stock = Column(Integer, nullable=False, default=0)
-    category = Column(String, nullable=True)
+    category = Column(String, nullable=True, index=True)
     brand = Column(String, nullable=True)
     images = Column(JSON, nullable=True)  # Array of image URLs
     rating = Column(Float, nullable=True, default=0.0)
     reviews_count = Column(Integer, nullable=True, default=0)
     sku = Column(String, nullable=True, unique=True)
-    specifications = Column(JSON, nullable=True)  # Key-value pairs
+    specifications = Column(JSON, nullable=True)  # Key-value pairs, in display order
+    # Indexed (GIN) copy for attribute filters and facets; JSONB would not keep the display order itself
+    specifications_jsonb = deferred(Column(JSONB, Computed("CASE WHEN json_typeof(specifications) = 'object' THEN specifications::jsonb END", persisted=True)))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    stock_shards = Column(Integer, nullable=False, default=0, server_default="0")  # >0: stock lives in product_stock_shards
+    # Row version for ETags; every write bumps it in SQL (version = version + 1), so concurrent writers never conflict
+    version = Column(Integer, nullable=False, default=1, server_default="1")
@@ -0,0 +1,28 @@
+# Service: Product Service
+# Responsibility: Precomputed related-product neighbor lists
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from sqlalchemy import Column, Integer, SmallInteger, Float, DateTime, ForeignKey, Index
+from app.db.session import Base
+
+class ProductNeighbor(Base):
+    """Top-k most similar products per product, written by the related-products job"""
+    __tablename__ = "product_neighbors"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)  # 0 = most similar
+    neighbor_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, nullable=False)  # Cosine similarity
+
+    __table_args__ = (
+        # Deleting a product cascades through neighbor_id as well
+        Index("ix_product_neighbors_neighbor_id", "neighbor_id"),
+    )
+
+
+class RelatedBuildState(Base):
+    """Single-row watermark: products updated after it have not been indexed yet"""
+    __tablename__ = "related_build_state"
+
+    id = Column(Integer, primary_key=True)
+    watermark = Column(DateTime, nullable=True)
@@ -0,0 +1,41 @@
+# Service: Product Service
+# Responsibility: Product reviews and their incrementally maintained rating statistics
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, Integer, SmallInteger, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, CheckConstraint
+from app.db.session import Base
+
+class ProductReview(Base):
+    __tablename__ = "product_reviews"
+
+    id = Column(BigInteger, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    user_name = Column(String(100), nullable=True)
+    rating = Column(SmallInteger, nullable=False)
+    comment = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("product_id", "user_id", name="unique_product_review_user"),
+        CheckConstraint("rating BETWEEN 1 AND 5", name="ck_product_reviews_rating"),
+        # Keyset pages: newest first, optionally only one star rating
+        Index("ix_product_reviews_product_created", "product_id", "created_at", "id"),
+        Index("ix_product_reviews_product_rating_created", "product_id", "rating", "created_at", "id"),
+    )
+
+
+class ProductRatingStats(Base):
+    """Running totals per product, adjusted by every review write; products.rating/reviews_count mirror them"""
+    __tablename__ = "product_rating_stats"
+
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    reviews = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(BigInteger, nullable=False, default=0)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
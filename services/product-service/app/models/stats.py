@@ -0,0 +1,28 @@
+# Service: Product Service
+# Responsibility: Incrementally maintained inventory statistics
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from sqlalchemy import Column, Integer, BigInteger, String, Numeric
+from app.db.session import Base
+
+class InventoryStats(Base):
+    """Per-category totals ('' for uncategorized), folded from InventoryStatsDelta"""
+    __tablename__ = "inventory_stats"
+
+    category = Column(String, primary_key=True)
+    products = Column(BigInteger, nullable=False, default=0)
+    in_stock = Column(BigInteger, nullable=False, default=0)
+    low_stock = Column(BigInteger, nullable=False, default=0)
+    total_value = Column(Numeric, nullable=False, default=0)
+
+
+class InventoryStatsDelta(Base):
+    """Append-only changes written by the products triggers; inserts never contend on a row lock"""
+    __tablename__ = "inventory_stats_delta"
+
+    id = Column(BigInteger, primary_key=True)
+    category = Column(String, nullable=False)
+    products = Column(Integer, nullable=False, default=0)
+    in_stock = Column(Integer, nullable=False, default=0)
+    low_stock = Column(Integer, nullable=False, default=0)
+    total_value = Column(Numeric, nullable=False, default=0)
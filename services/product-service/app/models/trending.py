@@ -0,0 +1,15 @@
+# Service: Product Service
+# Responsibility: Checkpoints of the in-memory trending counters
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from sqlalchemy import Column, String, LargeBinary, DateTime
+from datetime import datetime
+from app.db.session import Base
+
+class TrendingCheckpoint(Base):
+    """Serialized counters, one row per ranking and checkpoint key (replica)"""
+    __tablename__ = "trending_checkpoints"
+
+    key = Column(String, primary_key=True)  # "<TRENDING_CHECKPOINT_KEY>:<ranking>"
+    payload = Column(LargeBinary, nullable=False)
+    saved_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -15,3 +15,11 @@ class Wishlist(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'product_id', name='unique_user_product'),
     )
+
+
+class WishlistCount(Base):
+    """Users wishlisting each product, kept in step by the wishlist write statements"""
+    __tablename__ = "wishlist_counts"
+
+    product_id = Column(Integer, primary_key=True)
+    users = Column(Integer, nullable=False, default=0, index=True)
@@ -0,0 +1,137 @@
+# Service: Product Service
+# Responsibility: Catalog version counter and change log, bumped on every product/category write
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import event, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.cache import product_cache
+from app.db.session import SessionLocal
+from app.models.catalog import CatalogChange, CatalogVersion
+from app.models.category import Category
+from app.models.product import Product
+
+CATALOG_MODELS = {Product: "product", Category: "category"}
+
+# NOTIFY channel carrying each committed catalog version
+CHANGES_CHANNEL = "catalog_changes"
+
+# Cache namespaces whose keys include the catalog version. They are bumped once a
+# new version commits, so entries for superseded versions stop being reachable.
+SPEC_FACETS_NAMESPACE = "spec-facets"
+CATEGORY_TREE_NAMESPACE = "category-tree"
+CATALOG_VERSIONED_NAMESPACES = (SPEC_FACETS_NAMESPACE, CATEGORY_TREE_NAMESPACE)
+
+# (entity, entity_id, op)
+Change = Tuple[str, int, str]
+
+
+def bump_catalog_version(conn, changes: Iterable[Change] = ()) -> int:
+    """Atomically increment the catalog version, log ``changes`` under it and return it.
+
+    The row lock taken here is held until the surrounding transaction commits,
+    so versions become visible in the same order they are handed out; a
+    consumer that has seen version N will never later find a change below N.
+    Listeners are notified on commit.
+    """
+    now = datetime.utcnow()
+    stmt = insert(CatalogVersion).values(id=1, version=1, updated_at=now).on_conflict_do_update(
+        index_elements=[CatalogVersion.id],
+        set_={"version": CatalogVersion.version + 1, "updated_at": now},
+    ).returning(CatalogVersion.version)
+    version = conn.execute(stmt).scalar_one()
+    rows = {(entity, entity_id): op for entity, entity_id, op in changes}
+    if rows:
+        conn.execute(insert(CatalogChange).values([
+            {"version": version, "entity": entity, "entity_id": entity_id, "op": op, "changed_at": now}
+            for (entity, entity_id), op in rows.items()
+        ]))
+    conn.execute(text("SELECT pg_notify(:channel, :version)"), {"channel": CHANGES_CHANNEL, "version": str(version)})
+    return version
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _bump_on_catalog_write(session: Session, flush_context) -> None:
+    changes = [(CATALOG_MODELS[type(obj)], obj.id, "upsert")
+               for obj in session.new if type(obj) in CATALOG_MODELS]
+    changes += [(CATALOG_MODELS[type(obj)], obj.id, "upsert")
+                for obj in session.dirty if type(obj) in CATALOG_MODELS and session.is_modified(obj)]
+    changes += [(CATALOG_MODELS[type(obj)], obj.id, "delete")
+                for obj in session.deleted if type(obj) in CATALOG_MODELS]
+    if changes:
+        session.info["catalog_version"] = bump_catalog_version(session.connection(), changes)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_caches_on_catalog_commit(session: Session) -> None:
+    if session.info.pop("catalog_version", None) is not None:
+        product_cache.bump(*CATALOG_VERSIONED_NAMESPACES)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_catalog_version(session: Session) -> None:
+    session.info.pop("catalog_version", None)
+
+
+class CatalogRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_version(self) -> Tuple[int, Optional[datetime]]:
+        row = self.db.query(CatalogVersion.version, CatalogVersion.updated_at).filter(
+            CatalogVersion.id == 1
+        ).first()
+        return (row.version, row.updated_at) if row else (0, None)
+
+    def get_changes_floor(self) -> int:
+        return self.db.query(CatalogVersion.changes_floor).filter(CatalogVersion.id == 1).scalar() or 0
+
+    def bump(self, changes: Iterable[Change] = ()) -> int:
+        """Bump the version for writes that bypass the ORM unit of work (bulk statements)"""
+        version = bump_catalog_version(self.db.connection(), changes)
+        self.db.info["catalog_version"] = version
+        return version
+
+    def changes_since(self, since: int, limit: int) -> Tuple[List[CatalogChange], bool]:
+        """Changes after ``since`` in version order, whole versions only; returns (changes, has_more).
+
+        A page ends at a version boundary so ``since`` can advance to its last
+        version. A single version larger than ``limit`` (a bulk import batch)
+        is returned whole.
+        """
+        rows = self.db.query(CatalogChange).filter(CatalogChange.version > since).order_by(
+            CatalogChange.version, CatalogChange.entity, CatalogChange.entity_id
+        ).limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, False
+        last_version = rows[limit].version
+        page = [row for row in rows if row.version < last_version]
+        if not page:
+            page = self.db.query(CatalogChange).filter(CatalogChange.version == last_version).order_by(
+                CatalogChange.entity, CatalogChange.entity_id
+            ).all()
+        return page, True
+
+    def compact(self) -> int:
+        """Drop changes superseded by a newer change of the same entity; consumers only need the latest"""
+        return self.db.execute(text("""
+            DELETE FROM catalog_changes c
+            WHERE EXISTS (
+                SELECT 1 FROM catalog_changes n
+                WHERE n.entity = c.entity AND n.entity_id = c.entity_id AND n.version > c.version
+            )
+        """)).rowcount
+
+    def prune(self, retention: timedelta) -> int:
+        """Drop changes older than ``retention`` and raise the floor past them"""
+        result = self.db.execute(text("""
+            WITH pruned AS (
+                DELETE FROM catalog_changes WHERE changed_at < :cutoff RETURNING version
+            )
+            UPDATE catalog_version SET changes_floor = greatest(changes_floor, (SELECT max(version) FROM pruned))
+            WHERE id = 1 AND EXISTS (SELECT 1 FROM pruned)
+            RETURNING (SELECT count(*) FROM pruned)
+        """), {"cutoff": datetime.utcnow() - retention}).scalar()
+        return result or 0
@@ -2,10 +2,11 @@
 # Responsibility: Category repository
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from app.models.category import Category  
 from app.schemas.category import CategoryCreate, CategoryUpdate
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 class CategoryRepository:
     """Repository for category database operations"""
@@ -16,18 +17,34 @@ class CategoryRepository:
     def get_all(self, skip: int = 0, limit: int = 100) -> List[Category]:
         """Get all categories"""
         return self.db.query(Category).offset(skip).limit(limit).all()
+
+    def get_tree_rows(self) -> List[Category]:
+        """Every category, parents before children"""
+        return self.db.query(Category).order_by(Category.path, Category.id).all()
     
-    def get_by_id(self, category_id: int) -> Optional[Category]:
-        """Get category by ID"""
-        return self.db.query(Category).filter(Category.id == category_id).first()
+    def get_by_id(self, category_id: int, for_update: bool = False) -> Optional[Category]:
+        """Get category by ID; ``for_update`` re-reads and locks the row"""
+        query = self.db.query(Category).filter(Category.id == category_id)
+        if for_update:
+            query = query.populate_existing().with_for_update()
+        return query.first()
+
+    def lock_tree(self) -> None:
+        """Serialize tree moves until commit; paths checked after this cannot change underneath the caller"""
+        self.db.execute(text("SELECT pg_advisory_xact_lock(hashtext('category-tree'))"))
     
     def get_by_name(self, name: str) -> Optional[Category]:
         """Get category by name"""
         return self.db.query(Category).filter(Category.name == name).first()
+
+    def has_children(self, category: Category) -> bool:
+        return self.db.query(Category.id).filter(Category.parent_id == category.id).first() is not None
     
-    def create(self, category_in: CategoryCreate) -> Category:
-        """Create new category"""
-        db_category = Category(**category_in.dict())
+    def create(self, category_in: CategoryCreate, parent: Optional[Category]) -> Category:
+        """Create new category; the id is drawn first so the path is complete in a single insert"""
+        category_id = self.db.execute(text("SELECT nextval(pg_get_serial_sequence('categories', 'id'))")).scalar()
+        db_category = Category(id=category_id, path=f"{parent.path if parent else '/'}{category_id}/",
+                               **category_in.model_dump())
         self.db.add(db_category)
         self.db.commit()
         self.db.refresh(db_category)
@@ -42,6 +59,27 @@ class CategoryRepository:
         self.db.commit()
         self.db.refresh(category)
         return category
+
+    def move_subtree(self, category: Category, parent: Optional[Category]) -> List[int]:
+        """Re-parent ``category`` and rewrite the paths of its whole subtree (caller commits); returns descendant ids"""
+        old_path = category.path
+        new_path = f"{parent.path if parent else '/'}{category.id}/"
+        rows = self.db.execute(text("""
+            UPDATE categories SET path = :new_path || substr(path, length(:old_path) + 1), updated_at = now()
+            WHERE path LIKE :prefix AND id <> :id
+            RETURNING id
+        """), {"new_path": new_path, "old_path": old_path, "id": category.id, "prefix": f"{old_path}%"}).all()
+        category.parent_id = parent.id if parent else None
+        category.path = new_path
+        return [row[0] for row in rows]
+
+    def rename_products(self, old_name: str, new_name: str) -> List[Tuple[int]]:
+        """Point products of a renamed category at the new name (caller commits); returns their ids"""
+        return self.db.execute(text("""
+            UPDATE products SET category = :new_name, version = version + 1, updated_at = now()
+            WHERE category = :old_name
+            RETURNING id
+        """), {"old_name": old_name, "new_name": new_name}).all()
     
     def delete(self, category: Category) -> Category:
         """Delete category"""
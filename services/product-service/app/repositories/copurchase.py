@@ -0,0 +1,121 @@
+# Service: Product Service
+# Responsibility: Storage for co-purchase counts and "customers also bought" lists
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from typing import Dict, List, Tuple
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.copy import copy_into
+
+PAIR_COLUMNS = (("product_id", ">i4"), ("other_id", ">i4"), ("orders", ">i4"))
+ITEM_COLUMNS = (("product_id", ">i4"), ("orders", ">i4"))
+
+# Rebuilt side by side by a full update, then swapped in (see begin_rebuild)
+REBUILT_TABLES = ("copurchase_pairs", "copurchase_items", "product_also_bought")
+
+# Similarity of product a to product b from co-purchase counts:
+# cosine = n(a,b) / sqrt(n(a) n(b)); lift = n(a,b) N / (n(a) n(b))
+SCORES = {
+    "cosine": "p.orders / sqrt(a.orders::float8 * b.orders)",
+    "lift": "p.orders::float8 * :total_orders / (a.orders::float8 * b.orders)",
+}
+
+
+class CopurchaseRepository:
+    def __init__(self, db: Session):
+        self.db = db
+        # Appended to REBUILT_TABLES names: "_rebuild" while a full rebuild fills the copies
+        self.suffix = ""
+
+    def _cursor(self):
+        return self.db.connection().connection.cursor()
+
+    def try_lock(self) -> bool:
+        """Transaction-scoped advisory lock so only one replica ingests at a time"""
+        return self.db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('copurchase'))")).scalar()
+
+    def get_state(self) -> Tuple[int, int]:
+        """(last_order_id, total_orders) counted so far"""
+        row = self.db.execute(text("SELECT last_order_id, total_orders FROM copurchase_state WHERE id = 1")).first()
+        return (row[0], row[1]) if row else (0, 0)
+
+    def set_state(self, last_order_id: int, total_orders: int) -> None:
+        self.db.execute(text("""
+            INSERT INTO copurchase_state (id, last_order_id, total_orders) VALUES (1, :last_order_id, :total_orders)
+            ON CONFLICT (id) DO UPDATE SET last_order_id = excluded.last_order_id, total_orders = excluded.total_orders
+        """), {"last_order_id": last_order_id, "total_orders": total_orders})
+
+    def begin_rebuild(self) -> None:
+        """Point this repository at empty copies of REBUILT_TABLES.
+
+        A full rebuild fills the copies while readers keep using the live
+        tables; ``finish_rebuild`` swaps them in, so the ACCESS EXCLUSIVE locks
+        are held only from the swap to the commit rather than the whole run.
+        """
+        cursor = self._cursor()
+        for table in REBUILT_TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}_rebuild")
+            # Indexes only: a copied serial default would tie the copy to the live table's sequence
+            cursor.execute(f"CREATE TABLE {table}_rebuild (LIKE {table} INCLUDING INDEXES)")
+        self.suffix = "_rebuild"
+
+    def finish_rebuild(self) -> None:
+        """Replace the live tables with the rebuilt copies in the caller's transaction"""
+        cursor = self._cursor()
+        for table in REBUILT_TABLES:
+            cursor.execute(f"DROP TABLE {table}")
+            cursor.execute(f"ALTER TABLE {table}_rebuild RENAME TO {table}")
+            cursor.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_rebuild_pkey TO {table}_pkey")
+        self.suffix = ""
+
+    def add_counts(self, pairs: Dict[str, np.ndarray], items: Dict[str, np.ndarray]) -> None:
+        """Add count deltas: COPY into temporary tables, then one upsert per table"""
+        cursor = self._cursor()
+        for table, columns, layout in (("copurchase_pairs", pairs, PAIR_COLUMNS),
+                                       ("copurchase_items", items, ITEM_COLUMNS)):
+            if not len(columns["product_id"]):
+                continue
+            names = ", ".join(name for name, _ in layout)
+            keys = ", ".join(name for name, _ in layout[:-1])
+            # Reused by every batch of a full rebuild, which commits only at the end
+            cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table}_delta (LIKE {table}) ON COMMIT DROP")
+            copy_into(cursor, f"{table}_delta", columns, layout)
+            cursor.execute(f"""
+                INSERT INTO {table}{self.suffix} AS t ({names}) SELECT {names} FROM {table}_delta
+                ON CONFLICT ({keys}) DO UPDATE SET orders = t.orders + excluded.orders
+            """)
+            cursor.execute(f"TRUNCATE {table}_delta")
+
+    def refresh_lists(self, product_ids: List[int], top_k: int, min_support: int,
+                      similarity: str, total_orders: int) -> int:
+        """Recompute the top-k lists of ``product_ids`` from the current counts"""
+        self.db.execute(text(f"DELETE FROM product_also_bought{self.suffix} WHERE product_id = ANY(:ids)"),
+                        {"ids": product_ids})
+        result = self.db.execute(text(f"""
+            INSERT INTO product_also_bought{self.suffix} (product_id, rank, other_id, score)
+            SELECT product_id, rank - 1, other_id, score FROM (
+                SELECT product_id, other_id, score,
+                       row_number() OVER (PARTITION BY product_id ORDER BY score DESC, other_id) AS rank
+                FROM (
+                    SELECT p.product_id, p.other_id, {SCORES[similarity]} AS score
+                    FROM copurchase_pairs{self.suffix} p
+                    JOIN copurchase_items{self.suffix} a ON a.product_id = p.product_id
+                    JOIN copurchase_items{self.suffix} b ON b.product_id = p.other_id
+                    WHERE p.product_id = ANY(:ids) AND p.orders >= :min_support
+                ) scored
+            ) ranked
+            WHERE rank <= :top_k
+        """), {"ids": product_ids, "min_support": min_support, "top_k": top_k, "total_orders": total_orders})
+        return result.rowcount
+
+    def all_product_ids(self) -> List[int]:
+        return self.db.execute(text(
+            f"SELECT product_id FROM copurchase_items{self.suffix} ORDER BY product_id"
+        )).scalars().all()
+
+    def also_bought_ids(self, product_id: int) -> List[int]:
+        """The whole stored list, best first"""
+        return self.db.execute(text(
+            "SELECT other_id FROM product_also_bought WHERE product_id = :product_id ORDER BY rank"
+        ), {"product_id": product_id}).scalars().all()
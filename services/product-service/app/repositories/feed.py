@@ -0,0 +1,61 @@
+# Service: Product Service
+# Responsibility: Catalog reads and fingerprint storage for the shopping-feed generator
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.copy import copy_into
+from app.models.feed import FeedItem
+from app.models.product import Product
+
+FINGERPRINT_COLUMNS = (("product_id", ">i4"), ("fingerprint", ">i8"))
+
+
+class FeedRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def begin_consistent_read(self) -> None:
+        """REPEATABLE READ for the whole run, so the files match one catalog version; must come first"""
+        self.db.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+
+    def try_lock(self) -> bool:
+        """Transaction-scoped advisory lock; the whole run is one transaction"""
+        return self.db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('shopping-feed'))")).scalar()
+
+    def get_state(self) -> Optional[int]:
+        return self.db.execute(text("SELECT catalog_version FROM feed_state WHERE id = 1")).scalar()
+
+    def set_state(self, catalog_version: int) -> None:
+        self.db.execute(text("""
+            INSERT INTO feed_state (id, catalog_version, generated_at) VALUES (1, :version, :now)
+            ON CONFLICT (id) DO UPDATE SET catalog_version = excluded.catalog_version, generated_at = excluded.generated_at
+        """), {"version": catalog_version, "now": datetime.utcnow()})
+
+    def iter_products(self, batch_size: int) -> Iterator[Product]:
+        """Every product by id, through a server-side cursor"""
+        return self.db.query(Product).order_by(Product.id).yield_per(batch_size)
+
+    def iter_products_with_fingerprints(self, batch_size: int) -> Iterator[Tuple[Product, Optional[int]]]:
+        """(product, fingerprint from the last run) for every product by id, through a server-side cursor"""
+        return self.db.query(Product, FeedItem.fingerprint).outerjoin(
+            FeedItem, FeedItem.product_id == Product.id
+        ).order_by(Product.id).yield_per(batch_size)
+
+    def stage_fingerprints(self, product_ids: np.ndarray, fingerprints: np.ndarray) -> int:
+        """COPY new fingerprints into a temp table; ``apply_fingerprints`` merges them at the end of the run"""
+        self.db.execute(text("""
+            CREATE TEMP TABLE IF NOT EXISTS feed_items_stage (product_id integer, fingerprint bigint) ON COMMIT DROP
+        """))
+        return copy_into(self.db.connection().connection.cursor(), "feed_items_stage",
+                         {"product_id": product_ids, "fingerprint": fingerprints}, FINGERPRINT_COLUMNS)
+
+    def apply_fingerprints(self) -> int:
+        return self.db.execute(text("""
+            INSERT INTO feed_items (product_id, fingerprint)
+            SELECT product_id, fingerprint FROM feed_items_stage
+            ON CONFLICT (product_id) DO UPDATE SET fingerprint = excluded.fingerprint
+        """)).rowcount
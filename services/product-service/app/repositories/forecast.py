@@ -0,0 +1,59 @@
+# Service: Product Service
+# Responsibility: Bulk I/O for the stock forecast job (COPY in and out of PostgreSQL)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.copy import copy_into, copy_out
+
+# (column, PostgreSQL binary COPY wire type); every stored value is non-NULL and fixed width
+FORECAST_COLUMNS = (
+    ("product_id", ">i4"), ("stock", ">i4"), ("daily_velocity", ">f8"), ("demand_std", ">f8"),
+    ("days_of_cover", ">f8"), ("safety_stock", ">f8"), ("reorder_point", ">f8"),
+    ("reorder_quantity", ">i4"), ("needs_reorder", "i1"),
+)
+STOCK_COLUMNS = (("id", ">i4"), ("stock", ">i4"))
+
+
+class ForecastRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _cursor(self):
+        return self.db.connection().connection.cursor()
+
+    def try_lock(self) -> bool:
+        """Transaction-scoped advisory lock so only one replica runs the job at a time"""
+        return self.db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('stock-forecast'))")).scalar()
+
+    def load_stock(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All (product_id, stock) pairs as sorted int64 arrays, read with binary COPY rather than row objects"""
+        columns = copy_out(self._cursor(), "SELECT id, coalesce(stock, 0) FROM products ORDER BY id", STOCK_COLUMNS)
+        return columns["id"].astype(np.int64), columns["stock"].astype(np.int64)
+
+    def replace_all(self, columns: Dict[str, np.ndarray]) -> int:
+        """Swap in a new forecast in the caller's transaction.
+
+        TRUNCATE (rather than DELETE) leaves no dead rows behind and lets the
+        COPY skip most WAL work; readers wait for the commit instead of seeing
+        a half-written table. ``days_of_cover`` must be finite: the job only
+        stores SKUs that sell or are out of stock.
+        """
+        cursor = self._cursor()
+        cursor.execute("TRUNCATE stock_forecasts")
+        return copy_into(cursor, "stock_forecasts", columns, FORECAST_COLUMNS)
+
+    def list(self, needs_reorder: Optional[bool], limit: int, offset: int) -> List[dict]:
+        where = "" if needs_reorder is None else "WHERE f.needs_reorder = :needs_reorder"
+        rows = self.db.execute(text(f"""
+            SELECT f.product_id, p.name, p.category, f.stock, f.daily_velocity, f.demand_std,
+                   f.days_of_cover, f.safety_stock, f.reorder_point, f.reorder_quantity,
+                   f.needs_reorder, f.computed_at
+            FROM stock_forecasts f JOIN products p ON p.id = f.product_id
+            {where}
+            ORDER BY f.days_of_cover ASC NULLS LAST, f.product_id
+            LIMIT :limit OFFSET :offset
+        """), {"needs_reorder": needs_reorder, "limit": limit, "offset": offset}).mappings().all()
+        return [dict(row) for row in rows]
@@ -0,0 +1,226 @@
+# Service: Product Service
+# Responsibility: Inventory reservations with single-statement conditional stock decrements
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, update, delete, insert, func
+from sqlalchemy.orm import Session
+from app.models.inventory import InventoryReservation, InventoryReservationItem, ProductStockShard
+from app.models.product import Product
+
+products = Product.__table__
+shards = ProductStockShard.__table__
+reservations = InventoryReservation.__table__
+reservation_items = InventoryReservationItem.__table__
+
+
+class ReservationError(Exception):
+    def __init__(self, product_id: int, reason: str):
+        super().__init__(f"Product {product_id}: {reason}")
+        self.product_id = product_id
+        self.reason = reason  # not_found, insufficient_stock
+
+
+class InventoryRepository:
+    """Stock is only ever changed with ``stock = stock -/+ n`` statements guarded by
+    ``stock >= n``, never read-modify-write, so concurrent reservations cannot oversell.
+    Methods flush but do not commit; the caller owns the transaction.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, reservation_id: str) -> Optional[InventoryReservation]:
+        return self.db.query(InventoryReservation).filter(InventoryReservation.id == reservation_id).first()
+
+    def reserve(self, reservation_id: str, items: Dict[int, int], expires_at: datetime,
+                order_ref: Optional[str] = None) -> InventoryReservation:
+        reservation = InventoryReservation(id=reservation_id, status="pending",
+                                           expires_at=expires_at, order_ref=order_ref)
+        # Lock rows in a global order (product id) so multi-item reservations cannot deadlock
+        for product_id in sorted(items):
+            for shard, quantity in self._decrement(product_id, items[product_id]):
+                reservation.items.append(InventoryReservationItem(
+                    product_id=product_id, quantity=quantity, shard=shard
+                ))
+        self.db.add(reservation)
+        self.db.flush()
+        return reservation
+
+    def _decrement(self, product_id: int, quantity: int) -> List[Tuple[Optional[int], int]]:
+        hit = self.db.execute(
+            update(products)
+            .where(products.c.id == product_id, products.c.stock_shards == 0, products.c.stock >= quantity)
+            .values(stock=products.c.stock - quantity, version=products.c.version + 1,
+                    updated_at=datetime.utcnow())
+            .returning(products.c.id)
+        ).first()
+        if hit:
+            return [(None, quantity)]
+
+        # Hot SKU: decrement one shard that has enough stock and is not locked by another
+        # checkout. SKIP LOCKED means callers spread over shards instead of queueing, and
+        # never hold a shard lock while waiting for another one.
+        candidate = select(shards.c.shard).where(
+            shards.c.product_id == product_id, shards.c.stock >= quantity
+        ).order_by(func.random()).limit(1).with_for_update(skip_locked=True).scalar_subquery()
+        hit = self.db.execute(
+            update(shards)
+            .where(shards.c.product_id == product_id, shards.c.shard == candidate)
+            .values(stock=shards.c.stock - quantity)
+            .returning(shards.c.shard)
+        ).first()
+        if hit:
+            return [(hit.shard, quantity)]
+
+        shard_count = self.db.execute(
+            select(products.c.stock_shards).where(products.c.id == product_id)
+        ).scalar()
+        if shard_count is None:
+            raise ReservationError(product_id, "not_found")
+        if shard_count == 0:
+            raise ReservationError(product_id, "insufficient_stock")
+
+        # No single shard covers the request: take what each shard has, in ascending
+        # shard order so concurrent splitters acquire row locks in the same order.
+        # Every take is still a conditional decrement; a stale read only means a retry.
+        taken, remaining = [], quantity
+        for shard in range(shard_count):
+            while remaining:
+                available = self.db.execute(
+                    select(shards.c.stock).where(shards.c.product_id == product_id, shards.c.shard == shard)
+                ).scalar() or 0
+                take = min(available, remaining)
+                if take <= 0:
+                    break
+                hit = self.db.execute(
+                    update(shards)
+                    .where(shards.c.product_id == product_id, shards.c.shard == shard, shards.c.stock >= take)
+                    .values(stock=shards.c.stock - take)
+                    .returning(shards.c.shard)
+                ).first()
+                if hit:
+                    taken.append((shard, take))
+                    remaining -= take
+                    break
+            if not remaining:
+                return taken
+        raise ReservationError(product_id, "insufficient_stock")
+
+    def commit(self, reservation_id: str) -> bool:
+        """Mark a pending reservation as consumed; the stock is already deducted"""
+        return self.db.execute(
+            update(reservations)
+            .where(reservations.c.id == reservation_id, reservations.c.status == "pending")
+            .values(status="committed", updated_at=datetime.utcnow())
+            .returning(reservations.c.id)
+        ).first() is not None
+
+    def release(self, reservation_ids: List[str], status: str = "released") -> Set[int]:
+        """Return the stock of pending reservations; returns the product ids restocked"""
+        released = self.db.execute(
+            update(reservations)
+            .where(reservations.c.id.in_(reservation_ids), reservations.c.status == "pending")
+            .values(status=status, updated_at=datetime.utcnow())
+            .returning(reservations.c.id)
+        ).scalars().all()
+        if not released:
+            return set()
+        return self._restock(released)
+
+    def _restock(self, reservation_ids: List[str]) -> Set[int]:
+        per_product = select(
+            reservation_items.c.product_id, func.sum(reservation_items.c.quantity).label("quantity")
+        ).where(
+            reservation_items.c.reservation_id.in_(reservation_ids), reservation_items.c.shard.is_(None)
+        ).group_by(reservation_items.c.product_id).subquery()
+        per_shard = select(
+            reservation_items.c.product_id, reservation_items.c.shard,
+            func.sum(reservation_items.c.quantity).label("quantity")
+        ).where(
+            reservation_items.c.reservation_id.in_(reservation_ids), reservation_items.c.shard.is_not(None)
+        ).group_by(reservation_items.c.product_id, reservation_items.c.shard).subquery()
+
+        # Take row locks in the same order reserve() does before the multi-row updates
+        self.db.execute(
+            select(products.c.id).where(products.c.id.in_(select(per_product.c.product_id)))
+            .order_by(products.c.id).with_for_update()
+        )
+        restocked = set(self.db.execute(
+            update(products)
+            .where(products.c.id == per_product.c.product_id)
+            .values(stock=products.c.stock + per_product.c.quantity, version=products.c.version + 1,
+                    updated_at=datetime.utcnow())
+            .returning(products.c.id)
+        ).scalars().all())
+        restocked.update(self.db.execute(
+            update(shards)
+            .where(shards.c.product_id == per_shard.c.product_id, shards.c.shard == per_shard.c.shard)
+            .values(stock=shards.c.stock + per_shard.c.quantity)
+            .returning(shards.c.product_id)
+        ).scalars().all())
+        return restocked
+
+    def expire_due(self, limit: int) -> Set[int]:
+        """Release up to ``limit`` expired pending reservations, skipping rows other workers hold"""
+        due = self.db.execute(
+            select(reservations.c.id)
+            .where(reservations.c.status == "pending", reservations.c.expires_at < datetime.utcnow())
+            .order_by(reservations.c.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        return self.release(due, status="expired") if due else set()
+
+    # Sharded counters
+    def set_shards(self, product_id: int, shard_count: int, total: Optional[int] = None) -> Optional[Product]:
+        """(Re)distribute a product's stock over ``shard_count`` shards (0 = unsharded).
+
+        ``total`` overrides the stock being redistributed (admin stock overwrite).
+        """
+        product = self.db.query(Product).filter(Product.id == product_id).with_for_update().first()
+        if not product:
+            return None
+        current = self.db.execute(
+            select(shards.c.stock).where(shards.c.product_id == product_id)
+            .order_by(shards.c.shard).with_for_update()
+        ).scalars().all()
+        if total is None:
+            total = sum(current) if product.stock_shards else product.stock
+
+        self.db.execute(delete(shards).where(shards.c.product_id == product_id))
+        if shard_count:
+            base, extra = divmod(total, shard_count)
+            self.db.execute(insert(shards), [
+                {"product_id": product_id, "shard": i, "stock": base + (1 if i < extra else 0)}
+                for i in range(shard_count)
+            ])
+        # Pending reservations must be returned to a shard that still exists
+        self.db.execute(
+            update(reservation_items)
+            .where(reservation_items.c.product_id == product_id, reservation_items.c.shard.is_not(None))
+            .values(shard=(reservation_items.c.shard % shard_count) if shard_count else None)
+        )
+        product.stock = total
+        product.stock_shards = shard_count
+        product.version = Product.version + 1
+        self.db.flush()
+        return product
+
+    def refresh_sharded_stock(self, product_ids: Set[int]) -> None:
+        """Fold shard totals back into products.stock, the value shown in product payloads"""
+        totals = select(
+            shards.c.product_id, func.sum(shards.c.stock).label("stock")
+        ).where(shards.c.product_id.in_(product_ids)).group_by(shards.c.product_id).subquery()
+        self.db.execute(
+            update(products)
+            .where(products.c.id == totals.c.product_id, products.c.stock_shards > 0,
+                   products.c.stock != totals.c.stock)
+            .values(stock=totals.c.stock, version=products.c.version + 1, updated_at=datetime.utcnow())
+        )
+
+    def get_categories(self, product_ids: Set[int]) -> List[Tuple[int, Optional[str]]]:
+        return self.db.execute(
+            select(products.c.id, products.c.category).where(products.c.id.in_(product_ids))
+        ).all()
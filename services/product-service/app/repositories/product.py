@@ -2,10 +2,33 @@
 # Responsibility: Product repository for DB operations
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, literal, literal_column, or_, select, true, union_all
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from app.models.product import Product
+from app.models.related import ProductNeighbor
 from app.schemas.product import ProductCreate, ProductUpdate
 
+# Columns an imported row may overwrite when it matches an existing SKU (only
+# the ones the row supplies); rating and reviews_count belong to the reviews
+UPSERT_FIELDS = ("name", "description", "image", "price", "stock", "category", "brand",
+                 "images", "specifications")
+
+# Attribute filters: spec key -> accepted values (any of them)
+SpecFilters = Dict[str, List[str]]
+
+
+def _spec_conditions(filters: SpecFilters, category: Optional[str], skip_key: Optional[str] = None) -> list:
+    """WHERE clauses for a category and attribute filters; each filter is a GIN-indexed containment test"""
+    conditions = [Product.category == category] if category is not None else []
+    for key, values in filters.items():
+        if key != skip_key:
+            conditions.append(or_(*(Product.specifications_jsonb.contains({key: value}) for value in values)))
+    return conditions
+
+
 class ProductRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -13,6 +36,9 @@ class ProductRepository:
     def get(self, product_id: int):
         return self.db.query(Product).filter(Product.id == product_id).first()
 
+    def get_many(self, product_ids: list):
+        return self.db.query(Product).filter(Product.id.in_(product_ids)).all()
+
     def get_all(self):
         return self.db.query(Product).all()
 
@@ -29,6 +55,17 @@ class ProductRepository:
             return None
         for field, value in product_in.model_dump(exclude_unset=True).items():
             setattr(db_product, field, value)
+        db_product.version = Product.version + 1
+        self.db.commit()
+        self.db.refresh(db_product)
+        return db_product
+
+    def update_stock(self, product_id: int, stock: int):
+        db_product = self.get(product_id)
+        if not db_product:
+            return None
+        db_product.stock = stock
+        db_product.version = Product.version + 1
         self.db.commit()
         self.db.refresh(db_product)
         return db_product
@@ -53,14 +90,85 @@ class ProductRepository:
     
     def get_by_category(self, category: str):
         return self.db.query(Product).filter(Product.category == category).all()
+
+    def get_by_categories(self, categories: List[str]):
+        """Products in any of ``categories`` (e.g. a category subtree), via ix_products_category"""
+        return self.db.query(Product).filter(Product.category.in_(categories)).order_by(Product.id).all()
     
+    def filter_by_specs(self, filters: SpecFilters, category: Optional[str] = None):
+        return self.db.query(Product).filter(*_spec_conditions(filters, category)).order_by(Product.id).all()
+
+    def spec_facets(self, filters: SpecFilters, category: Optional[str] = None) -> List[Tuple[str, str, int]]:
+        """(key, value, product count) for every attribute of the products matching the filters.
+
+        Counts for a filtered key ignore that key's own filter, so the other
+        values of an attribute being filtered on stay selectable. That is one
+        aggregate per filtered key plus one over the unnested remaining keys,
+        each narrowed by the GIN index where its filters allow.
+        """
+        def counts(skip_key: Optional[str]):
+            conditions = _spec_conditions(filters, category, skip_key)
+            if skip_key is not None:
+                value = Product.specifications_jsonb[skip_key].astext
+                return select(literal(skip_key), value, func.count()).where(
+                    *conditions, value.isnot(None)
+                ).group_by(value)
+            pairs = func.jsonb_each_text(Product.specifications_jsonb).table_valued("key", "value").lateral()
+            query = select(pairs.c.key, pairs.c.value, func.count()).select_from(Product).join(pairs, true()).where(
+                *conditions, pairs.c.key.notin_(list(filters)) if filters else true()
+            )
+            return query.group_by(pairs.c.key, pairs.c.value)
+
+        queries = [counts(None)] + [counts(key) for key in filters]
+        return [tuple(row) for row in self.db.execute(union_all(*queries))]
+
     def get_related_products(self, product_id: int, limit: int = 4):
-        """Get related products based on category"""
-        product = self.get(product_id)
-        if not product:
-            return []
-        
+        """Precomputed neighbors in similarity order (one primary-key range scan).
+
+        Products the related-products job has not indexed yet fall back to the
+        best-rated products of the same category.
+        """
+        related = self.db.query(Product).join(
+            ProductNeighbor, ProductNeighbor.neighbor_id == Product.id
+        ).filter(
+            ProductNeighbor.product_id == product_id
+        ).order_by(ProductNeighbor.rank).limit(limit).all()
+        if related:
+            return related
+        base_category = select(Product.category).where(Product.id == product_id).scalar_subquery()
         return self.db.query(Product).filter(
-            Product.category == product.category,
+            Product.category == base_category,
             Product.id != product_id
-        ).limit(limit).all()
+        ).order_by(Product.rating.desc().nulls_last(), Product.id).limit(limit).all()
+
+    def upsert_many(self, rows: list):
+        """Insert or update products by SKU (caller commits).
+
+        An existing product only has the columns its row supplies overwritten.
+        Rows are grouped by the set of columns they supply, one statement per
+        group. Returns ``(id, category, inserted, previous_category)`` per row
+        so callers can count inserts vs updates and invalidate both old and
+        new categories.
+        """
+        previous = dict(self.db.query(Product.sku, Product.category).filter(
+            Product.sku.in_([row["sku"] for row in rows])
+        ).all())
+        groups: Dict[Tuple[str, ...], list] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        results = []
+        for columns, group in groups.items():
+            stmt = insert(Product).values(group)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Product.sku],
+                set_={
+                    **{field: stmt.excluded[field] for field in UPSERT_FIELDS if field in columns},
+                    "version": Product.version + 1,
+                    "updated_at": datetime.utcnow(),
+                },
+            ).returning(Product.id, Product.sku, Product.category, literal_column("(xmax = 0)").label("inserted"))
+            results += [
+                (row.id, row.category, row.inserted, previous.get(row.sku))
+                for row in self.db.execute(stmt)
+            ]
+        return results
@@ -0,0 +1,55 @@
+# Service: Product Service
+# Responsibility: Storage for precomputed related-product neighbor lists
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.copy import copy_into
+
+NEIGHBOR_COLUMNS = (("product_id", ">i4"), ("rank", ">i2"), ("neighbor_id", ">i4"), ("score", ">f8"))
+
+
+class RelatedRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def try_lock(self) -> bool:
+        """Session-level advisory lock; the job commits per category, so a transaction lock would not last"""
+        return self.db.execute(text("SELECT pg_try_advisory_lock(hashtext('related-products'))")).scalar()
+
+    def unlock(self) -> None:
+        self.db.execute(text("SELECT pg_advisory_unlock(hashtext('related-products'))"))
+
+    def get_watermark(self) -> Optional[datetime]:
+        return self.db.execute(text("SELECT watermark FROM related_build_state WHERE id = 1")).scalar()
+
+    def set_watermark(self, watermark: datetime) -> None:
+        self.db.execute(text("""
+            INSERT INTO related_build_state (id, watermark) VALUES (1, :watermark)
+            ON CONFLICT (id) DO UPDATE SET watermark = excluded.watermark
+        """), {"watermark": watermark})
+
+    def categories(self, changed_since: Optional[datetime] = None) -> List[str]:
+        """All categories, or only those with products changed after ``changed_since``"""
+        if changed_since is None:
+            query, params = "SELECT DISTINCT coalesce(category, '') FROM products", {}
+        else:
+            query = "SELECT DISTINCT coalesce(category, '') FROM products WHERE updated_at > :since"
+            params = {"since": changed_since}
+        return sorted(self.db.execute(text(query), params).scalars().all())
+
+    def bucket(self, category: str) -> List[Tuple]:
+        """(id, name, brand, price, specifications) of every product in a category ('' = uncategorized)"""
+        condition = "(category IS NULL OR category = '')" if category == "" else "category = :category"
+        return self.db.execute(text(f"""
+            SELECT id, name, brand, price, specifications FROM products WHERE {condition} ORDER BY id
+        """), {"category": category}).all()
+
+    def replace_neighbors(self, product_ids: np.ndarray, columns: Dict[str, np.ndarray]) -> int:
+        """Replace the lists of ``product_ids`` in the caller's transaction"""
+        self.db.execute(text("DELETE FROM product_neighbors WHERE product_id = ANY(:ids)"),
+                        {"ids": [int(pid) for pid in product_ids]})
+        return copy_into(self.db.connection().connection.cursor(), "product_neighbors", columns, NEIGHBOR_COLUMNS)
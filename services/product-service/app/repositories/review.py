@@ -0,0 +1,131 @@
+# Service: Product Service
+# Responsibility: Review storage with incremental rating aggregates
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from datetime import datetime
+from typing import List, Optional
+from keyset import Keyset, before
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.models.review import ProductRatingStats, ProductReview
+
+STARS = range(1, 6)
+
+# Every write is one statement: the review row, the product's running totals
+# and the rating/reviews_count copy on products change together. Concurrent
+# reviews of a product serialize on its product_rating_stats row (always
+# locked before the products row), so the totals never drift and nothing
+# ever re-aggregates the reviews.
+_SUMMARY = """
+    summary AS (
+        UPDATE products p SET
+            reviews_count = s.reviews,
+            rating = CASE WHEN s.reviews > 0 THEN round(s.rating_sum::numeric / s.reviews, 2)::float8 ELSE 0 END,
+            version = p.version + 1,
+            updated_at = :now
+        FROM stats s WHERE p.id = s.product_id
+        RETURNING p.category
+    )
+"""
+
+_CREATE = f"""
+    WITH added AS (
+        INSERT INTO product_reviews (product_id, user_id, user_name, rating, comment, created_at, updated_at)
+        SELECT p.id, :user_id, :user_name, :rating, :comment, :now, :now FROM products p WHERE p.id = :product_id
+        ON CONFLICT ON CONSTRAINT unique_product_review_user DO NOTHING
+        RETURNING *
+    ), stats AS (
+        INSERT INTO product_rating_stats (product_id, reviews, rating_sum, {", ".join(f"stars_{k}" for k in STARS)})
+        SELECT product_id, 1, rating, {", ".join(f"(rating = {k})::int" for k in STARS)} FROM added
+        ON CONFLICT (product_id) DO UPDATE SET
+            reviews = product_rating_stats.reviews + 1,
+            rating_sum = product_rating_stats.rating_sum + excluded.rating_sum,
+            {", ".join(f"stars_{k} = product_rating_stats.stars_{k} + excluded.stars_{k}" for k in STARS)}
+        RETURNING product_id, reviews, rating_sum
+    ), {_SUMMARY}
+    SELECT added.*, (SELECT category FROM summary) AS category FROM added
+"""
+
+_UPDATE = f"""
+    WITH old AS (
+        SELECT id, rating FROM product_reviews
+        WHERE id = :review_id AND product_id = :product_id AND user_id = :user_id FOR UPDATE
+    ), changed AS (
+        UPDATE product_reviews r SET
+            rating = coalesce(:rating, r.rating),
+            comment = CASE WHEN :set_comment THEN :comment ELSE r.comment END,
+            updated_at = :now
+        FROM old WHERE r.id = old.id
+        RETURNING r.*, old.rating AS old_rating
+    ), stats AS (
+        UPDATE product_rating_stats s SET
+            rating_sum = s.rating_sum + c.rating - c.old_rating,
+            {", ".join(f"stars_{k} = s.stars_{k} + (c.rating = {k})::int - (c.old_rating = {k})::int" for k in STARS)}
+        FROM changed c WHERE s.product_id = c.product_id AND c.rating <> c.old_rating
+        RETURNING s.product_id, s.reviews, s.rating_sum
+    ), {_SUMMARY}
+    SELECT changed.*, (SELECT category FROM summary) AS category FROM changed
+"""
+
+_DELETE = f"""
+    WITH removed AS (
+        DELETE FROM product_reviews
+        WHERE id = :review_id AND product_id = :product_id AND user_id = :user_id RETURNING *
+    ), stats AS (
+        UPDATE product_rating_stats s SET
+            reviews = s.reviews - 1,
+            rating_sum = s.rating_sum - r.rating,
+            {", ".join(f"stars_{k} = s.stars_{k} - (r.rating = {k})::int" for k in STARS)}
+        FROM removed r WHERE s.product_id = r.product_id
+        RETURNING s.product_id, s.reviews, s.rating_sum
+    ), {_SUMMARY}
+    SELECT removed.*, (SELECT category FROM summary) AS category FROM removed
+"""
+
+
+class ReviewRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, product_id: int, user_id: int, user_name: Optional[str], rating: int,
+               comment: Optional[str]):
+        """Insert a review (caller commits); None if the product does not exist or the user already reviewed it"""
+        return self.db.execute(text(_CREATE), {
+            "product_id": product_id, "user_id": user_id, "user_name": user_name,
+            "rating": rating, "comment": comment, "now": datetime.utcnow(),
+        }).first()
+
+    def update(self, product_id: int, review_id: int, user_id: int, rating: Optional[int], set_comment: bool,
+               comment: Optional[str]):
+        """Change rating and/or comment of ``user_id``'s review (caller commits); the row has ``old_rating``; None if not found"""
+        return self.db.execute(text(_UPDATE), {
+            "product_id": product_id, "review_id": review_id, "user_id": user_id, "rating": rating,
+            "set_comment": set_comment, "comment": comment, "now": datetime.utcnow(),
+        }).first()
+
+    def delete(self, product_id: int, review_id: int, user_id: int):
+        """Delete ``user_id``'s review (caller commits); None if not found"""
+        return self.db.execute(text(_DELETE), {
+            "product_id": product_id, "review_id": review_id, "user_id": user_id, "now": datetime.utcnow(),
+        }).first()
+
+    def author(self, product_id: int, review_id: int) -> Optional[int]:
+        """The user who wrote the review; None if it does not exist"""
+        return self.db.execute(text("SELECT user_id FROM product_reviews WHERE id = :review_id AND product_id = :product_id"),
+                               {"product_id": product_id, "review_id": review_id}).scalar()
+
+    def product_exists(self, product_id: int) -> bool:
+        return self.db.execute(text("SELECT 1 FROM products WHERE id = :id"), {"id": product_id}).first() is not None
+
+    def list(self, product_id: int, rating: Optional[int], after: Optional[Keyset],
+             limit: int) -> List[ProductReview]:
+        """Newest first, strictly after the ``(created_at, id)`` keyset cursor; one index range scan per page"""
+        query = self.db.query(ProductReview).filter(ProductReview.product_id == product_id)
+        if rating is not None:
+            query = query.filter(ProductReview.rating == rating)
+        if after is not None:
+            query = query.filter(before(ProductReview.created_at, ProductReview.id, after))
+        return query.order_by(ProductReview.created_at.desc(), ProductReview.id.desc()).limit(limit).all()
+
+    def get_stats(self, product_id: int) -> Optional[ProductRatingStats]:
+        return self.db.query(ProductRatingStats).filter(ProductRatingStats.product_id == product_id).first()
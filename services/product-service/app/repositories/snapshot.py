@@ -0,0 +1,29 @@
+# Service: Product Service
+# Responsibility: Consistent catalog reads for snapshot builds
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from typing import Iterator
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.models.product import Product
+
+
+class SnapshotRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def begin_consistent_read(self) -> None:
+        """Start a read-only REPEATABLE READ transaction; must be the first statement of the transaction.
+
+        Every later read (catalog version, products) then sees the same
+        database snapshot, so the file matches its version exactly.
+        """
+        self.db.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY"))
+
+    def try_lock(self) -> bool:
+        """Transaction-scoped advisory lock; replicas share the uploads volume"""
+        return self.db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('catalog-snapshot'))")).scalar()
+
+    def iter_products(self, batch_size: int) -> Iterator[Product]:
+        """All products by id, streamed through a server-side cursor"""
+        return self.db.query(Product).order_by(Product.id).yield_per(batch_size)
@@ -0,0 +1,170 @@
+# Service: Product Service
+# Responsibility: Inventory statistics (SQL aggregates, trigger-maintained per-category totals)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# "Low stock" means 0 < stock < LOW_STOCK_THRESHOLD; baked into the triggers below
+LOW_STOCK_THRESHOLD = 10
+
+_CONTRIBUTION = f"""
+    coalesce(category, '') AS category,
+    sign AS products,
+    sign * (stock > 0)::int AS in_stock,
+    sign * (stock > 0 AND stock < {LOW_STOCK_THRESHOLD})::int AS low_stock,
+    sign * (price::numeric * stock) AS total_value
+"""
+
+# Statement-level triggers with transition tables: one INSERT into the delta
+# table per statement and category, whatever the number of rows touched, so
+# bulk imports stay cheap and hot-SKU decrements never lock a shared stats row.
+_TRIGGER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION inventory_stats_capture() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO inventory_stats_delta (category, products, in_stock, low_stock, total_value)
+        SELECT category, sum(products), sum(in_stock), sum(low_stock), sum(total_value)
+        FROM (SELECT {_CONTRIBUTION} FROM (SELECT 1 AS sign, * FROM new_rows) r) c
+        GROUP BY category;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO inventory_stats_delta (category, products, in_stock, low_stock, total_value)
+        SELECT category, sum(products), sum(in_stock), sum(low_stock), sum(total_value)
+        FROM (SELECT {_CONTRIBUTION} FROM (SELECT -1 AS sign, * FROM old_rows) r) c
+        GROUP BY category;
+    ELSE
+        INSERT INTO inventory_stats_delta (category, products, in_stock, low_stock, total_value)
+        SELECT category, sum(products), sum(in_stock), sum(low_stock), sum(total_value)
+        FROM (
+            SELECT {_CONTRIBUTION} FROM (SELECT 1 AS sign, * FROM new_rows) r
+            UNION ALL
+            SELECT {_CONTRIBUTION} FROM (SELECT -1 AS sign, * FROM old_rows) r
+        ) c
+        GROUP BY category
+        HAVING sum(products) <> 0 OR sum(in_stock) <> 0 OR sum(low_stock) <> 0 OR sum(total_value) <> 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+_TRIGGERS = {
+    "inventory_stats_insert": "AFTER INSERT ON products REFERENCING NEW TABLE AS new_rows",
+    "inventory_stats_update": "AFTER UPDATE ON products REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "inventory_stats_delete": "AFTER DELETE ON products REFERENCING OLD TABLE AS old_rows",
+}
+
+_TOTALS = """
+    SELECT category, products, in_stock, low_stock, total_value FROM inventory_stats
+    UNION ALL
+    SELECT category, products, in_stock, low_stock, total_value FROM inventory_stats_delta
+"""
+
+
+def sync_stats_triggers(conn, enabled: bool) -> None:
+    """Install (and seed) or drop the incremental stats triggers; safe on every startup.
+
+    Seeding takes a SHARE lock on products so no write slips in between the
+    snapshot and the trigger becoming active.
+    """
+    installed = conn.execute(text(
+        "SELECT count(*) FROM pg_trigger WHERE tgname = ANY(:names) AND NOT tgisinternal"
+    ), {"names": list(_TRIGGERS)}).scalar()
+    if not enabled:
+        for name in _TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON products"))
+        return
+    conn.execute(text(_TRIGGER_FUNCTION))
+    if installed == len(_TRIGGERS):
+        return
+    conn.execute(text("LOCK TABLE products IN SHARE MODE"))
+    for name, spec in _TRIGGERS.items():
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON products"))
+        conn.execute(text(f"CREATE TRIGGER {name} {spec} FOR EACH STATEMENT EXECUTE FUNCTION inventory_stats_capture()"))
+    _rebuild(conn)
+    logger.info("Installed incremental inventory stats triggers")
+
+
+def _rebuild(conn) -> None:
+    conn.execute(text("DELETE FROM inventory_stats_delta"))
+    conn.execute(text("DELETE FROM inventory_stats"))
+    conn.execute(text(f"""
+        INSERT INTO inventory_stats (category, products, in_stock, low_stock, total_value)
+        SELECT category, sum(products), sum(in_stock), sum(low_stock), sum(total_value)
+        FROM (SELECT {_CONTRIBUTION} FROM (SELECT 1 AS sign, * FROM products) r) c
+        GROUP BY category
+    """))
+
+
+class InventoryStatsRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def by_category(self, incremental: bool) -> List[dict]:
+        """Per-category totals: folded stats plus pending deltas, or one GROUP BY over products"""
+        source = _TOTALS if incremental else f"SELECT {_CONTRIBUTION} FROM (SELECT 1 AS sign, * FROM products) r"
+        rows = self.db.execute(text(f"""
+            SELECT category, sum(products) AS products, sum(in_stock) AS in_stock,
+                   sum(low_stock) AS low_stock, coalesce(sum(total_value), 0) AS total_value
+            FROM ({source}) s
+            GROUP BY category
+            HAVING sum(products) <> 0
+            ORDER BY category
+        """)).mappings().all()
+        return [dict(row) for row in rows]
+
+    def compact(self) -> int:
+        """Fold pending deltas into inventory_stats; returns the number of delta rows folded"""
+        result = self.db.execute(text("""
+            WITH moved AS (
+                DELETE FROM inventory_stats_delta RETURNING *
+            ), folded AS (
+                INSERT INTO inventory_stats (category, products, in_stock, low_stock, total_value)
+                SELECT category, sum(products), sum(in_stock), sum(low_stock), sum(total_value)
+                FROM moved GROUP BY category
+                ON CONFLICT (category) DO UPDATE SET
+                    products = inventory_stats.products + excluded.products,
+                    in_stock = inventory_stats.in_stock + excluded.in_stock,
+                    low_stock = inventory_stats.low_stock + excluded.low_stock,
+                    total_value = inventory_stats.total_value + excluded.total_value
+            )
+            SELECT count(*) FROM moved
+        """)).scalar()
+        self.db.execute(text("DELETE FROM inventory_stats WHERE products = 0"))
+        return result
+
+    def rebuild(self) -> None:
+        self.db.execute(text("LOCK TABLE products IN SHARE MODE"))
+        _rebuild(self.db.connection())
+
+    def low_stock(self, limit: int, horizon_days: float) -> List[dict]:
+        """Products that will run out soonest, by current stock / daily sales velocity.
+
+        The velocity is the one the stock forecast job computed from
+        order-service's daily sales (stock_forecasts); products it has no
+        sales for count as not selling. Sold-out products come first;
+        products without sales are listed only when already below
+        LOW_STOCK_THRESHOLD, after those with a run-out estimate.
+        """
+        rows = self.db.execute(text(f"""
+            WITH cover AS (
+                SELECT p.id, p.name, p.category, p.stock,
+                       coalesce(f.daily_velocity, 0) AS daily_velocity
+                FROM products p LEFT JOIN stock_forecasts f ON f.product_id = p.id
+            )
+            SELECT id, name, category, stock, daily_velocity,
+                   CASE WHEN stock <= 0 THEN 0 WHEN daily_velocity > 0 THEN stock / daily_velocity END AS days_until_out_of_stock
+            FROM cover
+            WHERE stock < {LOW_STOCK_THRESHOLD}
+               OR (daily_velocity > 0 AND stock / daily_velocity <= :horizon_days)
+            ORDER BY days_until_out_of_stock ASC NULLS LAST, stock ASC, id
+            LIMIT :limit
+        """), {
+            "horizon_days": horizon_days,
+            "limit": limit,
+        }).mappings().all()
+        return [dict(row) for row in rows]
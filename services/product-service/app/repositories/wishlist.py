@@ -2,43 +2,72 @@
 # Responsibility: Wishlist repository for DB operations
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from app.models.wishlist import Wishlist
 from app.models.product import Product
-from typing import List
+from typing import List, Optional, Set
+
+# Each write is one statement: the wishlist rows change and wishlist_counts
+# follows in the same snapshot, so concurrent clicks can neither duplicate a
+# row nor skew the counts.
+_ADD = """
+    WITH added AS (
+        INSERT INTO wishlists (user_id, product_id)
+        SELECT :user_id, p.id FROM products p WHERE p.id = ANY(:product_ids)
+        ON CONFLICT ON CONSTRAINT unique_user_product DO NOTHING
+        RETURNING id, product_id
+    ), counted AS (
+        INSERT INTO wishlist_counts (product_id, users)
+        SELECT product_id, 1 FROM added
+        ON CONFLICT (product_id) DO UPDATE SET users = wishlist_counts.users + 1
+    )
+    SELECT id, product_id FROM added
+"""
+
+_REMOVE = """
+    WITH removed AS (
+        DELETE FROM wishlists WHERE user_id = :user_id AND product_id = ANY(:product_ids)
+        RETURNING product_id
+    ), counted AS (
+        UPDATE wishlist_counts c SET users = c.users - 1
+        FROM removed r WHERE c.product_id = r.product_id
+    )
+    SELECT product_id FROM removed
+"""
+
 
 class WishlistRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def add_to_wishlist(self, user_id: int, product_id: int) -> Wishlist:
-        # Check if already exists
-        existing = self.db.query(Wishlist).filter(
-            Wishlist.user_id == user_id,
-            Wishlist.product_id == product_id
-        ).first()
-        
-        if existing:
-            return existing
-        
-        wishlist_item = Wishlist(user_id=user_id, product_id=product_id)
-        self.db.add(wishlist_item)
+    def add_many(self, user_id: int, product_ids: List[int]) -> List[int]:
+        """Add products (unknown ids are skipped); returns the ids that were not yet wishlisted"""
+        rows = self.db.execute(text(_ADD), {"user_id": user_id, "product_ids": list(set(product_ids))}).all()
         self.db.commit()
-        self.db.refresh(wishlist_item)
-        return wishlist_item
+        return sorted(product_id for _, product_id in rows)
 
-    def remove_from_wishlist(self, user_id: int, product_id: int) -> bool:
-        wishlist_item = self.db.query(Wishlist).filter(
-            Wishlist.user_id == user_id,
-            Wishlist.product_id == product_id
-        ).first()
-        
-        if not wishlist_item:
-            return False
-        
-        self.db.delete(wishlist_item)
+    def remove_many(self, user_id: int, product_ids: List[int]) -> List[int]:
+        """Remove products; returns the ids that were wishlisted"""
+        rows = self.db.execute(text(_REMOVE), {"user_id": user_id, "product_ids": list(set(product_ids))}).all()
         self.db.commit()
-        return True
+        return sorted(product_id for (product_id,) in rows)
+
+    def add_to_wishlist(self, user_id: int, product_id: int) -> Optional[dict]:
+        """Insert-or-get in one statement; None when the product does not exist"""
+        row = self.db.execute(text(_ADD), {"user_id": user_id, "product_ids": [product_id]}).first()
+        self.db.commit()
+        if row is None:
+            # Already wishlisted (or no such product): only this path needs a lookup
+            row = self.db.execute(text(
+                "SELECT id, product_id FROM wishlists WHERE user_id = :user_id AND product_id = :product_id"
+            ), {"user_id": user_id, "product_id": product_id}).first()
+        if row is None:
+            return None
+        return {"id": row[0], "user_id": user_id, "product_id": row[1]}
+
+    def remove_from_wishlist(self, user_id: int, product_id: int) -> bool:
+        return bool(self.remove_many(user_id, [product_id]))
 
     def get_user_wishlist(self, user_id: int) -> List[Wishlist]:
         return self.db.query(Wishlist).filter(Wishlist.user_id == user_id).all()
@@ -48,8 +77,17 @@ class WishlistRepository:
             Product, Wishlist.product_id == Product.id
         ).filter(Wishlist.user_id == user_id).all()
 
-    def is_in_wishlist(self, user_id: int, product_id: int) -> bool:
-        return self.db.query(Wishlist).filter(
-            Wishlist.user_id == user_id,
-            Wishlist.product_id == product_id
-        ).first() is not None
+    def get_product_ids(self, user_id: int) -> Set[int]:
+        """Wishlisted product ids only, no row objects"""
+        rows = self.db.query(Wishlist.product_id).filter(Wishlist.user_id == user_id).all()
+        return {product_id for (product_id,) in rows}
+
+    def most_wishlisted(self, limit: int) -> List[dict]:
+        rows = self.db.execute(text("""
+            SELECT c.product_id, p.name, p.category, p.price, p.stock, c.users
+            FROM wishlist_counts c JOIN products p ON p.id = c.product_id
+            WHERE c.users > 0
+            ORDER BY c.users DESC, c.product_id
+            LIMIT :limit
+        """), {"limit": limit}).mappings().all()
+        return [dict(row) for row in rows]
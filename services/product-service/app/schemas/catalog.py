@@ -0,0 +1,21 @@
+# Service: Product Service
+# Responsibility: Pydantic schemas for the catalog change feed
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from pydantic import BaseModel
+from typing import List, Literal
+
+class CatalogChangeRead(BaseModel):
+    version: int
+    entity: Literal["product", "category"]
+    entity_id: int
+    op: Literal["upsert", "delete"]
+
+    class Config:
+        from_attributes = True
+
+class CatalogChangesRead(BaseModel):
+    """One page of the change log; pass ``next_since`` as ``since`` to continue"""
+    changes: List[CatalogChangeRead]
+    next_since: int
+    has_more: bool
@@ -3,19 +3,22 @@
 # Architecture: FastAPI + Pydantic
 
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class CategoryBase(BaseModel):
     name: str
     description: Optional[str] = None
+    parent_id: Optional[int] = None
 
 class CategoryCreate(CategoryBase):
     pass
 
 class CategoryUpdate(BaseModel):
+    """Fields left out keep their value; an explicit null parent_id moves the category to the root"""
     name: Optional[str] = None
     description: Optional[str] = None
+    parent_id: Optional[int] = None
 
 class CategoryRead(CategoryBase):
     id: int
@@ -24,3 +27,12 @@ class CategoryRead(CategoryBase):
 
     class Config:
         from_attributes = True
+
+class CategoryTreeNode(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    parent_id: Optional[int] = None
+    product_count: int  # Products assigned to this category itself
+    total_product_count: int  # Including all descendants
+    children: List["CategoryTreeNode"] = []
@@ -0,0 +1,34 @@
+# Service: Product Service
+# Responsibility: Pydantic schemas for inventory reservations
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+
+class ReservationItemCreate(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+class ReservationCreate(BaseModel):
+    items: List[ReservationItemCreate] = Field(..., min_length=1)
+    ttl_seconds: Optional[int] = Field(None, gt=0)
+    order_ref: Optional[str] = None
+
+class ReservationItemRead(BaseModel):
+    product_id: int
+    quantity: int
+
+    class Config:
+        from_attributes = True
+
+class ReservationRead(BaseModel):
+    id: str
+    status: str
+    order_ref: Optional[str] = None
+    expires_at: datetime
+    created_at: datetime
+    items: List[ReservationItemRead]
+
+    class Config:
+        from_attributes = True
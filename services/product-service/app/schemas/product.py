@@ -2,8 +2,9 @@
 # Responsibility: Pydantic schemas for product
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
-from pydantic import BaseModel
-from typing import Optional, List, Dict
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal
+from datetime import datetime
 
 class ProductBase(BaseModel):
     name: str
@@ -14,8 +15,6 @@ class ProductBase(BaseModel):
     category: Optional[str] = None
     brand: Optional[str] = None
     images: Optional[List[str]] = None
-    rating: Optional[float] = None
-    reviews_count: Optional[int] = None
     sku: Optional[str] = None
     specifications: Optional[Dict[str, str]] = None
 
@@ -27,5 +26,72 @@ class ProductUpdate(ProductBase):
 
 class ProductRead(ProductBase):
     id: int
+    # Maintained by review writes only (see repositories/review.py); not accepted on create/update
+    rating: Optional[float] = None
+    reviews_count: Optional[int] = None
+    version: int = 1
+    updated_at: Optional[datetime] = None
     class Config:
         from_attributes = True
+
+class SpecFacetValue(BaseModel):
+    value: str
+    count: int
+
+class SpecFacetRead(BaseModel):
+    """Values of one specification attribute with their product counts, most common first"""
+    key: str
+    values: List[SpecFacetValue]
+
+class ProductBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+    fields: Optional[List[str]] = None
+    format: Literal["full", "compact"] = "full"
+
+class ProductBatchRead(BaseModel):
+    """Products in request order; ``missing`` lists ids that do not exist"""
+    products: List[Dict[str, Any]]
+    missing: List[int]
+
+class ProductBatchCompactRead(BaseModel):
+    """Column-oriented form for internal callers: one ``fields`` header, one row per product"""
+    fields: List[str]
+    rows: List[List[Any]]
+    missing: List[int]
+
+class ProductImportError(BaseModel):
+    row: int
+    sku: Optional[str] = None
+    error: str
+
+class ProductImportReport(BaseModel):
+    job_id: str
+    status: str  # running, completed, failed
+    format: str
+    rows_read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    batches: int = 0
+    errors: List[ProductImportError] = []
+    errors_truncated: bool = False
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+class ProductImageUploadRead(BaseModel):
+    """Stored image: ``image_url`` is the original, ``variants`` maps ``thumb``/``w<width>`` to WebP URLs"""
+    image_url: str
+    filename: str
+    sha256: str
+    deduplicated: bool
+    variants: Dict[str, str]
+
+class ProductEvent(BaseModel):
+    product_id: int
+    type: Literal["view", "add_to_cart"]
+
+class ProductEventBatch(BaseModel):
+    events: List[ProductEvent] = Field(..., min_length=1, max_length=100)
+
+class TrendingProductRead(ProductRead):
+    score: float  # Decayed event count, see the ranking's half-life
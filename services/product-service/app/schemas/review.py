@@ -0,0 +1,42 @@
+# Service: Product Service
+# Responsibility: Pydantic schemas for product reviews
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+class ReviewCreate(BaseModel):
+    """The author is the signed-in user"""
+    user_name: Optional[str] = Field(None, max_length=100)
+    rating: int = Field(..., ge=1, le=5)
+    comment: Optional[str] = None
+
+class ReviewUpdate(BaseModel):
+    """Fields left out keep their current value"""
+    rating: Optional[int] = Field(None, ge=1, le=5)
+    comment: Optional[str] = None
+
+class ReviewRead(BaseModel):
+    id: int
+    product_id: int
+    user_id: int
+    user_name: Optional[str] = None
+    rating: int
+    comment: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ReviewPage(BaseModel):
+    """Newest reviews first; pass ``next_cursor`` as ``cursor`` for the next page (null on the last one)"""
+    reviews: List[ReviewRead]
+    next_cursor: Optional[str] = None
+
+class RatingSummaryRead(BaseModel):
+    product_id: int
+    average: float
+    count: int
+    histogram: Dict[int, int]  # Stars (1-5) -> number of reviews
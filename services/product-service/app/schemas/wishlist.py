@@ -2,7 +2,8 @@
 # Responsibility: Pydantic schemas for wishlist
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Dict, List
 from app.schemas.product import ProductRead
 
 class WishlistBase(BaseModel):
@@ -12,6 +13,20 @@ class WishlistBase(BaseModel):
 class WishlistCreate(BaseModel):
     product_id: int
 
+class WishlistCheckRequest(BaseModel):
+    product_ids: List[int] = Field(..., min_length=1, max_length=200)
+
+class WishlistCheckRead(BaseModel):
+    """Membership per requested product id"""
+    in_wishlist: Dict[int, bool]
+
+class WishlistBulkRequest(BaseModel):
+    product_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+class WishlistBulkRead(BaseModel):
+    changed: List[int]  # Ids actually added / removed by this call
+    product_ids: List[int]  # The whole wishlist afterwards
+
 class WishlistRead(BaseModel):
     id: int
     user_id: int
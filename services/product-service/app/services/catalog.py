@@ -0,0 +1,82 @@
+# Service: Product Service
+# Responsibility: Catalog-wide metadata (version used for HTTP revalidation) and change feed
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.notify import VersionListener
+from app.db.session import SessionLocal, engine
+from app.repositories.catalog import CHANGES_CHANNEL, CatalogRepository
+from app.schemas.catalog import CatalogChangeRead
+
+logger = logging.getLogger(__name__)
+
+# Wakes long-poll and stream consumers when any replica commits a catalog change
+changes_listener = VersionListener(engine, CHANGES_CHANNEL)
+
+
+class CatalogService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = CatalogRepository(db)
+
+    def get_version(self) -> Tuple[int, Optional[datetime]]:
+        return self.repo.get_version()
+
+    def get_changes(self, since: Optional[int], limit: int) -> dict:
+        """Changes after version ``since``; 410 when the log no longer reaches back that far.
+
+        Without ``since`` the page is empty and ``next_since`` is the current
+        version, the starting point of a consumer that needs no history.
+        The current version is read before the log so ``next_since`` never
+        skips a change committed in between.
+        """
+        version, _ = self.repo.get_version()
+        if since is None:
+            return {"changes": [], "next_since": version, "has_more": False}
+        if since < self.repo.get_changes_floor() or since > version:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Change log does not cover this version; reload the catalog and restart from its version"
+            )
+        changes, has_more = self.repo.changes_since(since, limit)
+        next_since = changes[-1].version if has_more else max([version, since] + [c.version for c in changes[-1:]])
+        changes_listener.observe(next_since)
+        return {
+            "changes": [CatalogChangeRead.model_validate(change) for change in changes],
+            "next_since": next_since,
+            "has_more": has_more,
+        }
+
+    def maintain_changes(self) -> dict:
+        """Retention then (optionally) compaction of the change log"""
+        pruned = self.repo.prune(timedelta(seconds=settings.CATALOG_CHANGES_RETENTION_SECONDS))
+        compacted = self.repo.compact() if settings.CATALOG_CHANGES_COMPACTION else 0
+        self.db.commit()
+        return {"pruned": pruned, "compacted": compacted}
+
+
+def read_changes(since: Optional[int], limit: int) -> dict:
+    """``get_changes`` on a short-lived session, for async handlers that wait between reads"""
+    db = SessionLocal()
+    try:
+        return CatalogService(db).get_changes(since, limit)
+    finally:
+        db.close()
+
+
+def run_catalog_change_maintenance() -> None:
+    db = SessionLocal()
+    try:
+        result = CatalogService(db).maintain_changes()
+        if result["pruned"] or result["compacted"]:
+            logger.info(f"Catalog change log maintenance: {result}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -4,20 +4,99 @@
 
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.core.cache import product_cache
+from app.core.config import settings
+from app.repositories.catalog import CATEGORY_TREE_NAMESPACE, CatalogRepository
 from app.repositories.category import CategoryRepository
-from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.repositories.product import ProductRepository
+from app.repositories.stats import InventoryStatsRepository
+from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryRead, CategoryTreeNode
+from app.schemas.product import ProductRead
 from app.models.category import Category
-from typing import List
+from app.services.product import category_namespace, product_namespace
+from pydantic import TypeAdapter
+from typing import Dict, List, Optional
+
+CATEGORY_CODEC = TypeAdapter(CategoryRead)
+CATEGORY_LIST_CODEC = TypeAdapter(List[CategoryRead])
+CATEGORY_TREE_CODEC = TypeAdapter(List[CategoryTreeNode])
+
+def render_category(category) -> bytes:
+    return CATEGORY_CODEC.dump_json(CATEGORY_CODEC.validate_python(category, from_attributes=True))
+
+def render_categories(categories) -> bytes:
+    return CATEGORY_LIST_CODEC.dump_json(CATEGORY_LIST_CODEC.validate_python(categories, from_attributes=True))
+
+def render_category_tree(tree: List[CategoryTreeNode]) -> bytes:
+    return CATEGORY_TREE_CODEC.dump_json(tree)
+
+def find_node(tree: List[CategoryTreeNode], category_id: int) -> Optional[CategoryTreeNode]:
+    stack = list(tree)
+    while stack:
+        node = stack.pop()
+        if node.id == category_id:
+            return node
+        stack.extend(node.children)
+    return None
+
+def subtree_names(node: CategoryTreeNode) -> List[str]:
+    names, stack = [], [node]
+    while stack:
+        node = stack.pop()
+        names.append(node.name)
+        stack.extend(node.children)
+    return names
 
 class CategoryService:
     """Service for category business logic"""
     
     def __init__(self, db: Session):
+        self.db = db
         self.repo = CategoryRepository(db)
     
     def get_all_categories(self, skip: int = 0, limit: int = 100) -> List[Category]:
         """Get all categories"""
         return self.repo.get_all(skip, limit)
+
+    def get_tree(self, catalog_version: int) -> List[CategoryTreeNode]:
+        """Whole category tree with product counts, cached in memory per catalog version.
+
+        Own counts come from the trigger-maintained per-category inventory
+        totals, so building the tree reads the categories and one small
+        stats table but never the products.
+        """
+        def load():
+            counts = {row["category"]: int(row["products"])
+                      for row in InventoryStatsRepository(self.db).by_category(settings.INVENTORY_STATS_INCREMENTAL)}
+            rows = self.repo.get_tree_rows()
+            nodes: Dict[int, CategoryTreeNode] = {}
+            roots = []
+            # Paths sort parents before children
+            for row in rows:
+                count = counts.get(row.name, 0)
+                node = nodes[row.id] = CategoryTreeNode(
+                    id=row.id, name=row.name, description=row.description, parent_id=row.parent_id,
+                    product_count=count, total_product_count=count
+                )
+                parent = nodes.get(row.parent_id)
+                (parent.children if parent else roots).append(node)
+            for row in reversed(rows):
+                parent = nodes.get(row.parent_id)
+                if parent:
+                    parent.total_product_count += nodes[row.id].total_product_count
+            return roots
+        return product_cache.get_or_load(CATEGORY_TREE_NAMESPACE, f"v{catalog_version}", load, CATEGORY_TREE_CODEC)
+
+    def get_subtree_products(self, category_id: int, catalog_version: int) -> List[ProductRead]:
+        """Products of a category and all its descendants; names come from the cached tree"""
+        node = find_node(self.get_tree(catalog_version), category_id)
+        if not node:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+        products = ProductRepository(self.db).get_by_categories(subtree_names(node))
+        return [ProductRead.model_validate(p) for p in products]
     
     def get_category_by_id(self, category_id: int) -> Category:
         """Get category by ID"""
@@ -28,6 +107,17 @@ class CategoryService:
                 detail="Category not found"
             )
         return category
+
+    def _get_parent(self, parent_id: Optional[int], for_update: bool = False) -> Optional[Category]:
+        if parent_id is None:
+            return None
+        parent = self.repo.get_by_id(parent_id, for_update)
+        if not parent:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Parent category not found"
+            )
+        return parent
     
     def create_category(self, category_in: CategoryCreate) -> Category:
         """Create new category"""
@@ -39,11 +129,16 @@ class CategoryService:
                 detail="Category with this name already exists"
             )
         
-        return self.repo.create(category_in)
+        if category_in.parent_id is not None:
+            # The new path extends the parent's, which a concurrent move could rewrite
+            self.repo.lock_tree()
+        return self.repo.create(category_in, self._get_parent(category_in.parent_id, for_update=True))
     
     def update_category(self, category_id: int, category_update: CategoryUpdate) -> Category:
-        """Update category"""
+        """Update category; moving it carries the subtree along, renaming it carries its products along"""
         category = self.get_category_by_id(category_id)
+        fields = category_update.model_dump(exclude_unset=True)
+        old_name = category.name
         
         # Check name uniqueness if name is being updated
         if category_update.name and category_update.name != category.name:
@@ -53,10 +148,41 @@ class CategoryService:
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Category with this name already exists"
                 )
-        
-        return self.repo.update(category, category_update)
+
+        changes = []
+        if "parent_id" in fields and fields["parent_id"] != category.parent_id:
+            # Two concurrent moves could each pass the check below and together close a
+            # cycle, so moves take the tree lock and check freshly read paths
+            self.repo.lock_tree()
+            category = self.repo.get_by_id(category_id, for_update=True)
+            if not category:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+            parent = self._get_parent(fields["parent_id"], for_update=True)
+            if parent and parent.path.startswith(category.path):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cannot move a category under itself or one of its subcategories"
+                )
+            changes += [("category", cid, "upsert") for cid in self.repo.move_subtree(category, parent)]
+        renamed = []
+        if category_update.name and category_update.name != old_name:
+            renamed = [pid for (pid,) in self.repo.rename_products(old_name, category_update.name)]
+            changes += [("product", pid, "upsert") for pid in renamed]
+        if changes:
+            CatalogRepository(self.db).bump(changes)
+
+        category = self.repo.update(category, category_update)
+        if renamed:
+            product_cache.bump(category_namespace(old_name), category_namespace(category.name),
+                               *(product_namespace(pid) for pid in renamed))
+        return category
     
     def delete_category(self, category_id: int) -> Category:
         """Delete category"""
         category = self.get_category_by_id(category_id)
+        if self.repo.has_children(category):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Category has subcategories; move or delete them first"
+            )
         return self.repo.delete(category)
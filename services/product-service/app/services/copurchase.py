@@ -0,0 +1,180 @@
+# Service: Product Service
+# Responsibility: "Customers also bought" lists from order-service purchase history (incremental batch job)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+import time
+from typing import Dict, List, Tuple
+import httpx
+import numpy as np
+from pydantic import TypeAdapter
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.cache import product_cache
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.copurchase import CopurchaseRepository
+from app.schemas.product import ProductRead
+from app.services.product import ProductService
+
+logger = logging.getLogger(__name__)
+
+# Record layout of order-service's GET /analytics/baskets feed
+BASKET_DTYPE = np.dtype([("order_id", "<i4"), ("product_id", "<i4")])
+
+# One namespace for every list: a run rewrites many lists at once
+ALSO_BOUGHT_NAMESPACE = "also-bought"
+ID_LIST_CODEC = TypeAdapter(List[int])
+
+# Lists refreshed per statement
+_REFRESH_CHUNK = 5000
+
+
+def basket_counts(baskets: np.ndarray, max_basket: int) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], int]:
+    """Co-purchase count deltas for a batch of baskets.
+
+    ``baskets`` holds (order_id, product_id) records grouped by order, each
+    product once per order. Returns ``(pairs, items, orders)``: pair counts in
+    both directions, per-product order counts and the number of orders.
+    Baskets larger than ``max_basket`` (bulk or B2B orders) count towards the
+    product totals but add no pairs: they would contribute hundreds of weak
+    pairs each.
+    """
+    order_ids = baskets["order_id"]
+    products = baskets["product_id"].astype(np.int64)
+    n = len(baskets)
+    starts = np.flatnonzero(np.r_[True, order_ids[1:] != order_ids[:-1]]) if n else np.empty(0, dtype=np.int64)
+    sizes = np.diff(np.r_[starts, n])
+    item_ids, item_orders = np.unique(products, return_counts=True)
+
+    keep = np.repeat(sizes <= max_basket, sizes)
+    order_ids, products = order_ids[keep], products[keep]
+    # Pair each record with the one d positions later while both sit in the same
+    # basket; positions that fail at distance d fail at every larger distance
+    keys = []
+    candidates = np.arange(len(products) - 1)
+    distance = 1
+    while len(candidates):
+        candidates = candidates[candidates + distance < len(products)]
+        candidates = candidates[order_ids[candidates] == order_ids[candidates + distance]]
+        a, b = products[candidates], products[candidates + distance]
+        keys.append((np.minimum(a, b) << 32) | np.maximum(a, b))
+        distance += 1
+    pair_keys, pair_orders = np.unique(np.concatenate(keys) if keys else np.empty(0, dtype=np.int64),
+                                       return_counts=True)
+    low, high = pair_keys >> 32, pair_keys & 0xFFFFFFFF
+
+    pairs = {"product_id": np.r_[low, high], "other_id": np.r_[high, low], "orders": np.r_[pair_orders, pair_orders]}
+    items = {"product_id": item_ids, "orders": item_orders}
+    return pairs, items, len(sizes)
+
+
+def fetch_baskets(after_order_id: int, max_orders: int) -> Tuple[np.ndarray, int]:
+    """Download the next batch of baskets from order-service; returns (records, last_order_id)"""
+    buffer = bytearray()
+    params = {"after_order_id": after_order_id, "max_orders": max_orders,
+              "settle_seconds": settings.COPURCHASE_SETTLE_SECONDS}
+    with httpx.Client(base_url=settings.ORDER_SERVICE_URL, timeout=settings.COPURCHASE_FETCH_TIMEOUT_SECONDS) as client:
+        with client.stream("GET", "/api/v1/analytics/baskets", params=params) as response:
+            response.raise_for_status()
+            last_order_id = int(response.headers["X-Last-Order-Id"])
+            for chunk in response.iter_bytes():
+                buffer.extend(chunk)
+    usable = len(buffer) - len(buffer) % BASKET_DTYPE.itemsize
+    return np.frombuffer(bytes(buffer[:usable]), dtype=BASKET_DTYPE), last_order_id
+
+
+class CopurchaseService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = CopurchaseRepository(db)
+
+    def _fetch(self, after_order_id: int) -> Tuple[np.ndarray, int]:
+        try:
+            return fetch_baskets(after_order_id, settings.COPURCHASE_BATCH_ORDERS)
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY,
+                                detail=f"Cannot load baskets from order-service: {e}")
+
+    def _refresh(self, product_ids: List[int], total_orders: int) -> int:
+        refreshed = 0
+        for start in range(0, len(product_ids), _REFRESH_CHUNK):
+            refreshed += self.repo.refresh_lists(
+                product_ids[start:start + _REFRESH_CHUNK], settings.COPURCHASE_TOP_K,
+                settings.COPURCHASE_MIN_SUPPORT, settings.COPURCHASE_SIMILARITY, total_orders
+            )
+        return refreshed
+
+    def update(self, full: bool = False) -> dict:
+        """Count orders placed since the last run and refresh the lists they touch.
+
+        Incremental runs commit each batch (counts, watermark and the lists of
+        the batch's products) atomically, so a crash never counts an order
+        twice. Other lists drift slightly as totals grow until their products
+        are bought again; a full rebuild recounts everything in one
+        transaction, which also drops orders cancelled since they were counted.
+        It fills copies of the tables and swaps them in at the end, so lists
+        keep being served from the previous counts while it runs.
+        """
+        started = time.perf_counter()
+        summary = {"mode": "full" if full else "incremental", "orders": 0, "pairs": 0, "lists": 0}
+        try:
+            if full:
+                if not self.repo.try_lock():
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Co-purchase update already running")
+                self.repo.begin_rebuild()
+                self.repo.set_state(0, 0)
+            while True:
+                if not full and not self.repo.try_lock():
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Co-purchase update already running")
+                last_order_id, total_orders = self.repo.get_state()
+                baskets, batch_end = self._fetch(last_order_id)
+                if batch_end <= last_order_id:
+                    break
+                pairs, items, orders = basket_counts(baskets, settings.COPURCHASE_MAX_BASKET)
+                self.repo.add_counts(pairs, items)
+                total_orders += orders
+                self.repo.set_state(batch_end, total_orders)
+                summary["orders"] += orders
+                summary["pairs"] += len(pairs["product_id"]) // 2
+                if not full:
+                    summary["lists"] += self._refresh(items["product_id"].tolist(), total_orders)
+                    self.db.commit()
+            if full:
+                summary["lists"] = self._refresh(self.repo.all_product_ids(), total_orders)
+                self.repo.finish_rebuild()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        if summary["orders"] or full:
+            product_cache.bump(ALSO_BOUGHT_NAMESPACE)
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        return summary
+
+    def also_bought(self, product_id: int, limit: int) -> List[ProductRead]:
+        """Cached id list hydrated through the per-product cache, so details are never staler than product pages.
+
+        Products deleted from the catalog since the last run are skipped.
+        """
+        ids = product_cache.get_or_load(ALSO_BOUGHT_NAMESPACE, str(product_id),
+                                        lambda: self.repo.also_bought_ids(product_id), ID_LIST_CODEC)
+        products = ProductService(self.db).get_products_by_ids(ids)
+        return [products[pid] for pid in ids if pid in products][:limit]
+
+    @staticmethod
+    def version() -> int:
+        return product_cache.version(ALSO_BOUGHT_NAMESPACE)
+
+
+def run_copurchase_update() -> None:
+    """Periodic job; replicas that lose the advisory lock skip the run"""
+    db = SessionLocal()
+    try:
+        summary = CopurchaseService(db).update()
+        if summary["orders"]:
+            logger.info(f"Co-purchase update: {summary}")
+    except HTTPException as e:
+        logger.warning(f"Co-purchase update skipped: {e.detail}")
+    finally:
+        db.close()
@@ -0,0 +1,257 @@
+# Service: Product Service
+# Responsibility: Shopping feeds (Google Merchant RSS, Meta catalog CSV) streamed from the catalog
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import csv
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List
+from xml.sax.saxutils import escape
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.catalog import CatalogRepository
+from app.repositories.feed import FeedRepository
+
+logger = logging.getLogger(__name__)
+
+FEED_DIR = Path(settings.UPLOAD_ROOT) / "feeds"
+FEED_FORMATS = {"xml": "application/rss+xml", "csv": "text/csv"}
+
+# Columns of the CSV feed, in order; the XML feed uses the same names as g: elements
+FEED_FIELDS = ("id", "title", "description", "availability", "condition", "price", "link",
+               "image_link", "additional_image_link", "brand", "product_type")
+
+# Characters XML 1.0 cannot carry, even escaped
+_XML_INVALID_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _absolute_url(url: str) -> str:
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}{url}" if url.startswith("/") else url
+
+
+def feed_item(product) -> Dict[str, str]:
+    """The feed fields of one product, already formatted as the platforms expect"""
+    images = [_absolute_url(url) for url in (product.images or []) if isinstance(url, str) and url]
+    image = _absolute_url(product.image) if product.image else (images[0] if images else "")
+    return {
+        "id": product.sku or str(product.id),
+        "title": (product.name or "")[:150],
+        "description": (product.description or product.name or "")[:5000],
+        "availability": "in_stock" if (product.stock or 0) > 0 else "out_of_stock",
+        "condition": "new",
+        "price": f"{product.price:.2f} {settings.FEED_CURRENCY}",
+        "link": f"{settings.STOREFRONT_BASE_URL.rstrip('/')}/products/{product.id}",
+        "image_link": image,
+        "additional_image_link": ",".join([url for url in images if url != image][:10]),
+        "brand": product.brand or "",
+        "product_type": product.category or "",
+    }
+
+
+def fingerprint(item: Dict[str, str]) -> int:
+    """Signed 64-bit hash of the feed fields; stock changes that keep availability do not change it"""
+    digest = hashlib.blake2b("\x1f".join(item[field] for field in FEED_FIELDS).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class XmlFeedFormat:
+    """Google Merchant Center RSS 2.0 with the g: namespace"""
+
+    def header(self) -> str:
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">\n<channel>\n'
+                f"<title>{escape(settings.FEED_TITLE)}</title>\n"
+                f"<link>{escape(settings.STOREFRONT_BASE_URL)}</link>\n"
+                "<description>Product catalog</description>\n")
+
+    def item(self, item: Dict[str, str]) -> str:
+        parts = ["<item>"]
+        for field in FEED_FIELDS:
+            if field == "additional_image_link":
+                values = item[field].split(",") if item[field] else []
+            else:
+                values = [item[field]] if item[field] else []
+            parts += [f"<g:{field}>{escape(_XML_INVALID_RE.sub('', value))}</g:{field}>" for value in values]
+        parts.append("</item>\n")
+        return "".join(parts)
+
+    def footer(self) -> str:
+        return "</channel>\n</rss>\n"
+
+
+class CsvFeedFormat:
+    """Meta (Facebook) catalog CSV; ``additional_image_link`` is comma-separated in one cell"""
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+
+    def _row(self, values) -> str:
+        self._writer.writerow(values)
+        row = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return row
+
+    def header(self) -> str:
+        return self._row(FEED_FIELDS)
+
+    def item(self, item: Dict[str, str]) -> str:
+        return self._row([item[field] for field in FEED_FIELDS])
+
+    def footer(self) -> str:
+        return ""
+
+
+def feed_format(name: str):
+    return XmlFeedFormat() if name == "xml" else CsvFeedFormat()
+
+
+def stream_feed(fmt: str) -> Iterator[bytes]:
+    """The full feed as chunks, for a streaming HTTP response; owns its session for the response's lifetime"""
+    renderer = feed_format(fmt)
+    db = SessionLocal()
+    try:
+        buffer = [renderer.header()]
+        size = 0
+        for product in FeedRepository(db).iter_products(settings.FEED_BATCH_SIZE):
+            line = renderer.item(feed_item(product))
+            buffer.append(line)
+            size += len(line)
+            if size >= settings.FEED_CHUNK_CHARS:
+                yield "".join(buffer).encode()
+                buffer, size = [], 0
+        buffer.append(renderer.footer())
+        yield "".join(buffer).encode()
+    finally:
+        db.close()
+
+
+class _FeedFile:
+    """A feed written incrementally to a temp file and renamed into place by ``commit``"""
+
+    def __init__(self, name: str, fmt: str):
+        self.path = FEED_DIR / name
+        self.renderer = feed_format(fmt)
+        fd, self._tmp_name = tempfile.mkstemp(dir=FEED_DIR, prefix=".feed-")
+        self._file = os.fdopen(fd, "w", encoding="utf-8", newline="", buffering=1024 * 1024)
+        self._file.write(self.renderer.header())
+        self.items = 0
+
+    def write(self, item: Dict[str, str]) -> None:
+        self._file.write(self.renderer.item(item))
+        self.items += 1
+
+    def close(self) -> None:
+        self._file.write(self.renderer.footer())
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def commit(self) -> None:
+        os.replace(self._tmp_name, self.path)
+
+    def discard(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_name):
+            os.unlink(self._tmp_name)
+
+
+class ShoppingFeedService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = FeedRepository(db)
+        self.catalog = CatalogRepository(db)
+
+    def generate(self, force: bool = False) -> dict:
+        """Write full and delta feed files for every format under ``<UPLOAD_ROOT>/feeds``.
+
+        ``products.<fmt>`` lists every product; ``products-delta.<fmt>`` only
+        those whose feed entry changed since the previous run (by fingerprint),
+        for platforms that accept supplemental/update feeds. Products are
+        streamed through a server-side cursor, so memory does not grow with the
+        catalog. Nothing is written while the catalog version is unchanged,
+        unless ``force``.
+        """
+        unknown = [fmt for fmt in settings.FEED_FORMATS if fmt not in FEED_FORMATS]
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"Unknown feed formats: {', '.join(unknown)}")
+        started = time.perf_counter()
+        FEED_DIR.mkdir(parents=True, exist_ok=True)
+        files: List[_FeedFile] = []
+        try:
+            self.repo.begin_consistent_read()
+            if not self.repo.try_lock():
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Shopping feed generation already running")
+            version, _ = self.catalog.get_version()
+            if not force and self.repo.get_state() == version and all(
+                (FEED_DIR / f"products.{fmt}").exists() for fmt in settings.FEED_FORMATS
+            ):
+                self.db.rollback()
+                return {"version": version, "generated": False}
+
+            full = [_FeedFile(f"products.{fmt}", fmt) for fmt in settings.FEED_FORMATS]
+            delta = [_FeedFile(f"products-delta.{fmt}", fmt) for fmt in settings.FEED_FORMATS]
+            files = full + delta
+            changed_ids: List[int] = []
+            changed_fingerprints: List[int] = []
+            staged = 0
+            for product, previous in self.repo.iter_products_with_fingerprints(settings.FEED_BATCH_SIZE):
+                item = feed_item(product)
+                for feed in full:
+                    feed.write(item)
+                current = fingerprint(item)
+                if current != previous:
+                    for feed in delta:
+                        feed.write(item)
+                    changed_ids.append(product.id)
+                    changed_fingerprints.append(current)
+                    if len(changed_ids) >= settings.FEED_BATCH_SIZE:
+                        staged += self.repo.stage_fingerprints(np.array(changed_ids), np.array(changed_fingerprints))
+                        changed_ids, changed_fingerprints = [], []
+            if changed_ids:
+                staged += self.repo.stage_fingerprints(np.array(changed_ids), np.array(changed_fingerprints))
+            for feed in files:
+                feed.close()
+            if staged:
+                self.repo.apply_fingerprints()
+            self.repo.set_state(version)
+            # Files first: if the commit then fails, the next delta repeats these items rather than losing them
+            for feed in files:
+                feed.commit()
+            self.db.commit()
+        except Exception:
+            for feed in files:
+                feed.discard()
+            self.db.rollback()
+            raise
+        return {
+            "version": version,
+            "generated": True,
+            "products": full[0].items if full else 0,
+            "changed": staged,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+def run_shopping_feed() -> None:
+    """Periodic job; a no-op while the catalog version is unchanged"""
+    db = SessionLocal()
+    try:
+        summary = ShoppingFeedService(db).generate()
+        if summary["generated"]:
+            logger.info(f"Shopping feed: {summary}")
+    except HTTPException as e:
+        logger.debug(f"Shopping feed skipped: {e.detail}")
+    finally:
+        db.close()
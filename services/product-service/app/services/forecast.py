@@ -0,0 +1,179 @@
+# Service: Product Service
+# Responsibility: Sales-velocity stock forecast and reorder points (batch job)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+import time
+from typing import Dict, List, Optional
+import httpx
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.forecast import ForecastRepository
+
+logger = logging.getLogger(__name__)
+
+# Record layout of order-service's GET /analytics/sales/daily feed
+SALES_DTYPE = np.dtype([("product_id", "<i4"), ("day", "<u2"), ("quantity", "<i4")])
+
+
+def _catalog_rows(product_ids: np.ndarray, sale_ids: np.ndarray) -> np.ndarray:
+    """Row of each sale's product in the sorted ``product_ids``, or -1 if not in the catalog.
+
+    Serial ids are dense, so a direct lookup table (one random read per sale)
+    is used when it stays small; binary search over millions of unsorted
+    needles is several times slower.
+    """
+    n = len(product_ids)
+    if n == 0:
+        return np.full(len(sale_ids), -1, dtype=np.int64)
+    low, high = int(product_ids[0]), int(product_ids[-1])
+    if low >= 0 and high <= 8 * n + 1024:
+        lookup = np.full(high + 1, -1, dtype=np.int64)
+        lookup[product_ids] = np.arange(n)
+        rows = lookup[np.clip(sale_ids, 0, high)]
+        return np.where(sale_ids > high, -1, rows)
+    rows = np.minimum(np.searchsorted(product_ids, sale_ids), n - 1)
+    return np.where(product_ids[rows] == sale_ids, rows, -1)
+
+
+def compute_forecast(product_ids: np.ndarray, stock: np.ndarray, sales: np.ndarray, window_days: int,
+                     lead_time_days: float, review_days: float, service_z: float,
+                     half_life_days: float) -> Dict[str, np.ndarray]:
+    """Vectorized demand statistics and reorder points for every SKU at once.
+
+    ``product_ids`` must be sorted; ``sales`` holds sparse (product_id, day,
+    quantity) records, days without a record count as zero sales. Per SKU:
+
+    - daily_velocity: mean daily units, exponentially weighted towards recent days
+    - demand_std: standard deviation of daily units over the window
+    - safety_stock = z * std * sqrt(lead time)
+    - reorder_point = velocity * lead time + safety stock
+    - reorder_quantity: units to order now to cover lead time + review period
+    """
+    n = len(product_ids)
+    sale_ids = sales["product_id"].astype(np.int64)
+    days = sales["day"].astype(np.int64)
+    quantity = sales["quantity"].astype(np.float64)
+
+    # Map product ids to catalog rows; drop sales of unknown products and out-of-window days
+    idx = _catalog_rows(product_ids, sale_ids)
+    known = (idx >= 0) & (days < window_days)
+    idx, days, quantity = idx[known], days[known], quantity[known]
+
+    age = (window_days - 1) - np.arange(window_days)
+    decay = 0.5 ** (age / half_life_days)
+    velocity = np.bincount(idx, weights=quantity * decay[days], minlength=n) / decay.sum()
+    mean = np.bincount(idx, weights=quantity, minlength=n) / window_days
+    mean_sq = np.bincount(idx, weights=quantity * quantity, minlength=n) / window_days
+    std = np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+    stock = stock.astype(np.float64)
+    safety = service_z * std * np.sqrt(lead_time_days)
+    reorder_point = velocity * lead_time_days + safety
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(velocity > 0, stock / velocity, np.inf)
+    cover = np.where(stock <= 0, 0.0, cover)
+    order_up_to = velocity * (lead_time_days + review_days) + safety
+    reorder_quantity = np.maximum(np.ceil(order_up_to - stock), 0.0)
+    # SKUs that no longer sell are not reordered, even when out of stock
+    needs_reorder = (velocity > 0) & (stock <= reorder_point)
+
+    return {
+        "product_id": product_ids,
+        "stock": stock,
+        "daily_velocity": velocity,
+        "demand_std": std,
+        "days_of_cover": cover,
+        "safety_stock": safety,
+        "reorder_point": reorder_point,
+        "reorder_quantity": reorder_quantity,
+        "needs_reorder": needs_reorder,
+    }
+
+
+def fetch_daily_sales(days: int, transport: Optional[httpx.BaseTransport] = None) -> np.ndarray:
+    """Download the binary daily sales feed from order-service into a structured array"""
+    buffer = bytearray()
+    with httpx.Client(base_url=settings.ORDER_SERVICE_URL, timeout=settings.FORECAST_FETCH_TIMEOUT_SECONDS,
+                      transport=transport) as client:
+        with client.stream("GET", "/api/v1/analytics/sales/daily", params={"days": days}) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                buffer.extend(chunk)
+    usable = len(buffer) - len(buffer) % SALES_DTYPE.itemsize
+    return np.frombuffer(bytes(buffer[:usable]), dtype=SALES_DTYPE)
+
+
+class StockForecastService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = ForecastRepository(db)
+
+    def run(self, sales: Optional[np.ndarray] = None) -> dict:
+        """Recompute and store the forecast for the whole catalog.
+
+        Only SKUs that sell or are out of stock are stored; the rest have
+        nothing to forecast. Returns timings per phase. The sales feed is
+        fetched before the transaction opens, so a slow order-service never
+        leaves this session idle in a transaction holding the lock.
+        """
+        timings = {}
+        started = time.perf_counter()
+        if sales is None:
+            try:
+                sales = fetch_daily_sales(settings.FORECAST_WINDOW_DAYS)
+            except httpx.HTTPError as e:
+                raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY,
+                                    detail=f"Cannot load sales from order-service: {e}")
+        timings["fetch_sales"] = time.perf_counter() - started
+
+        try:
+            if not self.repo.try_lock():
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Forecast already running")
+
+            mark = time.perf_counter()
+            product_ids, stock = self.repo.load_stock()
+            timings["load_stock"] = time.perf_counter() - mark
+
+            mark = time.perf_counter()
+            result = compute_forecast(
+                product_ids, stock, sales, settings.FORECAST_WINDOW_DAYS, settings.FORECAST_LEAD_TIME_DAYS,
+                settings.FORECAST_REVIEW_DAYS, settings.FORECAST_SERVICE_LEVEL_Z, settings.FORECAST_HALF_LIFE_DAYS
+            )
+            keep = (result["daily_velocity"] > 0) | (result["stock"] <= 0)
+            result = {name: column[keep] for name, column in result.items()}
+            timings["compute"] = time.perf_counter() - mark
+
+            mark = time.perf_counter()
+            stored = self.repo.replace_all(result)
+            self.db.commit()
+            timings["store"] = time.perf_counter() - mark
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return {
+            "products": int(len(product_ids)),
+            "sales_records": int(len(sales)),
+            "stored": stored,
+            "needs_reorder": int(result["needs_reorder"].sum()),
+            "timings": {phase: round(seconds, 3) for phase, seconds in timings.items()},
+        }
+
+    def list(self, needs_reorder: Optional[bool] = True, limit: int = 50, offset: int = 0) -> List[dict]:
+        return self.repo.list(needs_reorder, limit, offset)
+
+
+def run_stock_forecast() -> None:
+    """Periodic job; replicas that lose the advisory lock skip the run"""
+    db = SessionLocal()
+    try:
+        summary = StockForecastService(db).run()
+        logger.info(f"Stock forecast: {summary}")
+    except HTTPException as e:
+        logger.warning(f"Stock forecast skipped: {e.detail}")
+    finally:
+        db.close()
@@ -0,0 +1,218 @@
+# Service: Product Service
+# Responsibility: Product image storage (content-addressed originals, WebP variants)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+# Stored extension by the format PIL reads from the file header (the client's filename is not trusted)
+FORMAT_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif"}
+IMAGE_DIR = Path(settings.UPLOAD_ROOT) / "products"
+IMAGE_URL_PREFIX = "/uploads/products"
+
+# <sha256><ext> for originals, <sha256>_thumb.webp / <sha256>_w<width>.webp for variants,
+# <sha256>_variants.json for the list of widths rendered
+_ORIGINAL_RE = re.compile(r"^([0-9a-f]{64})(\.[a-z]+)$")
+_VARIANT_RE = re.compile(r"^[0-9a-f]{64}_(thumb|w(\d+))\.webp$")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+        return _pool
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _image_extension(path: str) -> str:
+    """Extension for the image format in the file's header (reads the header only)"""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as img:
+            fmt = img.format
+    except (UnidentifiedImageError, OSError):
+        fmt = None
+    if fmt not in FORMAT_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported image type; expected one of {', '.join(sorted(FORMAT_EXTENSIONS))}"
+        )
+    return FORMAT_EXTENSIONS[fmt]
+
+
+def _store_original(source) -> Tuple[str, Path, bool]:
+    """Copy an upload to ``<sha256><ext>`` in fixed-size chunks; runs in a worker thread.
+
+    The extension comes from the decoded format, so the same bytes are stored
+    once whatever they were called. Returns ``(digest, path, created)``;
+    ``created`` is False when the same bytes were already stored, in which
+    case the new copy is discarded.
+    """
+    IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_name = tempfile.mkstemp(dir=IMAGE_DIR, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > settings.IMAGE_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Image exceeds {settings.IMAGE_MAX_BYTES} bytes"
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file")
+        path = IMAGE_DIR / f"{digest.hexdigest()}{_image_extension(tmp_name)}"
+        if path.exists():
+            os.unlink(tmp_name)
+            return digest.hexdigest(), path, False
+        os.replace(tmp_name, path)
+        return digest.hexdigest(), path, True
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _render_variants(path: str, digest: str, widths: List[int], thumb_size: int,
+                     quality: int) -> Dict[str, int]:
+    """Decode once and write the thumbnail and responsive WebP variants; runs in a worker process.
+
+    Returns ``{variant name: width}``. Widths not smaller than the original
+    are skipped, so small images only get a thumbnail and a full-size WebP.
+    Raises ValueError if the file is not a decodable image.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as img:
+            img.load()
+            img = ImageOps.exif_transpose(img)
+    except (UnidentifiedImageError, OSError):
+        raise ValueError("File is not a valid image")
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+    directory = os.path.dirname(path)
+    written: Dict[str, int] = {}
+
+    def save(image, name):
+        target = os.path.join(directory, f"{digest}_{name}.webp")
+        if not os.path.exists(target):
+            tmp = f"{target}.tmp"
+            image.save(tmp, "WEBP", quality=quality, method=4)
+            os.replace(tmp, target)
+        written[name] = image.width
+
+    thumb = img.copy()
+    thumb.thumbnail((thumb_size, thumb_size), Image.LANCZOS)
+    save(thumb, "thumb")
+
+    for width in sorted(w for w in widths if w < img.width) + [img.width]:
+        height = max(1, round(img.height * width / img.width))
+        resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+        save(resized, f"w{width}")
+    return written
+
+
+def _record_widths(digest: str, widths: List[int]) -> None:
+    path = IMAGE_DIR / f"{digest}_variants.json"
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(sorted(widths)))
+    os.replace(tmp, path)
+
+
+def _variant_widths(digest: str) -> List[int]:
+    """Widths of the responsive WebP variants of an image, ascending"""
+    try:
+        return json.loads((IMAGE_DIR / f"{digest}_variants.json").read_text())
+    except FileNotFoundError:
+        pass
+    # Uploaded before widths were recorded: list the variants once and remember them
+    widths = sorted(
+        int(m.group(2)) for m in (_VARIANT_RE.match(p.name) for p in IMAGE_DIR.glob(f"{digest}_w*.webp"))
+        if m and m.group(2)
+    )
+    if widths:
+        _record_widths(digest, widths)
+    return widths
+
+
+def image_url(filename: str) -> str:
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}{IMAGE_URL_PREFIX}/{filename}"
+
+
+class ImageService:
+    async def upload(self, file: UploadFile) -> dict:
+        """Store an uploaded image once per content hash and build its variants off the event loop"""
+        digest, path, created = await run_in_threadpool(_store_original, file.file)
+        try:
+            variants = await asyncio.get_running_loop().run_in_executor(
+                _get_pool(), _render_variants, str(path), digest, settings.IMAGE_VARIANT_WIDTHS,
+                settings.IMAGE_THUMBNAIL_SIZE, settings.IMAGE_WEBP_QUALITY
+            )
+        except ValueError as e:
+            if created:
+                await run_in_threadpool(path.unlink)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        await run_in_threadpool(_record_widths, digest, [w for name, w in variants.items() if name != "thumb"])
+
+        return {
+            "image_url": image_url(path.name),
+            "filename": path.name,
+            "sha256": digest,
+            "deduplicated": not created,
+            "variants": {name: image_url(f"{digest}_{name}.webp") for name in variants},
+        }
+
+    def resolve(self, filename: str, width: Optional[int] = None, variant: Optional[str] = None) -> Path:
+        """Pick the stored file for a request: the thumbnail, the smallest WebP at least ``width`` wide, or the original"""
+        match = _ORIGINAL_RE.match(filename)
+        if not match:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+        digest = match.group(1)
+        original = IMAGE_DIR / filename
+        if not original.exists():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+
+        if variant == "thumb":
+            thumb = IMAGE_DIR / f"{digest}_thumb.webp"
+            return thumb if thumb.exists() else original
+        if width is None and variant != "webp":
+            return original
+
+        widths = _variant_widths(digest)
+        if not widths:
+            return original
+        chosen = widths[-1] if width is None else next((w for w in widths if w >= width), widths[-1])
+        return IMAGE_DIR / f"{digest}_w{chosen}.webp"
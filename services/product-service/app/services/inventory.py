@@ -0,0 +1,145 @@
+# Service: Product Service
+# Responsibility: Inventory reservation business logic and expiry sweeper
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Set
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from app.core.cache import product_cache
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.inventory import InventoryReservation
+from app.repositories.catalog import CatalogRepository
+from app.repositories.inventory import InventoryRepository, ReservationError
+from app.schemas.inventory import ReservationCreate
+from app.services.product import product_namespace, category_namespace
+
+logger = logging.getLogger(__name__)
+
+DEADLOCK_DETECTED = "40P01"
+DEADLOCK_RETRIES = 3
+
+# Products whose stock changed through reservations since the last maintenance run.
+# Cache/ETag invalidation for them is batched so a hot SKU does not bump the global
+# catalog version (a single contended row) on every checkout.
+_touched: Set[int] = set()
+_touched_lock = threading.Lock()
+
+
+def _mark_touched(product_ids) -> None:
+    with _touched_lock:
+        _touched.update(product_ids)
+
+
+class InventoryService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = InventoryRepository(db)
+
+    def get_reservation(self, reservation_id: str) -> InventoryReservation:
+        reservation = self.repo.get(reservation_id)
+        if not reservation:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
+        return reservation
+
+    def reserve(self, reservation_in: ReservationCreate) -> InventoryReservation:
+        """Reserve every item or none: any shortfall rolls back the whole call"""
+        items = {}
+        for item in reservation_in.items:
+            items[item.product_id] = items.get(item.product_id, 0) + item.quantity
+        ttl = min(reservation_in.ttl_seconds or settings.RESERVATION_TTL_SECONDS,
+                  settings.RESERVATION_MAX_TTL_SECONDS)
+        try:
+            for attempt in range(DEADLOCK_RETRIES + 1):
+                try:
+                    reservation = self.repo.reserve(uuid.uuid4().hex, items,
+                                                    datetime.utcnow() + timedelta(seconds=ttl),
+                                                    reservation_in.order_ref)
+                    self.db.commit()
+                    break
+                except OperationalError as e:
+                    # The whole call rolls back, so it is safe to run it again
+                    self.db.rollback()
+                    if getattr(e.orig, "pgcode", None) != DEADLOCK_DETECTED or attempt == DEADLOCK_RETRIES:
+                        raise
+                    logger.warning(f"Reservation deadlock, retrying ({attempt + 1}/{DEADLOCK_RETRIES})")
+        except ReservationError as e:
+            self.db.rollback()
+            if e.reason == "not_found":
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                    detail={"message": "Product not found", "product_id": e.product_id})
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail={"message": "Insufficient stock", "product_id": e.product_id})
+        _mark_touched(items)
+        return reservation
+
+    def commit_reservation(self, reservation_id: str) -> InventoryReservation:
+        committed = self.repo.commit(reservation_id)
+        self.db.commit()
+        reservation = self.get_reservation(reservation_id)
+        if not committed and reservation.status != "committed":
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail=f"Reservation is {reservation.status}")
+        return reservation
+
+    def release_reservation(self, reservation_id: str) -> InventoryReservation:
+        restocked = self.repo.release([reservation_id])
+        self.db.commit()
+        _mark_touched(restocked)
+        reservation = self.get_reservation(reservation_id)
+        if not restocked and reservation.status == "committed":
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Reservation is committed")
+        return reservation
+
+    def expire_due(self) -> int:
+        restocked = self.repo.expire_due(settings.RESERVATION_SWEEP_BATCH)
+        self.db.commit()
+        _mark_touched(restocked)
+        return len(restocked)
+
+    def set_shards(self, product_id: int, shard_count: int, total: Optional[int] = None):
+        product = self.repo.set_shards(product_id, shard_count, total)
+        if product:
+            self.db.commit()
+            self.db.refresh(product)
+            product_cache.bump(product_namespace(product_id), category_namespace(product.category))
+        return product
+
+    def flush_stock_changes(self) -> int:
+        """Publish batched stock changes: fold shard totals, bump catalog version, invalidate caches"""
+        with _touched_lock:
+            product_ids = set(_touched)
+            _touched.clear()
+        if not product_ids:
+            return 0
+        try:
+            self.repo.refresh_sharded_stock(product_ids)
+            CatalogRepository(self.db).bump((("product", pid, "upsert") for pid in product_ids))
+            categories = self.repo.get_categories(product_ids)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            _mark_touched(product_ids)
+            raise
+        product_cache.bump(*(product_namespace(pid) for pid, _ in categories),
+                           *(category_namespace(category) for _, category in categories))
+        return len(product_ids)
+
+
+def run_reservation_maintenance() -> None:
+    """Periodic job: expire overdue reservations, then publish pending stock changes"""
+    db = SessionLocal()
+    try:
+        service = InventoryService(db)
+        expired = service.expire_due()
+        flushed = service.flush_stock_changes()
+        if expired or flushed:
+            logger.info(f"Reservation sweep: {expired} products restocked from expired holds, "
+                        f"{flushed} products republished")
+    finally:
+        db.close()
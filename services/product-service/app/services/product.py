@@ -2,53 +2,171 @@
 # Responsibility: Product business logic
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
+import json
 from sqlalchemy.orm import Session
-from app.repositories.product import ProductRepository
-from app.schemas.product import ProductCreate, ProductUpdate
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from app.core.cache import product_cache
+from app.core.config import settings
+from app.repositories.catalog import SPEC_FACETS_NAMESPACE
+from app.repositories.product import ProductRepository, SpecFilters
+from app.repositories.inventory import InventoryRepository
+from app.schemas.product import ProductCreate, ProductUpdate, ProductRead, SpecFacetRead
 from app.models.product import Product
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+PRODUCT_CODEC = TypeAdapter(ProductRead)
+PRODUCT_LIST_CODEC = TypeAdapter(List[ProductRead])
+SPEC_FACETS_CODEC = TypeAdapter(List[SpecFacetRead])
+
+
+def product_namespace(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def category_namespace(category: Optional[str]) -> str:
+    return f"category:{category or ''}"
+
+
+def render_product(product) -> bytes:
+    return PRODUCT_CODEC.dump_json(PRODUCT_CODEC.validate_python(product, from_attributes=True))
+
+
+def render_products(products) -> bytes:
+    return PRODUCT_LIST_CODEC.dump_json(PRODUCT_LIST_CODEC.validate_python(products, from_attributes=True))
+
 
 class ProductService:
     def __init__(self, db: Session):
         self.repo = ProductRepository(db)
 
-    def get_product(self, product_id: int) -> Optional[Product]:
-        return self.repo.get(product_id)
+    def get_product(self, product_id: int) -> Optional[ProductRead]:
+        def load():
+            product = self.repo.get(product_id)
+            return ProductRead.model_validate(product) if product else None
+        return product_cache.get_or_load(product_namespace(product_id), "detail", load, PRODUCT_CODEC)
+
+    def get_products_by_ids(self, product_ids: List[int]) -> Dict[int, ProductRead]:
+        """Look up many products at once; only cache misses reach the database, in one query"""
+        def load(missing):
+            return {p.id: ProductRead.model_validate(p) for p in self.repo.get_many(missing)}
+        entries = {pid: (product_namespace(pid), "detail") for pid in product_ids}
+        return product_cache.get_many(entries, load, PRODUCT_CODEC)
+
+    def batch_lookup(self, product_ids: List[int], fields: Optional[List[str]] = None,
+                     fmt: str = "full") -> dict:
+        """Batch lookup with optional field projection, in full or compact (columnar) form"""
+        ids = list(dict.fromkeys(product_ids))
+        if len(ids) > settings.PRODUCT_BATCH_MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.PRODUCT_BATCH_MAX_IDS} ids per request"
+            )
+        if fields:
+            unknown = [f for f in fields if f not in ProductRead.model_fields]
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown fields: {', '.join(unknown)}"
+                )
+            fields = ["id"] + [f for f in dict.fromkeys(fields) if f != "id"]
+        else:
+            fields = list(ProductRead.model_fields)
+
+        found = self.get_products_by_ids(ids)
+        products = []
+        for pid in ids:
+            if pid in found:
+                dumped = found[pid].model_dump(mode="json", include=set(fields))
+                products.append({f: dumped[f] for f in fields})
+        missing = [pid for pid in ids if pid not in found]
+        if fmt == "compact":
+            return {"fields": fields, "rows": [[p[f] for f in fields] for p in products], "missing": missing}
+        return {"products": products, "missing": missing}
 
     def get_products(self) -> List[Product]:
         return self.repo.get_all()
 
+    def get_products_by_specs(self, filters: SpecFilters, category: Optional[str] = None) -> List[Product]:
+        return self.repo.filter_by_specs(filters, category)
+
+    def get_spec_facets(self, filters: SpecFilters, category: Optional[str], catalog_version: int) -> List[SpecFacetRead]:
+        """Attribute facets for a listing, cached per catalog version"""
+        def load():
+            by_key: Dict[str, list] = {}
+            for key, value, count in self.repo.spec_facets(filters, category):
+                by_key.setdefault(key, []).append({"value": value, "count": count})
+            facets = []
+            for key, values in by_key.items():
+                values.sort(key=lambda v: (-v["count"], v["value"]))
+                facets.append(SpecFacetRead(key=key, values=values[:settings.SPEC_FACET_MAX_VALUES]))
+            facets.sort(key=lambda f: (-sum(v.count for v in f.values), f.key))
+            return facets
+        key = json.dumps([catalog_version, category, sorted(filters.items())], ensure_ascii=False)
+        return product_cache.get_or_load(SPEC_FACETS_NAMESPACE, key, load, SPEC_FACETS_CODEC)
+
     def create_product(self, product_in: ProductCreate) -> Product:
-        return self.repo.create(product_in)
+        product = self.repo.create(product_in)
+        product_cache.bump(category_namespace(product.category))
+        return product
 
     def update_product(self, product_id: int, product_in: ProductUpdate) -> Optional[Product]:
-        return self.repo.update(product_id, product_in)
+        existing = self.repo.get(product_id)
+        if not existing:
+            return None
+        old_category = existing.category
+        product = self.repo.update(product_id, product_in)
+        if product and product.stock_shards:
+            product = InventoryRepository(self.repo.db).set_shards(product_id, product.stock_shards, product.stock)
+            self.repo.db.commit()
+            self.repo.db.refresh(product)
+        if product:
+            self._invalidate(product_id, old_category, product.category)
+        return product
+
+    def update_stock(self, product_id: int, stock: int) -> Optional[Product]:
+        existing = self.repo.get(product_id)
+        if existing and existing.stock_shards:
+            # Hot SKU: the new total is spread over its stock shards
+            product = InventoryRepository(self.repo.db).set_shards(product_id, existing.stock_shards, stock)
+            self.repo.db.commit()
+            self.repo.db.refresh(product)
+        else:
+            product = self.repo.update_stock(product_id, stock)
+        if product:
+            self._invalidate(product_id, product.category)
+        return product
 
     def delete_product(self, product_id: int) -> Optional[Product]:
-        return self.repo.delete(product_id)
-    
+        product = self.repo.delete(product_id)
+        if product:
+            self._invalidate(product_id, product.category)
+        return product
+
+    def _invalidate(self, product_id: int, *categories: Optional[str]) -> None:
+        """Drop cached detail, related lists and category listings touched by a write"""
+        product_cache.bump(product_namespace(product_id),
+                           *(category_namespace(c) for c in categories))
+
     def search_products(self, query: str) -> List[Product]:
         return self.repo.search(query)
-    
-    def get_products_by_category(self, category: str) -> List[Product]:
-        return self.repo.get_by_category(category)
-    
-    def get_related_products(self, product_id: int, limit: int = 4) -> List[Product]:
-        return self.repo.get_related_products(product_id, limit)
-    
-    def get_product_stats(self) -> dict:
-        """Get product statistics for admin dashboard"""
-        products = self.repo.get_all()
-        total = len(products)
-        in_stock = sum(1 for p in products if p.stock > 0)
-        out_of_stock = total - in_stock
-        low_stock = sum(1 for p in products if 0 < p.stock < 10)
-        total_value = sum(p.price * p.stock for p in products)
-        
-        return {
-            "total_products": total,
-            "in_stock": in_stock,
-            "out_of_stock": out_of_stock,
-            "low_stock": low_stock,
-            "total_inventory_value": round(total_value, 2)
-        }
+
+    def get_products_by_category(self, category: str) -> List[ProductRead]:
+        def load():
+            return [ProductRead.model_validate(p) for p in self.repo.get_by_category(category)]
+        return product_cache.get_or_load(category_namespace(category), "list", load, PRODUCT_LIST_CODEC)
+
+    def listing_version(self, category: Optional[str]) -> int:
+        """Cache version of a category listing, part of list ETags so a stale cached body never pins a fresh tag"""
+        return product_cache.version(category_namespace(category))
+
+    def get_related_products(self, product_id: int, limit: int = 4) -> List[ProductRead]:
+        # The cached detail gives us the category, so a warm cache needs no query at all
+        product = self.get_product(product_id)
+        if not product:
+            return []
+
+        def load():
+            return [ProductRead.model_validate(p) for p in self.repo.get_related_products(product_id, limit)]
+        return product_cache.get_or_load(category_namespace(product.category),
+                                         f"related:{product_id}:{limit}", load, PRODUCT_LIST_CODEC)
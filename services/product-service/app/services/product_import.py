@@ -0,0 +1,183 @@
+# Service: Product Service
+# Responsibility: Streaming bulk product import (CSV / NDJSON upsert on SKU)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import csv
+import io
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from app.core.cache import product_cache
+from app.repositories.catalog import CatalogRepository
+from app.repositories.product import ProductRepository
+from app.schemas.product import ProductCreate, ProductImportError, ProductImportReport
+from app.services.product import product_namespace, category_namespace
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+# Recent import reports, polled via GET /admin/products/import/{job_id}
+_MAX_TRACKED_JOBS = 100
+_jobs: "OrderedDict[str, ProductImportReport]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def get_import_job(job_id: str) -> Optional[ProductImportReport]:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def _track(report: ProductImportReport) -> None:
+    with _jobs_lock:
+        _jobs[report.job_id] = report
+        while len(_jobs) > _MAX_TRACKED_JOBS:
+            _jobs.popitem(last=False)
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def _csv_value(field: str, value: str):
+    value = value.strip()
+    if field == "images":
+        return json.loads(value) if value.startswith("[") else [v.strip() for v in value.split("|") if v.strip()]
+    if field == "specifications":
+        return json.loads(value)
+    return value
+
+
+def _iter_rows(text: io.TextIOBase, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield ``(row_number, dict | Exception)`` one record at a time.
+
+    Empty CSV cells are left out of the record, like absent NDJSON keys, so
+    the import keeps the product's current value; NDJSON ``null`` clears it.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            try:
+                yield reader.line_num, {k: _csv_value(k, v) for k, v in row.items() if k and v and v.strip()}
+            except ValueError as e:
+                yield reader.line_num, e
+        return
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except ValueError as e:
+            yield line_num, e
+
+
+class ProductImportService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = ProductRepository(db)
+        self.catalog = CatalogRepository(db)
+
+    def run(self, stream: BinaryIO, fmt: str, batch_size: int = 1000, max_errors: int = 100,
+            job_id: Optional[str] = None) -> ProductImportReport:
+        """Parse ``stream`` incrementally and upsert it in batches of ``batch_size``.
+
+        Only one batch and at most ``max_errors`` error entries are held in
+        memory, so memory use does not depend on the size of the upload.
+        """
+        report = ProductImportReport(job_id=job_id or uuid.uuid4().hex, status="running",
+                                     format=fmt, started_at=datetime.utcnow())
+        _track(report)
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        batch: Dict[str, Tuple[int, dict]] = {}
+        try:
+            for row_num, raw in _iter_rows(text, fmt):
+                report.rows_read += 1
+                row = self._validate(row_num, raw, report, max_errors)
+                if row is None:
+                    continue
+                # Later rows win when a SKU repeats inside one batch
+                batch[row["sku"]] = (row_num, row)
+                if len(batch) >= batch_size:
+                    self._flush(batch, report, max_errors)
+            if batch:
+                self._flush(batch, report, max_errors)
+            report.status = "completed"
+        except Exception as e:
+            logger.error(f"Product import {report.job_id} aborted: {e}")
+            self.db.rollback()
+            report.status = "failed"
+            self._error(report, max_errors, report.rows_read, None, f"Import aborted: {e}", count=False)
+        finally:
+            report.finished_at = datetime.utcnow()
+            text.detach()
+        logger.info(f"Product import {report.job_id}: {report.rows_read} rows, {report.inserted} inserted, "
+                    f"{report.updated} updated, {report.failed} failed")
+        return report
+
+    def _validate(self, row_num: int, raw, report: ProductImportReport, max_errors: int) -> Optional[dict]:
+        if isinstance(raw, Exception):
+            self._error(report, max_errors, row_num, None, f"Malformed row: {raw}")
+            return None
+        sku = raw.get("sku") if isinstance(raw, dict) else None
+        if not sku:
+            self._error(report, max_errors, row_num, None, "sku is required for import")
+            return None
+        try:
+            # Only the columns the row supplies, so an update leaves the others alone
+            return ProductCreate.model_validate(raw).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            self._error(report, max_errors, row_num, sku, message)
+            return None
+
+    def _flush(self, batch: Dict[str, Tuple[int, dict]], report: ProductImportReport, max_errors: int) -> None:
+        try:
+            results = self.repo.upsert_many([row for _, row in batch.values()])
+            self.catalog.bump(("product", product_id, "upsert") for product_id, _, _, _ in results)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            reason = getattr(e, "orig", e)
+            first_row = min(row_num for row_num, _ in batch.values())
+            for row_num, row in batch.values():
+                report.failed += 1
+                if row_num == first_row:
+                    self._error(report, max_errors, row_num, row["sku"],
+                                f"Batch of {len(batch)} rows rejected: {reason}".strip(), count=False)
+            batch.clear()
+            report.batches += 1
+            return
+
+        namespaces = []
+        for product_id, category, inserted, previous_category in results:
+            if inserted:
+                report.inserted += 1
+            else:
+                report.updated += 1
+                namespaces.append(product_namespace(product_id))
+                namespaces.append(category_namespace(previous_category))
+            namespaces.append(category_namespace(category))
+        product_cache.bump(*namespaces)
+        report.batches += 1
+        batch.clear()
+
+    @staticmethod
+    def _error(report: ProductImportReport, max_errors: int, row_num: int, sku: Optional[str],
+               message: str, count: bool = True) -> None:
+        if count:
+            report.failed += 1
+        if len(report.errors) < max_errors:
+            report.errors.append(ProductImportError(row=row_num, sku=sku, error=message))
+        else:
+            report.errors_truncated = True
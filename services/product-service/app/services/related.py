@@ -0,0 +1,204 @@
+# Service: Product Service
+# Responsibility: Content-based related products (feature hashing + blockwise top-k)
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+import math
+import re
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.cache import product_cache
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.related import RelatedRepository
+from app.services.product import category_namespace
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Relative weight of each feature family before IDF weighting
+BRAND_WEIGHT = 2.0
+PRICE_BAND_WEIGHT = 1.5
+NAME_WEIGHT = 1.0
+SPEC_KEY_WEIGHT = 0.5
+SPEC_VALUE_WEIGHT = 1.0
+
+
+def price_band(price: Optional[float]) -> int:
+    """Half-octave price bands: 11 and 14 share a band, 10 and 20 are two bands apart"""
+    return int(math.floor(2 * math.log2(1 + max(price or 0.0, 0.0))))
+
+
+def product_features(name: Optional[str], brand: Optional[str], price: Optional[float],
+                     specifications) -> List[Tuple[str, float]]:
+    """Weighted tokens describing one product; category is handled by bucketing"""
+    features = []
+    if brand:
+        features.append((f"b:{brand.strip().lower()}", BRAND_WEIGHT))
+    band = price_band(price)
+    features += [(f"p:{band}", PRICE_BAND_WEIGHT),
+                 (f"p:{band - 1}", PRICE_BAND_WEIGHT / 2), (f"p:{band + 1}", PRICE_BAND_WEIGHT / 2)]
+    for word in set(_WORD_RE.findall((name or "").lower())):
+        if len(word) > 1:
+            features.append((f"n:{word}", NAME_WEIGHT))
+    if isinstance(specifications, dict):
+        for key, value in specifications.items():
+            key = str(key).strip().lower()
+            features.append((f"k:{key}", SPEC_KEY_WEIGHT))
+            if isinstance(value, (str, int, float, bool)):
+                features.append((f"v:{key}={str(value).strip().lower()}", SPEC_VALUE_WEIGHT))
+    return features
+
+
+class FeatureHasher:
+    """Signed feature hashing into a fixed number of dimensions, memoized per token"""
+
+    def __init__(self, dims: int):
+        self.dims = dims
+        self._slots: Dict[str, Tuple[int, float]] = {}
+
+    def slot(self, token: str) -> Tuple[int, float]:
+        slot = self._slots.get(token)
+        if slot is None:
+            h = zlib.crc32(token.encode())
+            slot = (h % self.dims, 1.0 if h & 0x80000000 else -1.0)
+            self._slots[token] = slot
+        return slot
+
+    def transform(self, rows: Iterable[List[Tuple[str, float]]]) -> np.ndarray:
+        """Unit-length, IDF-weighted float32 vectors, one per feature list"""
+        row_ids, cols, values = [], [], []
+        count = 0
+        for i, features in enumerate(rows):
+            count += 1
+            for token, weight in features:
+                col, sign = self.slot(token)
+                row_ids.append(i)
+                cols.append(col)
+                values.append(sign * weight)
+        flat = np.asarray(row_ids, dtype=np.int64) * self.dims + np.asarray(cols, dtype=np.int64)
+        matrix = np.bincount(flat, weights=np.asarray(values), minlength=count * self.dims)
+        matrix = matrix.reshape(count, self.dims)
+        # Features shared by most of the bucket say little about similarity
+        df = np.count_nonzero(matrix, axis=0)
+        matrix *= np.log((1 + count) / (1 + df)) + 1
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+        return matrix.astype(np.float32)
+
+
+def top_k_neighbors(vectors: np.ndarray, k: int, block_elements: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact cosine top-k for unit vectors, ``block_elements`` similarities at a time.
+
+    Returns ``(indices, scores)``, both ``(n, k)`` and best first; a row never
+    lists itself. Memory is bounded by the block size, not by n squared.
+    """
+    n = len(vectors)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64), np.empty((n, 0), dtype=np.float32)
+    indices = np.empty((n, k), dtype=np.int64)
+    scores = np.empty((n, k), dtype=np.float32)
+    block = max(1, block_elements // n)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        sims = vectors[start:stop] @ vectors.T
+        sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        top = np.argpartition(sims, n - k, axis=1)[:, n - k:]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        indices[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+    return indices, scores
+
+
+def build_bucket_neighbors(ids: np.ndarray, prices: np.ndarray, features: List[List[Tuple[str, float]]],
+                           hasher: FeatureHasher, k: int, max_bucket: int,
+                           block_elements: int) -> Dict[str, np.ndarray]:
+    """Neighbor rows for one category bucket, ready for ``RelatedRepository.replace_neighbors``.
+
+    Buckets larger than ``max_bucket`` are sorted by price and searched in
+    contiguous chunks, which keeps the cost linear in catalog size; neighbors
+    then come from a similar price range, which a price-band feature favours
+    anyway.
+    """
+    out = {"product_id": [], "rank": [], "neighbor_id": [], "score": []}
+    order = np.argsort(prices, kind="stable") if len(ids) > max_bucket else np.arange(len(ids))
+    for chunk in np.array_split(order, max(1, math.ceil(len(ids) / max_bucket))):
+        vectors = hasher.transform(features[i] for i in chunk)
+        neighbors, scores = top_k_neighbors(vectors, k, block_elements)
+        keep = scores > 0
+        rows, ranks = np.nonzero(keep)
+        chunk_ids = ids[chunk]
+        out["product_id"].append(chunk_ids[rows])
+        out["rank"].append(ranks)
+        out["neighbor_id"].append(chunk_ids[neighbors[keep]])
+        out["score"].append(scores[keep])
+    return {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in out.items()}
+
+
+class RelatedProductsService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = RelatedRepository(db)
+
+    def rebuild(self, full: bool = False) -> dict:
+        """Recompute neighbor lists for every category, or only for categories changed since the last run.
+
+        Commits per category, so readers switch to new lists bucket by bucket.
+        """
+        if not self.repo.try_lock():
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Related products build already running")
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        hasher = FeatureHasher(settings.RELATED_FEATURE_DIMS)
+        products = stored = 0
+        try:
+            watermark = None if full else self.repo.get_watermark()
+            categories = self.repo.categories(watermark)
+            self.db.commit()
+            for category in categories:
+                rows = self.repo.bucket(category)
+                ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+                prices = np.fromiter((row[3] or 0.0 for row in rows), dtype=np.float64, count=len(rows))
+                features = [product_features(row[1], row[2], row[3], row[4]) for row in rows]
+                columns = build_bucket_neighbors(ids, prices, features, hasher, settings.RELATED_TOP_K,
+                                                 settings.RELATED_MAX_BUCKET, settings.RELATED_BLOCK_ELEMENTS)
+                stored += self.repo.replace_neighbors(ids, columns)
+                self.db.commit()
+                product_cache.bump(category_namespace(category or None))
+                products += len(rows)
+            self.repo.set_watermark(started_at)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self.repo.unlock()
+            self.db.commit()
+        return {
+            "mode": "incremental" if watermark else "full",
+            "categories": len(categories),
+            "products": products,
+            "neighbors": stored,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+def run_related_build() -> None:
+    """Periodic job: refresh neighbor lists of categories with changed products"""
+    db = SessionLocal()
+    try:
+        summary = RelatedProductsService(db).rebuild()
+        if summary["categories"]:
+            logger.info(f"Related products build: {summary}")
+    except HTTPException as e:
+        logger.debug(f"Related products build skipped: {e.detail}")
+    finally:
+        db.close()
@@ -0,0 +1,97 @@
+# Service: Product Service
+# Responsibility: Product reviews and rating summaries
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+from typing import Optional
+from fastapi import HTTPException, status
+from keyset import InvalidCursor, decode_cursor, next_page
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from app.core.cache import product_cache
+from app.core.config import settings
+from app.repositories.catalog import CatalogRepository
+from app.repositories.product import ProductRepository
+from app.repositories.review import ReviewRepository, STARS
+from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewRead, ReviewPage, RatingSummaryRead
+from app.services.product import category_namespace, product_namespace
+
+RATING_SUMMARY_CODEC = TypeAdapter(Optional[RatingSummaryRead])
+
+
+class ReviewService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = ReviewRepository(db)
+
+    def list_reviews(self, product_id: int, rating: Optional[int], limit: int,
+                     cursor: Optional[str] = None) -> ReviewPage:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        limit = min(limit, settings.REVIEWS_PAGE_MAX)
+        page, next_cursor = next_page(self.repo.list(product_id, rating, after, limit + 1), limit)
+        return ReviewPage(reviews=[ReviewRead.model_validate(r) for r in page], next_cursor=next_cursor)
+
+    def create_review(self, product_id: int, user_id: int, review_in: ReviewCreate) -> ReviewRead:
+        row = self.repo.create(product_id, user_id, review_in.user_name, review_in.rating, review_in.comment)
+        if row is None:
+            self.db.rollback()
+            if not self.repo.product_exists(product_id):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User already reviewed this product")
+        return self._commit(row, rating_changed=True)
+
+    def update_review(self, product_id: int, review_id: int, user_id: int, review_in: ReviewUpdate) -> ReviewRead:
+        """Only the author may change a review"""
+        fields = review_in.model_dump(exclude_unset=True)
+        row = self.repo.update(product_id, review_id, user_id, fields.get("rating"), "comment" in fields,
+                               fields.get("comment"))
+        if row is None:
+            self._not_written(product_id, review_id)
+        return self._commit(row, rating_changed=row.rating != row.old_rating)
+
+    def delete_review(self, product_id: int, review_id: int, user_id: int) -> ReviewRead:
+        """Only the author may delete a review"""
+        row = self.repo.delete(product_id, review_id, user_id)
+        if row is None:
+            self._not_written(product_id, review_id)
+        return self._commit(row, rating_changed=True)
+
+    def _not_written(self, product_id: int, review_id: int) -> None:
+        """Raise for a write that matched no review of the caller: 404 if it does not exist, 403 if it is someone else's"""
+        self.db.rollback()
+        if self.repo.author(product_id, review_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Review not found")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the author can change this review")
+
+    def _commit(self, row, rating_changed: bool) -> ReviewRead:
+        """Commit a review write; rating changes also moved products.rating, so the product is republished"""
+        if rating_changed:
+            CatalogRepository(self.db).bump([("product", row.product_id, "upsert")])
+        self.db.commit()
+        if rating_changed:
+            product_cache.bump(product_namespace(row.product_id), category_namespace(row.category))
+        else:
+            product_cache.bump(product_namespace(row.product_id))
+        return ReviewRead.model_validate(row)
+
+    def get_summary(self, product_id: int) -> Optional[RatingSummaryRead]:
+        """Average, count and star histogram from the running totals; never reads the reviews.
+
+        Products nobody has reviewed yet keep their seeded rating and count,
+        with an empty histogram; the first review starts the totals from zero.
+        """
+        def load():
+            stats = self.repo.get_stats(product_id)
+            if stats is not None:
+                histogram = {k: getattr(stats, f"stars_{k}") for k in STARS}
+                average = round(stats.rating_sum / stats.reviews, 2) if stats.reviews else 0.0
+                return RatingSummaryRead(product_id=product_id, average=average, count=stats.reviews,
+                                         histogram=histogram)
+            product = ProductRepository(self.db).get(product_id)
+            if product is None:
+                return None
+            return RatingSummaryRead(product_id=product_id, average=product.rating or 0.0,
+                                     count=product.reviews_count or 0, histogram={k: 0 for k in STARS})
+        return product_cache.get_or_load(product_namespace(product_id), "rating", load, RATING_SUMMARY_CODEC)
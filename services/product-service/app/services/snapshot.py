@@ -0,0 +1,223 @@
+# Service: Product Service
+# Responsibility: Precompressed catalog snapshot files (NDJSON / MessagePack) for bulk consumers
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.catalog import CatalogRepository
+from app.repositories.snapshot import SnapshotRepository
+from app.services.product import PRODUCT_CODEC
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path(settings.UPLOAD_ROOT) / "snapshots"
+SNAPSHOT_URL_PREFIX = "/uploads/snapshots"
+# Fixed name consumers poll; everything else in the directory is content-addressed
+MANIFEST_NAME = "catalog.json"
+
+SERIALIZATIONS = {"ndjson": "application/x-ndjson", "msgpack": "application/msgpack"}
+ENCODINGS = {"gz": "gzip", "br": "br"}
+
+
+def _compressor(encoding: str):
+    """``(compress, finish)`` of a streaming compressor; gzip output carries no timestamp, so it is reproducible"""
+    if encoding == "gz":
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+    import brotli
+    compressor = brotli.Compressor(quality=settings.SNAPSHOT_BROTLI_QUALITY)
+    return compressor.process, compressor.finish
+
+
+class _SnapshotWriter:
+    """One output file: compress into a temp file, then rename to ``<sha256>_<serialization>.<encoding>``.
+
+    The content-addressed name is what lets the static file handlers send a
+    strong ETag and an immutable Cache-Control for it.
+    """
+
+    def __init__(self, serialization: str, encoding: str):
+        self.serialization = serialization
+        self.encoding = encoding
+        self._compress, self._finish = _compressor(encoding)
+        self._digest = hashlib.sha256()
+        self._size = 0
+        fd, self._tmp_name = tempfile.mkstemp(dir=SNAPSHOT_DIR, prefix=".snapshot-")
+        self._file = os.fdopen(fd, "wb")
+
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self._digest.update(data)
+            self._size += len(data)
+            self._file.write(data)
+
+    def write(self, data: bytes) -> None:
+        self._emit(self._compress(data))
+
+    def finish(self) -> dict:
+        self._emit(self._finish())
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        digest = self._digest.hexdigest()
+        name = f"{digest}_{self.serialization}.{self.encoding}"
+        os.replace(self._tmp_name, SNAPSHOT_DIR / name)
+        return {
+            "format": self.serialization,
+            "content_type": SERIALIZATIONS[self.serialization],
+            "encoding": ENCODINGS[self.encoding],
+            "url": f"{SNAPSHOT_URL_PREFIX}/{name}",
+            "size": self._size,
+            "sha256": digest,
+        }
+
+    def discard(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_name):
+            os.unlink(self._tmp_name)
+
+
+def read_manifest() -> Optional[dict]:
+    try:
+        with open(SNAPSHOT_DIR / MANIFEST_NAME, "rb") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(manifest: dict) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=SNAPSHOT_DIR, prefix=".manifest-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_name, SNAPSHOT_DIR / MANIFEST_NAME)
+
+
+def _remove_stale_files(keep: List[str]) -> int:
+    """Delete superseded snapshot files once they are old enough that no download should still need them"""
+    cutoff = time.time() - settings.SNAPSHOT_RETAIN_SECONDS
+    removed = 0
+    for path in SNAPSHOT_DIR.iterdir():
+        if path.name == MANIFEST_NAME or path.name in keep:
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+class CatalogSnapshotService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = SnapshotRepository(db)
+        self.catalog = CatalogRepository(db)
+
+    def build(self, force: bool = False) -> dict:
+        """Write every configured snapshot file and then the manifest pointing at them.
+
+        Products are read in one REPEATABLE READ transaction, so each file is
+        exactly the catalog at the manifest's ``version``; consumers can then
+        follow GET /products/changes?since=<version>. Nothing is written when
+        the latest manifest is already at the current version, unless ``force``,
+        and a manifest at a later version is never replaced: a build whose read
+        started before another build finished would otherwise roll it back.
+        The advisory lock is held until the manifest and cleanup are done.
+        """
+        formats = [fmt.split(".", 1) for fmt in settings.SNAPSHOT_FORMATS]
+        unknown = [".".join(fmt) for fmt in formats
+                   if len(fmt) != 2 or fmt[0] not in SERIALIZATIONS or fmt[1] not in ENCODINGS]
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                detail=f"Unknown snapshot formats: {', '.join(unknown)}")
+        started = time.perf_counter()
+        SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        writers: List[_SnapshotWriter] = []
+        try:
+            self.repo.begin_consistent_read()
+            if not self.repo.try_lock():
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Catalog snapshot build already running")
+            version, updated_at = self.catalog.get_version()
+            current = read_manifest()
+            if current and current.get("version", 0) > version:
+                return {"version": current["version"], "built": False}
+            if not force and current and current.get("version") == version and all(
+                (SNAPSHOT_DIR / Path(f["url"]).name).exists() for f in current.get("files", [])
+            ):
+                return {"version": version, "built": False}
+
+            writers = [_SnapshotWriter(serialization, encoding) for serialization, encoding in formats]
+            by_serialization: Dict[str, List[_SnapshotWriter]] = {}
+            for writer in writers:
+                by_serialization.setdefault(writer.serialization, []).append(writer)
+            packer = None
+            if "msgpack" in by_serialization:
+                import msgpack
+                packer = msgpack.Packer()
+
+            count = 0
+            for product in self.repo.iter_products(settings.SNAPSHOT_BATCH_SIZE):
+                item = PRODUCT_CODEC.validate_python(product, from_attributes=True)
+                for writer in by_serialization.get("ndjson", ()):
+                    writer.write(PRODUCT_CODEC.dump_json(item) + b"\n")
+                if packer is not None:
+                    # A stream of maps, one per product, readable with msgpack.Unpacker
+                    packed = packer.pack(PRODUCT_CODEC.dump_python(item, mode="json"))
+                    for writer in by_serialization["msgpack"]:
+                        writer.write(packed)
+                count += 1
+            files = [writer.finish() for writer in writers]
+            writers = []
+
+            _write_manifest({
+                "version": version,
+                "updated_at": updated_at.isoformat() if updated_at else None,
+                "generated_at": datetime.utcnow().isoformat(),
+                "products": count,
+                "files": files,
+            })
+            removed = _remove_stale_files([Path(f["url"]).name for f in files])
+        except Exception:
+            for writer in writers:
+                writer.discard()
+            raise
+        finally:
+            # Ends the read transaction and releases the advisory lock
+            self.db.rollback()
+
+        return {
+            "version": version,
+            "built": True,
+            "products": count,
+            "files": {f"{f['format']}.{f['encoding']}": f["size"] for f in files},
+            "removed": removed,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+def run_catalog_snapshot() -> None:
+    """Periodic job; a no-op while the catalog version is unchanged"""
+    db = SessionLocal()
+    try:
+        summary = CatalogSnapshotService(db).build()
+        if summary["built"]:
+            logger.info(f"Catalog snapshot: {summary}")
+    except HTTPException as e:
+        logger.debug(f"Catalog snapshot skipped: {e.detail}")
+    finally:
+        db.close()
@@ -0,0 +1,71 @@
+# Service: Product Service
+# Responsibility: Inventory statistics for the admin dashboard
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.stats import InventoryStatsRepository
+
+logger = logging.getLogger(__name__)
+
+
+def _category_entry(row: dict) -> dict:
+    return {
+        "category": row["category"] or None,
+        "total_products": int(row["products"]),
+        "in_stock": int(row["in_stock"]),
+        "out_of_stock": int(row["products"] - row["in_stock"]),
+        "low_stock": int(row["low_stock"]),
+        "total_inventory_value": round(float(row["total_value"]), 2),
+    }
+
+
+class InventoryStatsService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.repo = InventoryStatsRepository(db)
+
+    def get_stats(self) -> dict:
+        """Dashboard totals with a per-category breakdown, without loading product rows"""
+        categories = [_category_entry(row) for row in self.repo.by_category(settings.INVENTORY_STATS_INCREMENTAL)]
+        totals = {key: sum(c[key] for c in categories)
+                  for key in ("total_products", "in_stock", "out_of_stock", "low_stock")}
+        totals["total_inventory_value"] = round(sum(c["total_inventory_value"] for c in categories), 2)
+        return {**totals, "categories": categories}
+
+    def get_low_stock(self, limit: int = 20, horizon_days: Optional[float] = None) -> List[dict]:
+        return self.repo.low_stock(limit, horizon_days or settings.LOW_STOCK_HORIZON_DAYS)
+
+    def compact(self) -> int:
+        try:
+            folded = self.repo.compact()
+            self.db.commit()
+            return folded
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def rebuild(self) -> dict:
+        try:
+            self.repo.rebuild()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return self.get_stats()
+
+
+def run_stats_compaction() -> None:
+    """Periodic job: fold trigger-written stats deltas into the per-category totals"""
+    if not settings.INVENTORY_STATS_INCREMENTAL:
+        return
+    db = SessionLocal()
+    try:
+        folded = InventoryStatsService(db).compact()
+        if folded:
+            logger.debug(f"Folded {folded} inventory stats deltas")
+    finally:
+        db.close()
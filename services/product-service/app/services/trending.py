@@ -0,0 +1,99 @@
+# Service: Product Service
+# Responsibility: Trending and most-viewed products from decayed in-memory event counters
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+
+import logging
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.sketch import DecayedTopK
+from app.db.session import SessionLocal
+from app.schemas.product import TrendingProductRead
+from app.services.product import ProductService
+
+logger = logging.getLogger(__name__)
+
+# Entries decayed below this many events are not reported
+MIN_SCORE = 0.01
+
+# Event weights per ranking: trending reacts to purchase intent within hours,
+# most-viewed is a slow-moving popularity list
+EVENT_WEIGHTS = {
+    "trending": {"view": 1.0, "add_to_cart": settings.TRENDING_CART_WEIGHT},
+    "most-viewed": {"view": 1.0},
+}
+
+
+def _tracker(half_life: float) -> DecayedTopK:
+    return DecayedTopK(half_life, settings.TRENDING_SKETCH_WIDTH, settings.TRENDING_SKETCH_DEPTH,
+                       settings.TRENDING_CAPACITY)
+
+
+# Process-wide counters, fed by request handlers
+rankings: Dict[str, DecayedTopK] = {
+    "trending": _tracker(settings.TRENDING_HALF_LIFE_SECONDS),
+    "most-viewed": _tracker(settings.MOST_VIEWED_HALF_LIFE_SECONDS),
+}
+
+
+def record_event(product_id: int, event: str) -> None:
+    """O(1) per ranking; never touches the database"""
+    for name, weights in EVENT_WEIGHTS.items():
+        weight = weights.get(event)
+        if weight:
+            rankings[name].add(product_id, weight)
+
+
+def _checkpoint_key(ranking: str) -> str:
+    return f"{settings.TRENDING_CHECKPOINT_KEY}:{ranking}"
+
+
+def save_checkpoint() -> None:
+    db = SessionLocal()
+    try:
+        for name, tracker in rankings.items():
+            db.execute(text("""
+                INSERT INTO trending_checkpoints (key, payload, saved_at) VALUES (:key, :payload, :saved_at)
+                ON CONFLICT (key) DO UPDATE SET payload = excluded.payload, saved_at = excluded.saved_at
+            """), {"key": _checkpoint_key(name), "payload": tracker.dump(), "saved_at": datetime.utcnow()})
+        db.commit()
+    finally:
+        db.close()
+
+
+def restore_checkpoint() -> None:
+    """Load the last checkpoint, if any; counters decay across the downtime as if it had not happened"""
+    db = SessionLocal()
+    try:
+        for name, tracker in rankings.items():
+            payload = db.execute(text("SELECT payload FROM trending_checkpoints WHERE key = :key"),
+                                 {"key": _checkpoint_key(name)}).scalar()
+            if payload is not None and not tracker.load(payload):
+                logger.warning(f"Trending checkpoint {name} does not match the sketch settings; starting empty")
+    except Exception as e:
+        logger.error(f"Cannot restore trending checkpoint: {e}")
+    finally:
+        db.close()
+
+
+def run_trending_checkpoint() -> None:
+    save_checkpoint()
+
+
+class TrendingService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def top(self, ranking: str, limit: int) -> List[TrendingProductRead]:
+        """Heaviest products of a ranking; cost depends on ``limit`` and the counter capacity only.
+
+        Products deleted since they were counted are skipped.
+        """
+        ranked = [(pid, score) for pid, score in rankings[ranking].top(limit * 2) if score >= MIN_SCORE]
+        products = ProductService(self.db).get_products_by_ids([pid for pid, _ in ranked])
+        return [
+            TrendingProductRead(**products[pid].model_dump(), score=round(score, 3))
+            for pid, score in ranked if pid in products
+        ][:limit]
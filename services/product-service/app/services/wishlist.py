@@ -3,19 +3,61 @@
 # Architecture: FastAPI + SQLAlchemy + PostgreSQL
 
 from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from app.core.cache import product_cache
 from app.repositories.wishlist import WishlistRepository
-from app.models.wishlist import Wishlist
-from typing import List
+from typing import Dict, FrozenSet, List
+
+# A user's wishlisted product ids; a frozenset locally, a JSON int list in Redis
+WISHLIST_IDS_CODEC = TypeAdapter(FrozenSet[int])
+
+
+def wishlist_namespace(user_id: int) -> str:
+    return f"wishlist:{user_id}"
+
 
 class WishlistService:
     def __init__(self, db: Session):
         self.repo = WishlistRepository(db)
 
-    def add_to_wishlist(self, user_id: int, product_id: int) -> Wishlist:
-        return self.repo.add_to_wishlist(user_id, product_id)
+    def _product_ids(self, user_id: int) -> FrozenSet[int]:
+        return product_cache.get_or_load(wishlist_namespace(user_id), "ids",
+                                         lambda: frozenset(self.repo.get_product_ids(user_id)),
+                                         WISHLIST_IDS_CODEC)
+
+    def _refresh_product_ids(self, user_id: int) -> FrozenSet[int]:
+        # Write-through: readers on every replica see the change without a DB round trip
+        return product_cache.reload(wishlist_namespace(user_id), "ids",
+                                    lambda: frozenset(self.repo.get_product_ids(user_id)), WISHLIST_IDS_CODEC)
+
+    def add_to_wishlist(self, user_id: int, product_id: int) -> dict:
+        item = self.repo.add_to_wishlist(user_id, product_id)
+        if item is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+        self._refresh_product_ids(user_id)
+        return item
 
     def remove_from_wishlist(self, user_id: int, product_id: int) -> bool:
-        return self.repo.remove_from_wishlist(user_id, product_id)
+        removed = self.repo.remove_from_wishlist(user_id, product_id)
+        if removed:
+            self._refresh_product_ids(user_id)
+        return removed
+
+    def bulk_add(self, user_id: int, product_ids: List[int]) -> dict:
+        """Merge many products (e.g. a guest wishlist at login); unknown products are ignored"""
+        changed = self.repo.add_many(user_id, product_ids)
+        return {"changed": changed, "product_ids": sorted(self._after_bulk(user_id, changed))}
+
+    def bulk_remove(self, user_id: int, product_ids: List[int]) -> dict:
+        changed = self.repo.remove_many(user_id, product_ids)
+        return {"changed": changed, "product_ids": sorted(self._after_bulk(user_id, changed))}
+
+    def _after_bulk(self, user_id: int, changed: List[int]) -> FrozenSet[int]:
+        return self._refresh_product_ids(user_id) if changed else self._product_ids(user_id)
+
+    def most_wishlisted(self, limit: int) -> List[dict]:
+        return self.repo.most_wishlisted(limit)
 
     def get_user_wishlist(self, user_id: int) -> List:
         return self.repo.get_user_wishlist(user_id)
@@ -45,4 +87,9 @@ class WishlistService:
         return products
 
     def is_in_wishlist(self, user_id: int, product_id: int) -> bool:
-        return self.repo.is_in_wishlist(user_id, product_id)
+        return product_id in self._product_ids(user_id)
+
+    def check_many(self, user_id: int, product_ids: List[int]) -> Dict[int, bool]:
+        """Membership map for a product grid from the cached id set (one query when cold)"""
+        wishlisted = self._product_ids(user_id)
+        return {product_id: product_id in wishlisted for product_id in product_ids}
@@ -0,0 +1,114 @@
+# Service: Product Service
+# Responsibility: Runtime benchmark for the stock forecast job on synthetic sales
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+#
+# Usage:
+#   python -m benchmarks.bench_forecast --skus 1000000 --days 90 --density 0.2
+#   # fetch the real feed from ORDER_SERVICE_URL instead of serving the synthetic one in-process:
+#   python -m benchmarks.bench_forecast --live-fetch
+#   # also time load_stock and the COPY into stock_forecasts (overwrites it; scratch database only):
+#   DATABASE_URL=... python -m benchmarks.bench_forecast --store
+#
+# Phases are timed separately: fetch (stream and decode the sales feed), load
+# (binary COPY of products), compute and store (binary COPY into
+# stock_forecasts). Compute always runs on the synthetic catalog so its
+# numbers do not depend on what the database holds.
+
+import argparse
+import time
+import httpx
+import numpy as np
+from app.core.config import settings
+from app.services.forecast import SALES_DTYPE, compute_forecast, fetch_daily_sales
+
+
+def synthetic_sales(skus: int, days: int, density: float, seed: int) -> np.ndarray:
+    """Sparse (product_id, day, quantity) records: each SKU sells on ~density of the days"""
+    rng = np.random.default_rng(seed)
+    count = int(skus * days * density)
+    sales = np.empty(count, dtype=SALES_DTYPE)
+    # Mostly uniform, with a skewed head of best sellers
+    product_ids = rng.integers(1, skus + 1, count)
+    hot = rng.random(count) < 0.3
+    product_ids[hot] = np.minimum(rng.zipf(1.3, int(hot.sum())), skus)
+    sales["product_id"] = product_ids
+    sales["day"] = rng.integers(0, days, count)
+    sales["quantity"] = rng.poisson(2.0, count) + 1
+    return sales
+
+
+class ChunkedFeed(httpx.SyncByteStream):
+    """A response body sent in fixed-size chunks, like order-service's streamed feed"""
+
+    def __init__(self, payload: bytes, chunk: int = 1 << 20):
+        self.payload, self.chunk = memoryview(payload), chunk
+
+    def __iter__(self):
+        for start in range(0, len(self.payload), self.chunk):
+            yield bytes(self.payload[start:start + self.chunk])
+
+
+def feed_transport(payload: bytes) -> httpx.MockTransport:
+    return httpx.MockTransport(lambda request: httpx.Response(200, stream=ChunkedFeed(payload)))
+
+
+def phase(name: str, started: float, detail: str = "") -> None:
+    print(f"{name:<9}{time.perf_counter() - started:>8.2f}s  {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock forecast benchmark")
+    parser.add_argument("--skus", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--density", type=float, default=0.2, help="Share of SKU-days with a sale record")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--live-fetch", action="store_true", help="Fetch the sales feed from ORDER_SERVICE_URL")
+    parser.add_argument("--store", action="store_true", help="Also time load_stock and the COPY into stock_forecasts")
+    args = parser.parse_args()
+
+    mark = time.perf_counter()
+    product_ids = np.arange(1, args.skus + 1, dtype=np.int64)
+    stock = np.random.default_rng(args.seed).integers(0, 500, args.skus)
+    sales = synthetic_sales(args.skus, args.days, args.density, args.seed)
+    phase("generate", mark, f"{args.skus:,} SKUs x {args.days} days, {len(sales):,} sale records "
+                            f"({sales.nbytes / 1e6:.0f} MB on the wire)")
+
+    mark = time.perf_counter()
+    if args.live_fetch:
+        fetched = fetch_daily_sales(args.days)
+        phase("fetch", mark, f"{len(fetched):,} records from {settings.ORDER_SERVICE_URL}")
+    else:
+        fetched = fetch_daily_sales(args.days, transport=feed_transport(sales.tobytes()))
+        assert len(fetched) == len(sales)
+        phase("fetch", mark, f"{len(fetched):,} records, served in-process")
+
+    if args.store:
+        from app.db.session import Base, SessionLocal, engine
+        from app.models.forecast import StockForecast  # noqa: F401
+        from app.repositories.forecast import ForecastRepository
+        Base.metadata.create_all(bind=engine)
+        with SessionLocal() as db:
+            mark = time.perf_counter()
+            loaded, _ = ForecastRepository(db).load_stock()
+            phase("load", mark, f"{len(loaded):,} products")
+
+    mark = time.perf_counter()
+    result = compute_forecast(
+        product_ids, stock, sales, args.days, settings.FORECAST_LEAD_TIME_DAYS, settings.FORECAST_REVIEW_DAYS,
+        settings.FORECAST_SERVICE_LEVEL_Z, settings.FORECAST_HALF_LIFE_DAYS
+    )
+    elapsed = time.perf_counter() - mark
+    phase("compute", mark, f"{args.skus / elapsed:,.0f} SKUs/s, {int(result['needs_reorder'].sum()):,} need reorder")
+
+    if args.store:
+        keep = (result["daily_velocity"] > 0) | (result["stock"] <= 0)
+        rows = {name: column[keep] for name, column in result.items()}
+        with SessionLocal() as db:
+            mark = time.perf_counter()
+            stored = ForecastRepository(db).replace_all(rows)
+            db.commit()
+            phase("store", mark, f"{stored:,} rows")
+
+
+if __name__ == "__main__":
+    main()
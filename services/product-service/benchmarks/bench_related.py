@@ -0,0 +1,68 @@
+# Service: Product Service
+# Responsibility: Runtime benchmark for the related-products build on a synthetic catalog
+# Architecture: FastAPI + SQLAlchemy + PostgreSQL
+#
+# Usage:
+#   python -m benchmarks.bench_related --products 1000000 --categories 200
+
+import argparse
+import time
+import numpy as np
+from app.core.config import settings
+from app.services.related import FeatureHasher, build_bucket_neighbors, product_features
+
+WORDS = [f"word{i}" for i in range(5000)]
+SPEC_KEYS = ["color", "size", "material", "origin", "warranty", "weight"]
+
+
+def synthetic_bucket(rng, size: int, start_id: int):
+    """Ids, prices and feature lists for one category of ``size`` products"""
+    ids = np.arange(start_id, start_id + size, dtype=np.int64)
+    prices = np.round(rng.lognormal(5, 1.2, size), 2)
+    brands = rng.integers(0, max(2, size // 50), size)
+    words = rng.zipf(1.4, (size, 4)) % len(WORDS)
+    features = []
+    for i in range(size):
+        specs = {key: f"{key}-{rng.integers(0, 8)}" for key in SPEC_KEYS[:int(rng.integers(2, 6))]}
+        name = " ".join(WORDS[w] for w in words[i])
+        features.append(product_features(name, f"brand{brands[i]}", float(prices[i]), specs))
+    return ids, prices, features
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Related products build benchmark")
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    # Skewed category sizes: a few huge categories, a long tail of small ones
+    weights = rng.zipf(1.5, args.categories).astype(np.float64)
+    sizes = np.maximum(1, (weights / weights.sum() * args.products).astype(np.int64))
+    hasher = FeatureHasher(settings.RELATED_FEATURE_DIMS)
+
+    features_seconds = build_seconds = 0.0
+    neighbors = 0
+    start_id = 1
+    for size in sizes:
+        mark = time.perf_counter()
+        ids, prices, features = synthetic_bucket(rng, int(size), start_id)
+        features_seconds += time.perf_counter() - mark
+        start_id += int(size)
+
+        mark = time.perf_counter()
+        columns = build_bucket_neighbors(ids, prices, features, hasher, settings.RELATED_TOP_K,
+                                         settings.RELATED_MAX_BUCKET, settings.RELATED_BLOCK_ELEMENTS)
+        build_seconds += time.perf_counter() - mark
+        neighbors += len(columns["product_id"])
+
+    total = int(sizes.sum())
+    print(f"{total:,} products in {args.categories} categories (largest {int(sizes.max()):,})")
+    print(f"feature extraction: {features_seconds:.2f}s")
+    print(f"vectorize + top-{settings.RELATED_TOP_K}: {build_seconds:.2f}s ({total / build_seconds:,.0f} products/s), "
+          f"{neighbors:,} neighbor rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.db.session import Base, SessionLocal, engine
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The DATABASE_URL engine with the service schema; tests using it skip when PostgreSQL is unreachable"""
+    try:
+        with engine.connect():
+            pass
+    except OperationalError:
+        pytest.skip("PostgreSQL is not reachable at DATABASE_URL")
+    import app.main  # noqa: F401  (registers every model)
+    from app.db.migrate import run_migrations
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    return engine
+
+
+@pytest.fixture
+def db(database):
+    """A session whose commits land in an outer transaction that is rolled back after the test"""
+    connection = database.connect()
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def client(db):
+    """TestClient whose requests run on the test session (startup hooks and background jobs do not run)"""
+    from fastapi.testclient import TestClient
+    from app.api.v1 import admin_routes, routes
+    from app.main import app
+    app.dependency_overrides[routes.get_db] = lambda: db
+    app.dependency_overrides[admin_routes.get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def make_product(db):
+    """Insert a product and return its id"""
+    from app.models.product import Product
+
+    def make(**fields):
+        fields.setdefault("name", "Test product")
+        fields.setdefault("price", 10.0)
+        fields.setdefault("stock", 5)
+        product = Product(**fields)
+        db.add(product)
+        db.flush()
+        return product.id
+    return make
@@ -0,0 +1,35 @@
+from app.core.config import settings
+
+URL = "/api/v1/products/batch"
+
+
+def test_batch_keeps_request_order_and_reports_missing_ids(client, make_product):
+    a = make_product(name="A", price=1.0)
+    b = make_product(name="B", price=2.0)
+    missing = b + 1_000_000
+    response = client.get(URL, params={"ids": f"{b},{missing},{a},{b}"})
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["id"] for p in body["products"]] == [b, a]
+    assert [p["name"] for p in body["products"]] == ["B", "A"]
+    assert body["missing"] == [missing]
+    assert set(body["products"][0]) == set(client.get(f"/api/v1/products/{b}").json())
+
+
+def test_batch_projection_and_compact_form(client, make_product):
+    a = make_product(name="A", price=1.5, stock=7)
+    b = make_product(name="B", price=2.5, stock=0)
+    projected = client.get(URL, params={"ids": f"{a},{b}", "fields": "price,name"}).json()
+    assert projected["products"] == [{"id": a, "price": 1.5, "name": "A"}, {"id": b, "price": 2.5, "name": "B"}]
+
+    compact = client.post(URL, json={"ids": [b, a], "fields": ["stock"], "format": "compact"}).json()
+    assert compact == {"fields": ["id", "stock"], "rows": [[b, 0], [a, 7]], "missing": []}
+
+
+def test_batch_rejects_bad_requests(client):
+    assert client.get(URL, params={"ids": "1,x"}).status_code == 400
+    assert client.get(URL, params={"ids": ","}).status_code == 400
+    assert client.get(URL, params={"ids": "1", "fields": "password"}).status_code == 400
+    too_many = list(range(1, settings.PRODUCT_BATCH_MAX_IDS + 2))
+    assert client.post(URL, json={"ids": too_many}).status_code == 400
+    assert client.post(URL, json={"ids": []}).status_code == 422
@@ -0,0 +1,135 @@
+import time
+from pydantic import TypeAdapter
+from app.core.cache import LocalTTLCache, ProductCache, _MISS
+
+INT = TypeAdapter(int)
+
+
+class FakeRedis:
+    """The handful of Redis commands ProductCache uses, with a switch to make them fail"""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("redis down")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value
+
+    def incr(self, key):
+        self._check()
+        self.data[key] = str(int(self.data.get(key) or 0) + 1).encode()
+        return int(self.data[key])
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def incr(self, key):
+        self.calls.append(("incr", key))
+
+    def set(self, key, value, ex=None):
+        self.calls.append(("set", key, value))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, *args in self.calls]
+
+
+def redis_cache(version_ttl=0.05):
+    cache = ProductCache(LocalTTLCache(100, 60), redis_url="redis://fake", version_ttl=version_ttl)
+    cache._redis = FakeRedis()
+    return cache
+
+
+def test_local_ttl_cache_evicts_least_recently_used():
+    cache = LocalTTLCache(max_items=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is _MISS
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_local_ttl_cache_expires_entries():
+    cache = LocalTTLCache(max_items=10, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is _MISS
+
+
+def test_bump_invalidates_without_redis():
+    cache = ProductCache(LocalTTLCache(100, 60))
+    assert cache.get_or_load("product:1", "detail", lambda: 1, INT) == 1
+    cache.bump("product:1")
+    assert cache.get_or_load("product:1", "detail", lambda: 2, INT) == 2
+
+
+def test_evicted_version_never_reuses_an_old_number():
+    cache = ProductCache(LocalTTLCache(100, 60), max_versions=2)
+    cache.get_or_load("product:1", "detail", lambda: 1, INT)
+    cache.version("product:2")
+    cache.version("product:3")  # Evicts product:1's version
+    assert len(cache._versions._data) == 2
+    assert cache.get_or_load("product:1", "detail", lambda: 2, INT) == 2
+
+
+def test_failed_bump_is_not_undone_when_the_version_is_reread():
+    cache = redis_cache()
+    assert cache.get_or_load("product:1", "detail", lambda: 1, INT) == 1
+    cache.redis.down = True
+    cache.bump("product:1")
+    assert cache.get_or_load("product:1", "detail", lambda: 2, INT) == 2
+    cache.redis.down = False
+    time.sleep(0.06)  # Local version is due a re-read from Redis
+    # Served from the entry loaded after the bump, never the one cached before it
+    assert cache.get_or_load("product:1", "detail", lambda: 3, INT) == 2
+    assert cache.redis.data["ver:product:1"] == b"1"  # The missed bump was replayed
+    assert not cache._pending
+
+
+def test_failed_bump_stays_pinned_while_redis_is_down():
+    cache = redis_cache()
+    cache.get_or_load("product:1", "detail", lambda: 1, INT)
+    cache.redis.down = True
+    cache.bump("product:1")
+    time.sleep(0.06)
+    assert cache.version("product:1") == 1
+    assert cache.get_or_load("product:1", "detail", lambda: 2, INT) == 2
+
+
+def test_get_many_loads_only_what_neither_tier_has():
+    cache = redis_cache()
+    entries = {pid: (f"product:{pid}", "detail") for pid in (1, 2, 3, 4)}
+    cache.get_or_load("product:1", "detail", lambda: 10, INT)  # Both tiers
+    cache.get_or_load("product:2", "detail", lambda: 20, INT)
+    cache.local._data.clear()  # product:2 now lives in Redis only
+    cache.get_or_load("product:1", "detail", lambda: 10, INT)
+    requested = []
+
+    def load(missing):
+        requested.append(sorted(missing))
+        return {pid: pid * 10 for pid in missing if pid != 4}
+
+    assert cache.get_many(entries, load, INT) == {1: 10, 2: 20, 3: 30}
+    assert requested == [[3, 4]]
+    # Loaded values reach both tiers, so the next call needs no load at all
+    assert cache.get_many({3: entries[3]}, load, INT) == {3: 30}
+    assert requested == [[3, 4]]
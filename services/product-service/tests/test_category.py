@@ -0,0 +1,25 @@
+from app.schemas.category import CategoryTreeNode
+from app.services.category import find_node, subtree_names
+
+
+def node(category_id, name, *children):
+    return CategoryTreeNode(id=category_id, name=name, product_count=0, total_product_count=0,
+                            children=list(children))
+
+
+TREE = [
+    node(1, "Electronics", node(2, "Phones", node(4, "Android"), node(5, "iPhone")), node(3, "Laptops")),
+    node(6, "Books"),
+]
+
+
+def test_find_node_searches_every_level():
+    assert find_node(TREE, 6).name == "Books"
+    assert find_node(TREE, 5).name == "iPhone"
+    assert find_node(TREE, 99) is None
+    assert find_node([], 1) is None
+
+
+def test_subtree_names_include_the_node_and_all_descendants():
+    assert sorted(subtree_names(find_node(TREE, 1))) == ["Android", "Electronics", "Laptops", "Phones", "iPhone"]
+    assert subtree_names(find_node(TREE, 3)) == ["Laptops"]
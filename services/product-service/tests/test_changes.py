@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from app.api.v1 import routes
+from app.core.notify import VersionListener
+from app.models.product import Product
+from app.repositories.catalog import CatalogRepository
+from app.services.catalog import CatalogService
+
+
+@pytest.fixture
+def service(db):
+    return CatalogService(db)
+
+
+def _ops(page):
+    return [(c.entity, c.entity_id, c.op) for c in page["changes"]]
+
+
+def test_changes_after_a_version_in_order(db, service, make_product):
+    start = service.get_changes(None, 100)
+    assert (start["changes"], start["has_more"]) == ([], False)
+    since = start["next_since"]
+
+    a = make_product(name="A")
+    b = make_product(name="B")
+    db.get(Product, a).price = 11.0
+    db.flush()
+    db.delete(db.get(Product, b))
+    db.flush()
+
+    page = service.get_changes(since, 100)
+    assert _ops(page) == [("product", a, "upsert"), ("product", b, "upsert"),
+                          ("product", a, "upsert"), ("product", b, "delete")]
+    assert [c.version for c in page["changes"]] == [since + 1, since + 2, since + 3, since + 4]
+    assert (page["next_since"], page["has_more"]) == (since + 4, False)
+    assert service.get_changes(page["next_since"], 100)["changes"] == []
+
+
+def test_pages_end_on_version_boundaries(db, service, make_product):
+    since = service.get_version()[0]
+    db.add_all([Product(name=f"P{i}", price=1.0, stock=1) for i in range(3)])
+    db.flush()  # One version with three changes
+    make_product(name="Later")
+
+    first = service.get_changes(since, 2)  # The three-change version is returned whole
+    assert len(first["changes"]) == 3 and first["has_more"]
+    assert first["next_since"] == since + 1
+    second = service.get_changes(first["next_since"], 2)
+    assert (_ops(second)[0][0], second["next_since"], second["has_more"]) == ("product", since + 2, False)
+
+
+def test_versions_outside_the_log_are_gone(db, service, make_product):
+    make_product()
+    version = service.get_version()[0]
+    with pytest.raises(HTTPException) as e:
+        service.get_changes(version + 1, 100)
+    assert e.value.status_code == 410
+
+    assert CatalogRepository(db).prune(timedelta(seconds=-60)) > 0
+    with pytest.raises(HTTPException) as e:
+        service.get_changes(version - 1, 100)
+    assert e.value.status_code == 410
+    assert service.get_changes(version, 100)["changes"] == []
+
+
+def test_compaction_keeps_only_the_latest_change(db, service, make_product):
+    since = service.get_version()[0]
+    product_id = make_product()
+    for price in (2.0, 3.0):
+        db.get(Product, product_id).price = price
+        db.flush()
+    assert CatalogRepository(db).compact() >= 2
+    assert _ops(service.get_changes(since, 100)) == [("product", product_id, "upsert")]
+
+
+def test_long_poll_returns_once_the_wait_runs_out(client, db, service, monkeypatch):
+    monkeypatch.setattr(routes, "read_changes", lambda since, limit: CatalogService(db).get_changes(since, limit))
+    since = service.get_version()[0]
+    started = time.monotonic()
+    response = client.get("/api/v1/products/changes", params={"since": since, "wait": 0.3})
+    assert time.monotonic() - started >= 0.3
+    assert response.json() == {"changes": [], "next_since": since, "has_more": False}
+
+    assert client.get("/api/v1/products/changes", params={"since": since + 10**6}).status_code == 410
+
+
+def test_long_poll_answers_immediately_when_changes_exist(client, db, service, make_product, monkeypatch):
+    monkeypatch.setattr(routes, "read_changes", lambda since, limit: CatalogService(db).get_changes(since, limit))
+    since = service.get_version()[0]
+    product_id = make_product()
+    started = time.monotonic()
+    response = client.get("/api/v1/products/changes", params={"since": since, "wait": 5})
+    assert time.monotonic() - started < 2
+    assert [(c["entity"], c["entity_id"], c["op"]) for c in response.json()["changes"]] == \
+        [("product", product_id, "upsert")]
+
+
+def test_listener_wakes_waiters_only_for_newer_versions():
+    listener = VersionListener(engine=None, channel="test")
+
+    async def wait(version, timeout):
+        return await listener.wait_beyond(version, timeout)
+
+    assert asyncio.run(wait(0, 0.05)) is False
+    threading.Timer(0.05, listener._publish, args=(3,)).start()
+    started = time.monotonic()
+    assert asyncio.run(wait(0, 5)) is True
+    assert time.monotonic() - started < 2
+    listener.observe(2)  # Older versions are ignored
+    assert listener.latest == 3
+    assert asyncio.run(wait(2, 0)) is True  # Already beyond: no wait at all
+    assert asyncio.run(wait(3, 0.05)) is False
@@ -0,0 +1,36 @@
+import numpy as np
+from app.services.copurchase import BASKET_DTYPE, basket_counts
+
+
+def baskets(*orders):
+    """(order_id, [product_ids]) -> feed records grouped by order"""
+    return np.array([(order_id, pid) for order_id, products in orders for pid in products], dtype=BASKET_DTYPE)
+
+
+def as_dict(pairs):
+    return {(a, b): n for a, b, n in zip(pairs["product_id"].tolist(), pairs["other_id"].tolist(),
+                                         pairs["orders"].tolist())}
+
+
+def test_pairs_are_counted_in_both_directions():
+    pairs, items, orders = basket_counts(baskets((1, [1, 2, 3]), (2, [2, 3]), (3, [3])), max_basket=10)
+    assert orders == 3
+    assert as_dict(pairs) == {(1, 2): 1, (2, 1): 1, (1, 3): 1, (3, 1): 1, (2, 3): 2, (3, 2): 2}
+    assert dict(zip(items["product_id"].tolist(), items["orders"].tolist())) == {1: 1, 2: 2, 3: 3}
+
+
+def test_pairs_do_not_cross_orders():
+    pairs, _, _ = basket_counts(baskets((1, [1]), (2, [2]), (3, [3, 4])), max_basket=10)
+    assert as_dict(pairs) == {(3, 4): 1, (4, 3): 1}
+
+
+def test_large_baskets_count_items_but_no_pairs():
+    pairs, items, orders = basket_counts(baskets((1, [1, 2, 3, 4]), (2, [1, 2])), max_basket=3)
+    assert orders == 2
+    assert as_dict(pairs) == {(1, 2): 1, (2, 1): 1}
+    assert items["orders"].tolist() == [2, 2, 1, 1]
+
+
+def test_empty_batch():
+    pairs, items, orders = basket_counts(baskets(), max_basket=10)
+    assert orders == 0 and not len(pairs["product_id"]) and not len(items["product_id"])
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+from app.core.config import settings
+from app.services.feed import feed_item, fingerprint
+
+
+def product(**overrides):
+    fields = dict(id=7, sku=None, name="Phone", description=None, stock=3, price=199.5, image="/uploads/a.png",
+                  images=["/uploads/a.png", "https://cdn.example.com/b.png", None], brand="Acme", category="Phones")
+    return SimpleNamespace(**{**fields, **overrides})
+
+
+def test_feed_item_formats_fields():
+    item = feed_item(product())
+    assert item["id"] == "7"
+    assert item["description"] == "Phone"
+    assert item["availability"] == "in_stock"
+    assert item["price"] == f"199.50 {settings.FEED_CURRENCY}"
+    assert item["image_link"] == f"{settings.PUBLIC_BASE_URL.rstrip('/')}/uploads/a.png"
+    assert item["additional_image_link"] == "https://cdn.example.com/b.png"
+    assert item["link"].endswith("/products/7")
+
+
+def test_feed_item_prefers_sku_and_falls_back_to_first_image():
+    item = feed_item(product(sku="SKU-1", image=None, images=["https://cdn.example.com/b.png"], stock=0,
+                             brand=None, category=None))
+    assert item["id"] == "SKU-1"
+    assert item["availability"] == "out_of_stock"
+    assert item["image_link"] == "https://cdn.example.com/b.png"
+    assert item["additional_image_link"] == item["brand"] == item["product_type"] == ""
+
+
+def test_fingerprint_ignores_stock_changes_that_keep_availability():
+    assert fingerprint(feed_item(product(stock=3))) == fingerprint(feed_item(product(stock=40)))
+    assert fingerprint(feed_item(product(stock=3))) != fingerprint(feed_item(product(stock=0)))
+    assert fingerprint(feed_item(product())) != fingerprint(feed_item(product(price=199.0)))
+
+
+def test_fingerprint_is_a_signed_64_bit_integer():
+    value = fingerprint(feed_item(product()))
+    assert -2 ** 63 <= value < 2 ** 63
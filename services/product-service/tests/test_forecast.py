@@ -0,0 +1,74 @@
+import httpx
+import numpy as np
+import pytest
+from app.db.copy import binary_copy_payload, parse_binary_copy
+from app.repositories.forecast import FORECAST_COLUMNS
+from app.services.forecast import SALES_DTYPE, compute_forecast, fetch_daily_sales
+
+
+def sales(*records):
+    return np.array(list(records), dtype=SALES_DTYPE)
+
+
+def forecast(product_ids, stock, records, window=4, half_life=1e9):
+    return compute_forecast(np.array(product_ids, dtype=np.int64), np.array(stock), records, window,
+                            lead_time_days=2, review_days=1, service_z=1.0, half_life_days=half_life)
+
+
+def test_steady_seller():
+    # Two units every day: no variance, so no safety stock
+    result = forecast([1], [3], sales(*[(1, day, 2) for day in range(4)]))
+    assert result["daily_velocity"][0] == pytest.approx(2.0)
+    assert result["demand_std"][0] == pytest.approx(0.0)
+    assert result["reorder_point"][0] == pytest.approx(4.0)
+    assert result["days_of_cover"][0] == pytest.approx(1.5)
+    assert result["reorder_quantity"][0] == 3  # Up to 2 * (2 + 1) units
+    assert result["needs_reorder"][0]
+
+
+def test_days_without_sales_count_as_zero():
+    result = forecast([1], [100], sales((1, 0, 4)))
+    assert result["daily_velocity"][0] == pytest.approx(1.0)
+    assert result["demand_std"][0] == pytest.approx(np.sqrt(3.0))
+    assert not result["needs_reorder"][0]
+
+
+def test_recent_days_weigh_more():
+    old = forecast([1], [10], sales((1, 0, 4)), half_life=1)
+    recent = forecast([1], [10], sales((1, 3, 4)), half_life=1)
+    assert recent["daily_velocity"][0] > 1.0 > old["daily_velocity"][0]
+
+
+def test_unknown_products_and_old_days_are_ignored():
+    result = forecast([2, 5], [0, 1], sales((3, 0, 9), (5, 9, 9), (5, 1, 4), (99, 0, 1)))
+    assert result["daily_velocity"].tolist() == pytest.approx([0.0, 1.0])
+    # Out of stock but not selling: no cover and no reorder
+    assert result["days_of_cover"][0] == 0.0
+    assert not result["needs_reorder"][0]
+
+
+def test_sparse_ids_use_binary_search():
+    result = forecast([10, 10_000_000], [1, 1], sales((10_000_000, 0, 8), (11, 0, 1)))
+    assert result["daily_velocity"].tolist() == pytest.approx([0.0, 2.0])
+
+
+def test_binary_copy_round_trip():
+    columns = {
+        "product_id": np.array([1, 7]), "stock": np.array([0, -3]), "daily_velocity": np.array([0.5, 2.0]),
+        "demand_std": np.array([0.0, 1.5]), "days_of_cover": np.array([0.0, 4.0]),
+        "safety_stock": np.array([1.0, 2.0]), "reorder_point": np.array([3.0, 4.0]),
+        "reorder_quantity": np.array([5, 0]), "needs_reorder": np.array([True, False]),
+    }
+    decoded = parse_binary_copy(binary_copy_payload(columns, FORECAST_COLUMNS), FORECAST_COLUMNS)
+    for name, values in columns.items():
+        assert decoded[name].tolist() == values.tolist()
+
+
+def test_fetch_daily_sales_decodes_the_feed():
+    records = sales((1, 0, 2), (2, 3, 5))
+
+    def handler(request):
+        assert request.url.params["days"] == "30"
+        return httpx.Response(200, content=records.tobytes() + b"\x01")  # Trailing partial record dropped
+
+    assert fetch_daily_sales(30, transport=httpx.MockTransport(handler)).tolist() == records.tolist()
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from starlette.requests import Request
+from app.core.http_cache import is_not_modified, make_etag
+from app.models.product import Product
+
+
+def _request(**headers):
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag("product", 7, 3)
+    assert etag == '"product-7-3"'
+    assert is_not_modified(_request(if_none_match=etag), etag)
+    assert is_not_modified(_request(if_none_match=f'"other", W/{etag}'), etag)
+    assert is_not_modified(_request(if_none_match="*"), etag)
+    assert not is_not_modified(_request(if_none_match='"product-7-2"'), etag)
+    assert not is_not_modified(_request(), etag)
+
+
+def test_if_modified_since_is_second_precise_and_ignored_next_to_if_none_match():
+    modified = datetime(2024, 5, 1, 12, 0, 0, 250000)
+    header = format_datetime(modified.replace(tzinfo=timezone.utc), usegmt=True)
+    assert is_not_modified(_request(if_modified_since=header), '"x"', modified)
+    earlier = modified - timedelta(seconds=1)
+    assert not is_not_modified(_request(if_modified_since=header), '"x"', modified + timedelta(seconds=1))
+    assert is_not_modified(_request(if_modified_since=header), '"x"', earlier)
+    assert not is_not_modified(_request(if_modified_since="yesterday"), '"x"', modified)
+    assert not is_not_modified(_request(if_modified_since=header, if_none_match='"y"'), '"x"', earlier)
+
+
+def test_product_get_revalidates_until_an_update_bumps_the_version(client, db, make_product):
+    product_id = make_product(name="Lamp")
+    response = client.get(f"/api/v1/products/{product_id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag == make_etag("product", product_id, 1)
+    assert "max-age" in response.headers["cache-control"]
+
+    cached = client.get(f"/api/v1/products/{product_id}", headers={"If-None-Match": etag})
+    assert (cached.status_code, cached.content) == (304, b"")
+    assert cached.headers["etag"] == etag
+    since = client.get(f"/api/v1/products/{product_id}",
+                       headers={"If-Modified-Since": response.headers["last-modified"]})
+    assert since.status_code == 304
+
+    assert client.put(f"/api/v1/products/{product_id}", json={"name": "Lamp", "price": 12.5, "stock": 5}).status_code == 200
+    assert db.get(Product, product_id).version == 2
+    fresh = client.get(f"/api/v1/products/{product_id}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] == make_etag("product", product_id, 2)
+    assert fresh.json()["price"] == 12.5
+
+
+def test_catalog_version_moves_list_and_category_etags(client, make_product):
+    listing = client.get("/api/v1/categories")
+    etag = listing.headers["etag"]
+    assert client.get("/api/v1/categories", headers={"If-None-Match": etag}).status_code == 304
+
+    make_product(name="Kettle")
+    moved = client.get("/api/v1/categories", headers={"If-None-Match": etag})
+    assert moved.status_code == 200
+    assert moved.headers["etag"] != etag
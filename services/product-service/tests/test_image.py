@@ -0,0 +1,79 @@
+import asyncio
+import io
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from app.core.config import settings
+from app.services import image
+from app.services.image import ImageService
+
+
+@pytest.fixture(autouse=True)
+def image_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(image, "IMAGE_DIR", tmp_path)
+    monkeypatch.setattr(settings, "IMAGE_VARIANT_WIDTHS", [320, 640, 1024])
+    yield tmp_path
+    image.shutdown_image_pool()
+
+
+def _png(width, height, color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def _upload(data, filename="photo.jpg"):
+    return asyncio.run(ImageService().upload(UploadFile(io.BytesIO(data), filename=filename)))
+
+
+def test_upload_stores_by_content_and_renders_webp_variants(image_dir):
+    result = _upload(_png(800, 400))
+    # The stored extension follows the decoded format, not the client's filename
+    assert result["filename"] == f"{result['sha256']}.png"
+    assert result["image_url"] == f"{settings.PUBLIC_BASE_URL}/uploads/products/{result['filename']}"
+    assert not result["deduplicated"]
+    assert sorted(result["variants"]) == ["thumb", "w320", "w640", "w800"]
+    with Image.open(image_dir / f"{result['sha256']}_w320.webp") as variant:
+        assert (variant.format, variant.size) == ("WEBP", (320, 160))
+    with Image.open(image_dir / f"{result['sha256']}_thumb.webp") as thumb:
+        assert max(thumb.size) == settings.IMAGE_THUMBNAIL_SIZE
+
+    again = _upload(_png(800, 400), filename="copy.png")
+    assert again["deduplicated"] and again["filename"] == result["filename"]
+    assert [p.name for p in image_dir.glob(".upload-*")] == []
+
+
+def test_resolve_picks_the_smallest_variant_wide_enough(image_dir):
+    result = _upload(_png(800, 400))
+    digest, filename = result["sha256"], result["filename"]
+    service = ImageService()
+    assert service.resolve(filename).name == filename
+    assert service.resolve(filename, width=300).name == f"{digest}_w320.webp"
+    assert service.resolve(filename, width=500).name == f"{digest}_w640.webp"
+    assert service.resolve(filename, width=4000).name == f"{digest}_w800.webp"
+    assert service.resolve(filename, variant="webp").name == f"{digest}_w800.webp"
+    assert service.resolve(filename, variant="thumb").name == f"{digest}_thumb.webp"
+
+    # Widths are rediscovered from the files when the list is missing
+    (image_dir / f"{digest}_variants.json").unlink()
+    assert service.resolve(filename, width=600).name == f"{digest}_w640.webp"
+    assert (image_dir / f"{digest}_variants.json").exists()
+
+    for name in ("../etc/passwd", f"{digest}_w320.webp", "0" * 64 + ".png"):
+        with pytest.raises(HTTPException) as e:
+            service.resolve(name)
+        assert e.value.status_code == 404
+
+
+def test_rejected_uploads_leave_nothing_behind(image_dir, monkeypatch):
+    for data, code in ((b"", 400), (b"not an image at all", 400)):
+        with pytest.raises(HTTPException) as e:
+            _upload(data)
+        assert e.value.status_code == code
+
+    monkeypatch.setattr(image, "CHUNK_SIZE", 64)
+    monkeypatch.setattr(settings, "IMAGE_MAX_BYTES", 100)
+    with pytest.raises(HTTPException) as e:
+        _upload(_png(300, 300, color=(1, 2, 3)) + b"\0" * 200)
+    assert e.value.status_code == 413
+    assert list(image_dir.iterdir()) == []
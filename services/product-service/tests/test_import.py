@@ -0,0 +1,66 @@
+import io
+import json
+import uuid
+import pytest
+from app.models.product import Product
+from app.services.product_import import ProductImportService
+
+
+@pytest.fixture
+def sku():
+    return f"IMP-{uuid.uuid4().hex[:10]}"
+
+
+def _import(db, body: str, fmt: str = "csv", **kwargs):
+    return ProductImportService(db).run(io.BytesIO(body.encode()), fmt, **kwargs)
+
+
+def _product(db, sku):
+    db.expire_all()
+    return db.query(Product).filter(Product.sku == sku).one()
+
+
+def test_partial_reimport_keeps_columns_it_does_not_supply(db, sku):
+    full = ("sku,name,description,price,stock,brand,images,specifications\n"
+            f'{sku},Shirt,Cotton shirt,19.5,10,Acme,a.jpg|b.jpg,"{{""Size"": ""L""}}"\n')
+    report = _import(db, full)
+    assert (report.status, report.inserted, report.updated) == ("completed", 1, 0)
+    product = _product(db, sku)
+    product.rating, product.reviews_count = 4.5, 12
+    db.commit()
+
+    report = _import(db, f"sku,name,price,stock\n{sku},Shirt,17.0,3\n")
+    assert (report.inserted, report.updated, report.failed) == (0, 1, 0)
+    product = _product(db, sku)
+    assert (product.price, product.stock) == (17.0, 3)
+    assert product.description == "Cotton shirt"
+    assert product.brand == "Acme"
+    assert product.images == ["a.jpg", "b.jpg"]
+    assert product.specifications == {"Size": "L"}
+    assert (product.rating, product.reviews_count) == (4.5, 12)
+
+
+def test_empty_csv_cells_and_absent_keys_keep_values_null_clears(db, sku):
+    _import(db, f"sku,name,description,brand,price,stock\n{sku},Mug,Blue mug,Acme,5,1\n")
+    _import(db, f"sku,name,description,brand,price,stock\n{sku},Mug,,,6,1\n")
+    product = _product(db, sku)
+    assert (product.price, product.description, product.brand) == (6.0, "Blue mug", "Acme")
+
+    _import(db, json.dumps({"sku": sku, "name": "Mug", "price": 6, "stock": 1, "brand": None}) + "\n", fmt="ndjson")
+    product = _product(db, sku)
+    assert (product.description, product.brand) == ("Blue mug", None)
+
+
+def test_rows_supplying_different_columns_share_a_batch(db, sku):
+    other = sku + "-2"
+    _import(db, f"sku,name,price,stock,brand\n{sku},A,1,1,Old\n{other},B,2,2,Old\n")
+    lines = [
+        {"sku": sku, "name": "A", "price": 1.5, "stock": 1},
+        {"sku": other, "name": "B", "price": 2, "stock": 2, "brand": "New"},
+        {"sku": sku + "-3", "name": "C", "price": 3, "stock": 3},
+    ]
+    report = _import(db, "".join(json.dumps(line) + "\n" for line in lines), fmt="ndjson")
+    assert (report.inserted, report.updated, report.batches) == (1, 2, 1)
+    assert (_product(db, sku).price, _product(db, sku).brand) == (1.5, "Old")
+    assert _product(db, other).brand == "New"
+    assert _product(db, sku + "-3").rating == 0.0
@@ -0,0 +1,83 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+from app.repositories.inventory import ReservationError
+from app.schemas.inventory import ReservationCreate
+from app.services import inventory
+from app.services.inventory import DEADLOCK_DETECTED, InventoryService
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeRepository:
+    """Fails the first ``failures`` calls with the given errors, then records the reservation"""
+
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.calls = []
+
+    def reserve(self, reservation_id, items, expires_at, order_ref):
+        self.calls.append(dict(items))
+        if self.failures:
+            raise self.failures.pop(0)
+        return reservation_id
+
+
+class PgError(Exception):
+    def __init__(self, pgcode):
+        self.pgcode = pgcode
+
+
+def service(repo):
+    svc = InventoryService(FakeSession())
+    svc.repo = repo
+    return svc
+
+
+@pytest.fixture(autouse=True)
+def clear_touched():
+    yield
+    inventory._touched.clear()
+
+
+def reservation(*lines):
+    return ReservationCreate(items=[{"product_id": pid, "quantity": quantity} for pid, quantity in lines])
+
+
+def test_reserve_merges_lines_of_the_same_product():
+    repo = FakeRepository()
+    service(repo).reserve(reservation((1, 2), (2, 1), (1, 3)))
+    assert repo.calls == [{1: 5, 2: 1}]
+    assert inventory._touched == {1, 2}
+
+
+def test_reserve_retries_deadlocks():
+    repo = FakeRepository(OperationalError("UPDATE", {}, PgError(DEADLOCK_DETECTED)))
+    svc = service(repo)
+    svc.reserve(reservation((1, 1)))
+    assert len(repo.calls) == 2
+    assert (svc.db.rollbacks, svc.db.commits) == (1, 1)
+
+
+def test_reserve_does_not_retry_other_errors():
+    repo = FakeRepository(OperationalError("UPDATE", {}, PgError("57014")))
+    with pytest.raises(OperationalError):
+        service(repo).reserve(reservation((1, 1)))
+    assert len(repo.calls) == 1
+
+
+@pytest.mark.parametrize("reason, status_code", [("not_found", 404), ("insufficient", 409)])
+def test_reserve_shortfall_is_reported_per_product(reason, status_code):
+    with pytest.raises(HTTPException) as e:
+        service(FakeRepository(ReservationError(7, reason))).reserve(reservation((7, 1)))
+    assert e.value.status_code == status_code and e.value.detail["product_id"] == 7
+    assert not inventory._touched
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from app.services.related import FeatureHasher, price_band, product_features, top_k_neighbors
+
+
+def brute_force(vectors, k):
+    sims = vectors @ vectors.T
+    np.fill_diagonal(sims, -np.inf)
+    return np.argsort(-sims, axis=1, kind="stable")[:, :k], -np.sort(-sims, axis=1)[:, :k]
+
+
+@pytest.mark.parametrize("block_elements", [1, 7, 10_000])
+def test_top_k_matches_brute_force_for_any_block_size(block_elements):
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(40, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    indices, scores = top_k_neighbors(vectors, 5, block_elements)
+    expected_indices, expected_scores = brute_force(vectors, 5)
+    assert indices.tolist() == expected_indices.tolist()
+    assert scores == pytest.approx(expected_scores, abs=1e-6)
+
+
+def test_top_k_never_lists_the_row_itself():
+    vectors = np.ones((4, 3), dtype=np.float32) / np.sqrt(3)  # All identical
+    indices, _ = top_k_neighbors(vectors, 10, 100)
+    assert indices.shape == (4, 3)
+    assert all(row not in indices[row] for row in range(4))
+
+
+def test_top_k_of_a_single_product_is_empty():
+    indices, scores = top_k_neighbors(np.ones((1, 3), dtype=np.float32), 5, 100)
+    assert indices.shape == scores.shape == (1, 0)
+
+
+def test_price_bands_are_half_octaves():
+    assert price_band(11) == price_band(14) != price_band(10)
+    assert price_band(20) - price_band(10) == 2
+    assert price_band(None) == price_band(-5) == 0
+
+
+def test_similar_products_hash_closer_than_unrelated_ones():
+    hasher = FeatureHasher(256)
+    vectors = hasher.transform([
+        product_features("Galaxy S24 phone", "Samsung", 800, {"ram": "8GB"}),
+        product_features("Galaxy S23 phone", "Samsung", 700, {"ram": "8GB"}),
+        product_features("Cotton T-shirt", "Uniqlo", 15, {"size": "M"}),
+    ])
+    assert np.linalg.norm(vectors, axis=1) == pytest.approx(1.0, abs=1e-6)
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
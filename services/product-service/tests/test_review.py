@@ -0,0 +1,97 @@
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from app.core.config import settings
+from app.models.review import ProductReview
+from app.services.review import ReviewService
+
+T0 = datetime(2026, 3, 1, 12, 0, 0)
+T1 = datetime(2026, 3, 1, 12, 0, 1)
+
+
+@pytest.fixture
+def reviews(db, make_product):
+    """Seven reviews of one product; five share a timestamp, so page boundaries fall inside the tie"""
+    product_id = make_product()
+    created = [T1, T0, T0, T0, T0, T0, datetime(2026, 2, 1)]
+    rows = [ProductReview(product_id=product_id, user_id=100 + i, rating=5 - i % 2, created_at=at, updated_at=at)
+            for i, at in enumerate(created)]
+    db.add_all(rows)
+    db.flush()
+    expected = sorted(rows, key=lambda r: (r.created_at, r.id), reverse=True)
+    return product_id, [r.id for r in expected], {r.id: r.rating for r in rows}
+
+
+def _walk(service, product_id, limit, rating=None):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = service.list_reviews(product_id, rating, limit, cursor)
+        ids += [r.id for r in page.reviews]
+        pages += 1
+        if page.next_cursor is None:
+            return ids, pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 50])
+def test_pages_cover_equal_timestamps_exactly_once(db, reviews, limit):
+    product_id, expected, _ = reviews
+    ids, pages = _walk(ReviewService(db), product_id, limit)
+    assert ids == expected
+    assert pages == max(1, -(-len(expected) // limit))
+
+
+def test_pages_filtered_by_rating(db, reviews):
+    product_id, expected, ratings = reviews
+    ids, _ = _walk(ReviewService(db), product_id, 2, rating=5)
+    assert ids == [i for i in expected if ratings[i] == 5]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm9waXBl"])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        ReviewService(None).list_reviews(1, None, 10, cursor)
+    assert e.value.status_code == 400
+
+
+def _auth(user_id):
+    token = jwt.encode({"sub": f"user{user_id}@example.com", "uid": user_id, "role": "user"},
+                       settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_review_author_comes_from_the_token(client, make_product):
+    product_id = make_product()
+    response = client.post(f"/api/v1/products/{product_id}/reviews", headers=_auth(501),
+                           json={"user_id": 999, "rating": 4, "comment": "Good"})
+    assert response.status_code == 201
+    assert response.json()["user_id"] == 501
+    assert client.post(f"/api/v1/products/{product_id}/reviews", json={"rating": 4}).status_code == 401
+    stale = {"Authorization": "Bearer " + jwt.encode({"sub": "old@example.com"}, settings.JWT_SECRET_KEY,
+                                                     algorithm=settings.JWT_ALGORITHM)}
+    assert client.post(f"/api/v1/products/{product_id}/reviews", headers=stale, json={"rating": 4}).status_code == 401
+
+
+def test_only_the_author_changes_a_review(client, make_product):
+    product_id = make_product()
+    review = client.post(f"/api/v1/products/{product_id}/reviews", headers=_auth(501), json={"rating": 4}).json()
+    url = f"/api/v1/products/{product_id}/reviews/{review['id']}"
+
+    assert client.put(url, headers=_auth(502), json={"rating": 1}).status_code == 403
+    assert client.delete(url, headers=_auth(502)).status_code == 403
+    assert client.put(url, json={"rating": 1}).status_code == 401
+    assert client.get(f"/api/v1/products/{product_id}/reviews/summary").json()["average"] == 4.0
+
+    assert client.put(url, headers=_auth(501), json={"rating": 2}).json()["rating"] == 2
+    assert client.get(f"/api/v1/products/{product_id}/reviews/summary").json()["average"] == 2.0
+    assert client.delete(url, headers=_auth(501)).status_code == 200
+    assert client.delete(url, headers=_auth(501)).status_code == 404
+
+
+def test_product_writes_do_not_touch_the_rating(client, make_product):
+    product_id = make_product(rating=4.5, reviews_count=10)
+    response = client.put(f"/api/v1/products/{product_id}",
+                          json={"name": "Renamed", "price": 12.0, "stock": 3, "rating": 1.0, "reviews_count": 0})
+    assert response.status_code == 200
+    assert (response.json()["rating"], response.json()["reviews_count"]) == (4.5, 10)
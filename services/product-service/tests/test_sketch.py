@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from app.core.sketch import CountMinSketch, DecayedTopK, SpaceSaving
+
+
+def zipf_stream(n, keys, seed=1):
+    return np.minimum(np.random.default_rng(seed).zipf(1.3, n), keys).tolist()
+
+
+def test_count_min_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=4)
+    stream = zipf_stream(5000, 1000)
+    for key in stream:
+        sketch.add(key, 1)
+    true = {key: stream.count(key) for key in set(stream)}
+    assert all(sketch.estimate(key) >= count for key, count in true.items())
+    assert sketch.estimate(1) <= true[1] * 1.1  # Heavy keys stay close
+
+
+def test_count_min_width_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        CountMinSketch(width=100, depth=2)
+
+
+def test_space_saving_is_exact_within_capacity():
+    counter = SpaceSaving(capacity=10)
+    for key, amount in [(1, 3), (2, 1), (1, 2), (3, 4)]:
+        counter.add(key, amount)
+    assert counter.top(2) == [(1, 5, 0), (3, 4, 0)]
+
+
+def test_space_saving_keeps_heavy_hitters_with_error_bounds():
+    counter = SpaceSaving(capacity=20)
+    stream = zipf_stream(20000, 2 ** 40)
+    for key in stream:
+        counter.add(key, 1)
+    assert len(counter.counts) == 20
+    top = counter.top(3)
+    assert [key for key, _, _ in top] == [1, 2, 3]
+    for key, count, error in top:
+        assert count - error <= stream.count(key) <= count
+
+
+def test_space_saving_eviction_uses_the_ceiling():
+    counter = SpaceSaving(capacity=1)
+    counter.add(1, 100)
+    counter.add(2, 1, ceiling=3)  # The sketch says key 2 has at most 3
+    assert counter.top(1) == [(2, 3, 2)]
+
+
+def test_decayed_counts_halve_every_half_life():
+    topk = DecayedTopK(half_life=10, width=64, depth=4, capacity=8)
+    start = topk.landmark
+    for _ in range(8):
+        topk.add(1, now=start)
+    topk.add(2, 4, now=start + 10)
+    assert topk.top(2, now=start + 10) == [(1, pytest.approx(4.0)), (2, pytest.approx(4.0))]
+    assert topk.estimate(1, now=start + 20) == pytest.approx(2.0)
+
+
+def test_decayed_counts_survive_rescaling_and_checkpoints():
+    topk = DecayedTopK(half_life=1, width=64, depth=4, capacity=8)
+    start = topk.landmark
+    topk.add(1, 8, now=start)
+    topk.add(2, 1, now=start + 50)  # Past the rescale threshold: landmark moves
+    assert topk.landmark == start + 50
+    restored = DecayedTopK(half_life=1, width=64, depth=4, capacity=8)
+    assert restored.load(topk.dump())
+    assert restored.top(1, now=start + 51)[0] == (2, pytest.approx(0.5))
+    assert not DecayedTopK(half_life=2, width=64, depth=4, capacity=8).load(topk.dump())
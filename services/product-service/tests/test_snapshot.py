@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import io
+import json
+import brotli
+import msgpack
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from app.core.config import settings
+from app.models.product import Product
+from app.repositories.snapshot import SnapshotRepository
+from app.services import snapshot
+from app.services.snapshot import CatalogSnapshotService, read_manifest
+
+DECODERS = {"gzip": gzip.decompress, "br": brotli.decompress}
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", tmp_path)
+    # The test session is already inside a transaction, where the isolation level can no longer be set
+    monkeypatch.setattr(SnapshotRepository, "begin_consistent_read", lambda self: None)
+    return tmp_path
+
+
+def _contents(snapshot_dir, entry):
+    path = snapshot_dir / entry["url"].rsplit("/", 1)[1]
+    raw = path.read_bytes()
+    assert len(raw) == entry["size"]
+    assert hashlib.sha256(raw).hexdigest() == entry["sha256"]
+    assert path.name.startswith(entry["sha256"])
+    return DECODERS[entry["encoding"]](raw)
+
+
+def test_build_writes_every_format_and_the_manifest(db, snapshot_dir, make_product):
+    ours = {make_product(name="Snap A", price=1.5), make_product(name="Snap B", specifications={"Size": "M"})}
+    db.commit()
+    summary = CatalogSnapshotService(db).build()
+    assert summary["built"]
+    assert sorted(summary["files"]) == ["msgpack.br", "msgpack.gzip", "ndjson.br", "ndjson.gzip"]
+
+    manifest = read_manifest()
+    assert manifest["version"] == summary["version"]
+    assert manifest["products"] == db.query(Product).count()
+    for entry in manifest["files"]:
+        body = _contents(snapshot_dir, entry)
+        if entry["format"] == "ndjson":
+            products = [json.loads(line) for line in body.splitlines()]
+        else:
+            products = list(msgpack.Unpacker(io.BytesIO(body)))
+        assert len(products) == manifest["products"]
+        assert [p["id"] for p in products] == sorted(p["id"] for p in products)
+        by_id = {p["id"]: p for p in products if p["id"] in ours}
+        assert sorted(p["name"] for p in by_id.values()) == ["Snap A", "Snap B"]
+        assert {"Size": "M"} in [p["specifications"] for p in by_id.values()]
+    assert [p.name for p in snapshot_dir.glob(".snapshot-*")] == []
+
+
+def test_unchanged_catalog_is_not_rebuilt(db, snapshot_dir, make_product, monkeypatch):
+    make_product()
+    db.commit()
+    service = CatalogSnapshotService(db)
+    first = service.build()
+    assert service.build() == {"version": first["version"], "built": False}
+    # Same catalog, same bytes: a forced rebuild lands on the same content-addressed names
+    names = sorted(p.name for p in snapshot_dir.iterdir())
+    assert service.build(force=True)["built"]
+    assert sorted(p.name for p in snapshot_dir.iterdir()) == names
+
+    monkeypatch.setattr(settings, "SNAPSHOT_RETAIN_SECONDS", -1)
+    make_product(name="Changes the catalog")
+    db.commit()
+    rebuilt = service.build()
+    assert rebuilt["built"] and rebuilt["version"] > first["version"]
+    assert rebuilt["removed"] == len(settings.SNAPSHOT_FORMATS)
+    assert len(list(snapshot_dir.iterdir())) == len(settings.SNAPSHOT_FORMATS) + 1
+
+
+def test_concurrent_build_is_refused(db, database, snapshot_dir):
+    with database.connect() as other:
+        other.execute(text("SELECT pg_advisory_xact_lock(hashtext('catalog-snapshot'))"))
+        with pytest.raises(HTTPException) as e:
+            CatalogSnapshotService(db).build()
+        assert e.value.status_code == 409
+        other.rollback()
+    assert read_manifest() is None
+
+
+def test_unknown_format_is_rejected(db, snapshot_dir, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_FORMATS", ["ndjson.gz", "xml.zip"])
+    with pytest.raises(HTTPException) as e:
+        CatalogSnapshotService(db).build()
+    assert "xml.zip" in e.value.detail
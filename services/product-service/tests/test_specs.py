@@ -0,0 +1,83 @@
+import uuid
+import pytest
+from app.core.config import settings
+
+
+@pytest.fixture
+def catalog(make_product):
+    """A category of its own, since facets are cached per catalog version and category"""
+    category = f"Shirts-{uuid.uuid4().hex[:8]}"
+    specs = {
+        "red-l": {"Size": "L", "Color": "Red", "Fit": "Slim"},
+        "red-xl": {"Size": "XL", "Color": "Red"},
+        "blue-l": {"Size": "L", "Color": "Blue"},
+        "blue-m": {"Size": "M", "Color": "Blue"},
+        "plain": None,
+    }
+    return category, {name: make_product(name=name, category=category, specifications=value)
+                      for name, value in specs.items()}
+
+
+def _names(response):
+    assert response.status_code == 200
+    return sorted(p["name"] for p in response.json())
+
+
+def test_spec_filters_or_values_and_and_keys(client, catalog):
+    category, _ = catalog
+    url = f"/api/v1/products/category/{category}"
+    assert _names(client.get(url, params={"spec.Color": "Red"})) == ["red-l", "red-xl"]
+    assert _names(client.get(url, params=[("spec.Size", "L"), ("spec.Size", "XL")])) == ["blue-l", "red-l", "red-xl"]
+    assert _names(client.get(url, params=[("spec.Size", "L"), ("spec.Size", "XL"), ("spec.Color", "Blue")])) == ["blue-l"]
+    assert _names(client.get(url, params={"spec.Size": "S"})) == []
+    # Specification order is kept for display
+    red_l = next(p for p in client.get(url).json() if p["name"] == "red-l")
+    assert list(red_l["specifications"]) == ["Size", "Color", "Fit"]
+
+
+def test_unscoped_listing_filters_too(client, catalog):
+    _, ids = catalog
+    response = client.get("/api/v1/products", params={"spec.Color": "Blue", "spec.Size": "M"})
+    assert ids["blue-m"] in [p["id"] for p in response.json()]
+    assert ids["blue-l"] not in [p["id"] for p in response.json()]
+
+
+def _facets(client, category, params=()):
+    response = client.get("/api/v1/products/facets", params=[("category", category), *params])
+    assert response.status_code == 200
+    return {f["key"]: [(v["value"], v["count"]) for v in f["values"]] for f in response.json()}
+
+
+def test_facets_count_values_and_keep_filtered_siblings(client, catalog):
+    category, _ = catalog
+    assert _facets(client, category) == {
+        "Color": [("Blue", 2), ("Red", 2)],
+        "Fit": [("Slim", 1)],
+        "Size": [("L", 2), ("M", 1), ("XL", 1)],
+    }
+    # Size's own filter does not narrow its counts; other attributes are narrowed
+    assert _facets(client, category, [("spec.Size", "L")]) == {
+        "Color": [("Blue", 1), ("Red", 1)],
+        "Fit": [("Slim", 1)],
+        "Size": [("L", 2), ("M", 1), ("XL", 1)],
+    }
+    assert _facets(client, category, [("spec.Size", "L"), ("spec.Color", "Red")]) == {
+        "Color": [("Blue", 1), ("Red", 1)],
+        "Fit": [("Slim", 1)],
+        "Size": [("L", 1), ("XL", 1)],
+    }
+
+
+def test_facets_follow_catalog_writes(client, catalog, make_product):
+    category, _ = catalog
+    response = client.get("/api/v1/products/facets", params={"category": category})
+    make_product(name="green", category=category, specifications={"Color": "Green"})
+    assert client.get("/api/v1/products/facets", params={"category": category},
+                      headers={"If-None-Match": response.headers["etag"]}).status_code == 200
+    assert ("Green", 1) in _facets(client, category)["Color"]
+
+
+def test_too_many_spec_filters(client):
+    params = [("spec.Size", str(i)) for i in range(settings.SPEC_FILTERS_MAX + 1)]
+    assert client.get("/api/v1/products", params=params).status_code == 400
+    assert client.get("/api/v1/products/facets", params=params).status_code == 400
@@ -0,0 +1,67 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.static import CACHE_IMMUTABLE, CACHE_MUTABLE, ImmutableStaticFiles, parse_range
+
+HASHED = "ab" * 32
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / f"{HASHED}.webp").write_bytes(bytes(range(256)) * 4)
+    (tmp_path / "logo.png").write_bytes(b"plain")
+    app = FastAPI()
+    app.mount("/uploads", ImmutableStaticFiles(directory=str(tmp_path)), name="uploads")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    (None, None),
+    ("items=0-1", None),
+    ("bytes=0-1,5-6", None),
+    ("bytes=5-1", None),
+    ("bytes=-", None),
+    ("bytes=a-b", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+def test_hashed_file_is_immutable_with_hash_etag(client):
+    response = client.get(f"/uploads/{HASHED}.webp")
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{HASHED}"'
+    assert response.headers["cache-control"] == CACHE_IMMUTABLE
+    assert len(response.content) == 1024
+
+    again = client.get(f"/uploads/{HASHED}.webp", headers={"If-None-Match": f'W/"{HASHED}"'})
+    assert again.status_code == 304
+
+
+def test_unhashed_file_gets_short_max_age(client):
+    response = client.get("/uploads/logo.png")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == CACHE_MUTABLE
+
+
+def test_range_request(client):
+    response = client.get(f"/uploads/{HASHED}.webp", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 10-19/1024"
+    assert response.content == bytes(range(10, 20))
+
+    stale = client.get(f"/uploads/{HASHED}.webp", headers={"Range": "bytes=10-19", "If-Range": '"other"'})
+    assert stale.status_code == 200 and len(stale.content) == 1024
+
+    assert client.get(f"/uploads/{HASHED}.webp", headers={"Range": "bytes=5000-"}).status_code == 416
@@ -0,0 +1,79 @@
+import uuid
+import pytest
+from sqlalchemy import text
+from app.models.forecast import StockForecast
+from app.models.product import Product
+from app.repositories.stats import InventoryStatsRepository
+
+
+@pytest.fixture
+def repo(db):
+    installed = db.execute(text(
+        "SELECT count(*) FROM pg_trigger WHERE tgname LIKE 'inventory_stats_%' AND NOT tgisinternal"
+    )).scalar()
+    if installed != 3:
+        pytest.skip("incremental inventory stats are disabled")
+    return InventoryStatsRepository(db)
+
+
+def _category(repo, name, incremental=True):
+    return next((row for row in repo.by_category(incremental) if row["category"] == name), None)
+
+
+def _same_totals(repo):
+    def key(rows):
+        return {r["category"]: (r["products"], r["in_stock"], r["low_stock"], float(r["total_value"])) for r in rows}
+    assert key(repo.by_category(True)) == key(repo.by_category(False))
+
+
+def test_triggers_track_inserts_updates_and_deletes(db, repo, make_product):
+    shirts, mugs = f"Shirts-{uuid.uuid4().hex[:8]}", f"Mugs-{uuid.uuid4().hex[:8]}"
+    a = make_product(category=shirts, price=10.0, stock=5)
+    make_product(category=shirts, price=2.5, stock=40)
+    row = _category(repo, shirts)
+    assert (row["products"], row["in_stock"], row["low_stock"], float(row["total_value"])) == (2, 2, 1, 150.0)
+
+    # Moving a product carries its contribution to the new category
+    db.execute(text("UPDATE products SET category = :c, stock = 0 WHERE id = :id"), {"c": mugs, "id": a})
+    row = _category(repo, shirts)
+    assert (row["products"], row["in_stock"], row["low_stock"], float(row["total_value"])) == (1, 1, 0, 100.0)
+    row = _category(repo, mugs)
+    assert (row["products"], row["in_stock"], row["low_stock"]) == (1, 0, 0)
+    _same_totals(repo)
+
+    db.execute(text("DELETE FROM products WHERE id = :id"), {"id": a})
+    assert _category(repo, mugs) is None
+    _same_totals(repo)
+
+
+def test_bulk_statement_and_compaction(db, repo):
+    category = f"Bulk-{uuid.uuid4().hex[:8]}"
+    db.add_all([Product(name=f"P{i}", price=1.0, stock=i, category=category) for i in range(20)])
+    db.flush()
+    row = _category(repo, category)
+    assert (row["products"], row["in_stock"], row["low_stock"]) == (20, 19, 9)
+
+    assert repo.compact() > 0
+    assert db.execute(text("SELECT count(*) FROM inventory_stats_delta")).scalar() == 0
+    assert _category(repo, category) == row
+    _same_totals(repo)
+
+
+def test_low_stock_uses_the_forecast_velocity(db, make_product):
+    category = f"Low-{uuid.uuid4().hex[:8]}"
+    fast = make_product(category=category, stock=20)  # 4 days of cover
+    slow = make_product(category=category, stock=20)  # 40 days: outside the horizon
+    idle = make_product(category=category, stock=3)  # Below the threshold, no sales
+    sold_out = make_product(category=category, stock=0)
+    plenty = make_product(category=category, stock=50)  # No sales, plenty of stock
+    for product_id, velocity in ((fast, 5.0), (slow, 0.5)):
+        db.add(StockForecast(product_id=product_id, stock=20, daily_velocity=velocity, demand_std=0.0,
+                             days_of_cover=20 / velocity, safety_stock=0.0, reorder_point=0.0,
+                             reorder_quantity=0, needs_reorder=False))
+    db.flush()
+
+    rows = [r for r in InventoryStatsRepository(db).low_stock(10000, 14.0) if r["category"] == category]
+    assert [r["id"] for r in rows] == [sold_out, fast, idle]
+    assert rows[1]["daily_velocity"] == 5.0 and rows[1]["days_until_out_of_stock"] == 4.0
+    assert rows[2]["days_until_out_of_stock"] is None
+    assert plenty not in [r["id"] for r in rows]
@@ -0,0 +1,29 @@
+import threading
+from app.core.tasks import PeriodicTask
+
+
+def test_periodic_task_keeps_running_after_errors():
+    calls = []
+    ran_twice = threading.Event()
+
+    def func():
+        calls.append(1)
+        if len(calls) >= 2:
+            ran_twice.set()
+        raise RuntimeError("job failed")
+
+    task = PeriodicTask("test", 0.01, func)
+    task.start()
+    try:
+        assert ran_twice.wait(2)
+    finally:
+        task.stop()
+    assert not task._thread.is_alive()
+
+
+def test_periodic_task_waits_one_interval_before_the_first_run():
+    calls = []
+    task = PeriodicTask("test", 60, lambda: calls.append(1))
+    task.start()
+    task.stop()
+    assert calls == []
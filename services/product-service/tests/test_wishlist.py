@@ -0,0 +1,109 @@
+import random
+import pytest
+from sqlalchemy import text
+from app.repositories.wishlist import WishlistRepository
+
+
+@pytest.fixture
+def user_id():
+    # Cached id sets outlive the rolled-back transaction, so every test gets a fresh user
+    return random.randint(10**8, 10**9)
+
+
+@pytest.fixture
+def id_loads(monkeypatch):
+    """Counts the id-set queries that reach the database"""
+    calls = []
+    load = WishlistRepository.get_product_ids
+
+    def counted(self, user_id):
+        calls.append(user_id)
+        return load(self, user_id)
+    monkeypatch.setattr(WishlistRepository, "get_product_ids", counted)
+    return calls
+
+
+def test_checks_read_one_cached_id_set(client, make_product, user_id, id_loads):
+    a, b, c = make_product(), make_product(), make_product()
+    assert client.post("/api/v1/wishlist", params={"user_id": user_id}, json={"product_id": a}).status_code == 201
+    id_loads.clear()  # The add stored the fresh set
+
+    response = client.post(f"/api/v1/wishlist/{user_id}/check", json={"product_ids": [a, b, c]})
+    assert response.json() == {"in_wishlist": {str(a): True, str(b): False, str(c): False}}
+    assert client.get(f"/api/v1/wishlist/{user_id}/check/{a}").json() == {"is_in_wishlist": True}
+    assert client.get(f"/api/v1/wishlist/{user_id}/check/{b}").json() == {"is_in_wishlist": False}
+    assert id_loads == []
+
+
+def test_writes_refresh_the_cached_set(client, make_product, user_id, id_loads):
+    a, b = make_product(), make_product()
+
+    def check():
+        return client.post(f"/api/v1/wishlist/{user_id}/check", json={"product_ids": [a, b]}).json()
+
+    assert check() == {"in_wishlist": {str(a): False, str(b): False}}
+    assert id_loads == [user_id]  # Cold: one id-only query
+
+    client.post("/api/v1/wishlist", params={"user_id": user_id}, json={"product_id": b})
+    assert check() == {"in_wishlist": {str(a): False, str(b): True}}
+    assert client.delete(f"/api/v1/wishlist/{user_id}/{b}").status_code == 200
+    assert check() == {"in_wishlist": {str(a): False, str(b): False}}
+    # Each write reloaded the set once; the checks after it did not query
+    assert id_loads == [user_id] * 3
+
+
+def test_check_limits_the_id_count(client, user_id):
+    assert client.post(f"/api/v1/wishlist/{user_id}/check", json={"product_ids": []}).status_code == 422
+    ids = list(range(1, 202))
+    assert client.post(f"/api/v1/wishlist/{user_id}/check", json={"product_ids": ids}).status_code == 422
+
+
+def _users(db, product_id):
+    return db.execute(text("SELECT users FROM wishlist_counts WHERE product_id = :id"), {"id": product_id}).scalar()
+
+
+def test_add_is_idempotent_and_keeps_counts(client, db, make_product, user_id):
+    product_id = make_product()
+    first = client.post("/api/v1/wishlist", params={"user_id": user_id}, json={"product_id": product_id})
+    again = client.post("/api/v1/wishlist", params={"user_id": user_id}, json={"product_id": product_id})
+    assert first.status_code == again.status_code == 201
+    assert again.json() == first.json()
+    client.post("/api/v1/wishlist", params={"user_id": user_id + 1}, json={"product_id": product_id})
+    assert _users(db, product_id) == 2
+
+    assert client.delete(f"/api/v1/wishlist/{user_id}/{product_id}").status_code == 200
+    assert client.delete(f"/api/v1/wishlist/{user_id}/{product_id}").status_code == 404
+    assert _users(db, product_id) == 1
+
+    unknown = client.post("/api/v1/wishlist", params={"user_id": user_id}, json={"product_id": product_id + 10**6})
+    assert unknown.status_code == 404
+
+
+def test_bulk_add_and_remove_report_what_changed(client, db, make_product, user_id):
+    a, b, c = make_product(), make_product(), make_product()
+    client.post("/api/v1/wishlist", params={"user_id": user_id}, json={"product_id": a})
+
+    added = client.post(f"/api/v1/wishlist/{user_id}/bulk-add", json={"product_ids": [a, b, c, c, c + 10**6]})
+    assert added.json() == {"changed": sorted([b, c]), "product_ids": sorted([a, b, c])}
+    assert [_users(db, pid) for pid in (a, b, c)] == [1, 1, 1]
+
+    removed = client.post(f"/api/v1/wishlist/{user_id}/bulk-remove", json={"product_ids": [a, c, c + 10**6]})
+    assert removed.json() == {"changed": sorted([a, c]), "product_ids": [b]}
+    assert [_users(db, pid) for pid in (a, b, c)] == [0, 1, 0]
+    assert client.post(f"/api/v1/wishlist/{user_id}/check", json={"product_ids": [a, b]}).json() == \
+        {"in_wishlist": {str(a): False, str(b): True}}
+
+    # Nothing changes: the cached set answers
+    again = client.post(f"/api/v1/wishlist/{user_id}/bulk-remove", json={"product_ids": [a]})
+    assert again.json() == {"changed": [], "product_ids": [b]}
+
+
+def test_most_wishlisted_orders_by_users(client, make_product, user_id):
+    popular, niche = make_product(name="Popular"), make_product(name="Niche")
+    for offset in range(3):
+        client.post(f"/api/v1/wishlist/{user_id + offset}/bulk-add", json={"product_ids": [popular]})
+    client.post(f"/api/v1/wishlist/{user_id}/bulk-add", json={"product_ids": [niche]})
+
+    rows = client.get("/api/v1/admin/products/most-wishlisted", params={"limit": 200}).json()
+    ours = [(row["product_id"], row["users"]) for row in rows if row["product_id"] in (popular, niche)]
+    assert ours == [(popular, 3), (niche, 1)]